@@ -0,0 +1,44 @@
+# Slots where cards are taken from and put to: columns are numbered 0..7,
+# followed by the free cells and the suit stack.
+FREE_CELL_SLOT = 8
+SUIT_STACK_SLOT = 12
+
+# Moves encoded as integers source * NUM_DESTINATIONS + destination, using the
+# slots of Board: columns 0..7, free cells 8..11 and the suit stack 12. Cards
+# can only be taken from columns and free cells. A move to an empty column or
+# to a free cell is only legal for the first empty one, which is where
+# Board puts the card for the '0' and 'F' moves, so every move returned by
+# get_moves has exactly one action.
+
+NUM_COLUMNS = FREE_CELL_SLOT
+NUM_FREE_CELLS = SUIT_STACK_SLOT - FREE_CELL_SLOT
+NUM_SOURCES = SUIT_STACK_SLOT
+NUM_DESTINATIONS = SUIT_STACK_SLOT + 1
+NUM_ACTIONS = NUM_SOURCES * NUM_DESTINATIONS
+
+
+def encode_action(source: int, destination: int) -> int:
+    """
+    Encodes a move between two slots as an action.
+
+    Args:
+        source (int): The slot the card is taken from.
+        destination (int): The slot the card is put to.
+
+    Returns:
+        int: The action in range 0..NUM_ACTIONS - 1.
+    """
+    return source * NUM_DESTINATIONS + destination
+
+
+def decode_action(action: int) -> tuple:
+    """
+    Decodes an action into the slots of the move.
+
+    Args:
+        action (int): The action in range 0..NUM_ACTIONS - 1.
+
+    Returns:
+        tuple: The source and destination slots.
+    """
+    return divmod(action, NUM_DESTINATIONS)
@@ -0,0 +1,241 @@
+import argparse
+import json
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter
+
+from game.DealCache import DEALS
+from game.Deck import Deck
+from game.Freecell import FreeCell
+from game.Game import State
+from game.Solver import Solver
+
+# Fixed corpus of deals, so results of different releases are comparable.
+SEEDS = tuple(range(1, 33))
+PLAYOUT_MOVES = 100
+SOLVE_DEALS = 4
+
+# BENCHMARKS[name] is called with the seeds and returns the number of
+# operations made and the seconds spent in them.
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def playout(seed: int, moves: int = PLAYOUT_MOVES) -> list:
+    """
+    Plays random moves from a deal.
+
+    Args:
+        seed (int): The seed of the deal, also used to choose the moves.
+        moves (int): The maximum number of moves.
+
+    Returns:
+        list: The moves played.
+    """
+    freecell = FreeCell(seed)
+    random = Random(seed)
+    played = []
+    while len(played) < moves and freecell.get_state() == State.ONGOING:
+        move = random.choice(freecell.get_moves())
+        freecell.make_move(move)
+        played.append(move)
+    return played
+
+
+# The deals are cached by DEALS, so the benchmarks of dealing clear it before
+# the timed run to measure the shuffling, and the *_cached variants deal the
+# seeds once before it to measure the lookups.
+
+
+def _time_deals(seeds, function, cached: bool) -> tuple:
+    DEALS.clear()
+    if cached:
+        for seed in seeds:
+            DEALS.get(seed)
+    start = perf_counter()
+    for seed in seeds:
+        function(seed)
+    return len(seeds), perf_counter() - start
+
+
+@benchmark("deck_shuffle")
+def bench_deck_shuffle(seeds) -> tuple:
+    return _time_deals(seeds, lambda seed: Deck(seed).cards_shuffled(), False)
+
+
+@benchmark("deck_shuffle_cached")
+def bench_deck_shuffle_cached(seeds) -> tuple:
+    return _time_deals(seeds, lambda seed: Deck(seed).cards_shuffled(), True)
+
+
+@benchmark("freecell_init")
+def bench_freecell_init(seeds) -> tuple:
+    return _time_deals(seeds, FreeCell, False)
+
+
+@benchmark("freecell_init_cached")
+def bench_freecell_init_cached(seeds) -> tuple:
+    return _time_deals(seeds, FreeCell, True)
+
+
+def _replay(seeds, measure, apply: bool = True) -> tuple:
+    """
+    Replays the playouts of the seeds, timing only the calls made by measure.
+    The moves are made after measure if apply is set.
+    """
+    playouts = [(seed, playout(seed)) for seed in seeds]
+    ops, elapsed = 0, 0.0
+    for seed, moves in playouts:
+        freecell = FreeCell(seed)
+        for move in moves:
+            start = perf_counter()
+            measure(freecell, move)
+            elapsed += perf_counter() - start
+            ops += 1
+            if apply:
+                freecell.make_move(move)
+    return ops, elapsed
+
+
+@benchmark("get_moves")
+def bench_get_moves(seeds) -> tuple:
+    return _replay(seeds, lambda freecell, move: freecell.get_moves())
+
+
+@benchmark("make_move")
+def bench_make_move(seeds) -> tuple:
+    return _replay(seeds, FreeCell.make_move, apply=False)
+
+
+@benchmark("get_state")
+def bench_get_state(seeds) -> tuple:
+    return _replay(seeds, lambda freecell, move: freecell.get_state())
+
+
+@benchmark("random_playout")
+def bench_random_playout(seeds) -> tuple:
+    start = perf_counter()
+    moves = sum(len(playout(seed)) for seed in seeds)
+    return moves, perf_counter() - start
+
+
+@benchmark("solve")
+def bench_solve(seeds) -> tuple:
+    solver = Solver()
+    start = perf_counter()
+    for seed in seeds[:SOLVE_DEALS]:
+        solver.solve(seed)
+    return len(seeds[:SOLVE_DEALS]), perf_counter() - start
+
+
+def run_benchmarks(names=None, seeds=SEEDS, repeat: int = 3) -> dict:
+    """
+    Runs benchmarks over a seed corpus.
+
+    Every benchmark is timed repeat times and the fastest run is reported.
+    It is then run once more under tracemalloc to measure the memory it
+    allocates, which would distort the timings.
+
+    Args:
+        names (iterable of str): The benchmarks to run, all if not given.
+        seeds (sequence of int): The deals to use.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict: For every benchmark, a dict with ops_per_sec and the
+            peak_bytes allocated during a run.
+    """
+    results = dict()
+    for name in BENCHMARKS if names is None else names:
+        function = BENCHMARKS[name]
+        ops_per_sec = 0.0
+        for _ in range(repeat):
+            ops, elapsed = function(seeds)
+            ops_per_sec = max(ops_per_sec, ops / max(elapsed, 1e-9))
+
+        tracemalloc.start()
+        try:
+            function(seeds)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        results[name] = {"ops_per_sec": ops_per_sec, "peak_bytes": peak_bytes}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> list:
+    """
+    Finds the benchmarks that got slower or allocate more than a baseline.
+
+    Args:
+        results (dict): The results of run_benchmarks.
+        baseline (dict): Earlier results of run_benchmarks.
+        threshold (float): The allowed relative change, 0.1 for 10%.
+
+    Returns:
+        list: (name, metric, baseline value, current value) tuples of the
+            regressions. Benchmarks missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["ops_per_sec"], result["ops_per_sec"]
+        if new < old * (1 - threshold):
+            regressions.append((name, "ops_per_sec", old, new))
+        old, new = baseline[name]["peak_bytes"], result["peak_bytes"]
+        if new > old * (1 + threshold):
+            regressions.append((name, "peak_bytes", old, new))
+    return regressions
+
+
+def main(argv=None) -> int:
+    """
+    Runs the benchmarks from the command line, see --help.
+
+    Returns:
+        int: The exit code, 1 if a regression against the baseline was found.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the FreeCell game.")
+    parser.add_argument("names", nargs="*", help="the benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seeds", type=int, default=len(SEEDS))
+    parser.add_argument("--save", help="write the results to a JSON file")
+    parser.add_argument("--baseline", help="compare to results in a JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.names or None, SEEDS[: args.seeds], args.repeat)
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['ops_per_sec']:>14,.1f} ops/s"
+            f"{result['peak_bytes']:>14,} B peak"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"Regression in {name} {metric}: {old:,.0f} -> {new:,.0f}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
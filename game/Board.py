@@ -1,4 +1,20 @@
-from game.Card import Card
+from game.Action import FREE_CELL_SLOT, SUIT_STACK_SLOT, decode_action, encode_action
+from game.Card import SUITS, Card
+from game.Move import Move
+from game.Zone import Zone
+from game.Zobrist import (
+    CELL_KEYS,
+    COLUMN_KEYS,
+    MASK,
+    STACK_KEYS,
+    cell_hash,
+    column_hash,
+    mix,
+    stack_hash,
+)
+
+CARDS = tuple(Card(rank, suit) for suit in SUITS for rank in range(1, 14))
+CARDS_BY_NAME = {card.name: card for card in CARDS}
 
 
 class Board:
@@ -10,11 +26,20 @@ class Board:
 
     Args:
         cards (list): A list of card objects to initialize the game board.
+        supermoves (bool): Also generate moves of sequences of cards, see get_moves.
 
     Attributes:
         columns (list of list): The columns on the board, represented as lists of cards.
         free_cells (list of Card or None): The free cells, each holding a card or None.
         suit_stack (dict): A dictionary representing the suit stacks for hearts (h), diamonds (d), clubs (c), and spades (s).
+        history (list): The executed moves as (card, source, destination, previous, count) tuples, used by
+            undo_move.
+        supermoves (bool): True if get_moves also returns moves of sequences of cards.
+
+    The moves, card locations and hash are cached and kept up to date by the move methods and
+    undo_move. Assigning columns, free_cells or suit_stack drops them, but after modifying the
+    lists in place, e.g. board.columns[0].append(card), reset_cache has to be called, otherwise
+    get_moves returns the moves of the previous cards.
 
     Methods:
         - empty_cells(): Returns the number of empty cells in the columns and free cells.
@@ -22,15 +47,71 @@ class Board:
         - move_to_free_cell(card): Attempts to move a card to a free cell.
         - move_to_free_column(card): Attempts to move a card to an empty column.
         - move_to_card(card_to_move, destination_card): Attempts to move a card to another card.
+        - move_sequence_to_card(card, destination_card): Attempts to move a sequence of cards to another card.
+        - move_sequence_to_free_column(card): Attempts to move a sequence of cards to an empty column.
+        - max_sequence_length(to_empty_column): Returns the number of cards that can be moved at once.
+        - autoplay(): Moves all cards which are safe to move to the suit stacks.
+        - get_pruned_moves(): Returns the moves of get_moves without the redundant ones.
+        - undo_move(): Reverts the last executed move.
+        - locate(card): Returns the zone, slot and depth of a card.
+        - is_on_top(card): Checks if a card is on top of a column.
+        - zobrist_hash(): Returns a hash of the position, kept up to date by the moves.
+        - canonical_key(): Returns a key of the position, equal for positions differing only by column
+          or free cell order.
+        - get_position(), set_position(position): Return or replace the cards on the board as card indices.
+        - copy(): Returns an independent board sharing the unchanged columns with this one.
+        - reset_cache(): Drops the state derived from the cards after they were modified in place.
     """
 
-    def __init__(self, cards: list) -> None:
+    def __init__(self, cards: list, supermoves: bool = False) -> None:
+        self.supermoves = supermoves
+        self.__column_hashes = None
         self.columns = []
         self.free_cells = [None for _ in range(4)]
         self.suit_stack = {"h": None, "d": None, "c": None, "s": None}
+        self.history = []
         self.__make_deck(cards)
 
-    def __is_on_top(self, card: Card) -> list:
+    @property
+    def columns(self) -> list:
+        return self.__columns
+
+    @columns.setter
+    def columns(self, columns: list) -> None:
+        self.__columns = columns
+        self.__shared = set()
+        self.reset_cache()
+
+    @property
+    def free_cells(self) -> list:
+        return self.__free_cells
+
+    @free_cells.setter
+    def free_cells(self, free_cells: list) -> None:
+        self.__free_cells = free_cells
+        self.reset_cache()
+
+    @property
+    def suit_stack(self) -> dict:
+        return self.__suit_stack
+
+    @suit_stack.setter
+    def suit_stack(self, suit_stack: dict) -> None:
+        self.__suit_stack = suit_stack
+        self.reset_cache()
+
+    def reset_cache(self) -> None:
+        """
+        Drops the state derived from the cards on the board. Assigning the
+        columns, free cells or suit stack does it automatically, it only has
+        to be called after modifying them in place.
+        """
+        self.__column_hashes = None
+        self.__moves = None
+        self.__dirty = None
+        self.__locations = None
+
+    def __is_on_top(self, card: Card) -> int:
         """
         Finds the column containing the given card if it is on top.
 
@@ -38,11 +119,265 @@ class Board:
             card (Card): The card to search for.
 
         Returns:
-            list: The column that contains the card if it's on top, otherwise an empty list.
+            int: The index of the column that contains the card if it's on top, otherwise None.
+        """
+        location = self.locate(card)
+        if location is None or location[0] != Zone.COLUMN:
+            return None
+        zone, slot, depth = location
+        return slot if depth == len(self.columns[slot]) - 1 else None
+
+    def __in_free_cell(self, card: Card) -> int:
+        """
+        Finds the free cell holding the given card.
+
+        Args:
+            card (Card): The card to search for.
+
+        Returns:
+            int: The index of the free cell holding the card, otherwise None.
+        """
+        location = self.locate(card)
+        if location is None or location[0] != Zone.FREE_CELL:
+            return None
+        return location[1]
+
+    def __record(
+        self,
+        card: Card,
+        source: int,
+        destination: int,
+        previous: Card = None,
+        count: int = 1,
+    ) -> None:
+        """
+        Records an executed move so it can be reverted by undo_move.
+
+        Args:
+            card (Card): The moved card, the bottom one of a moved sequence.
+            source (int): The slot the card was taken from.
+            destination (int): The slot the card was put to.
+            previous (Card): The card previously on top of the suit stack,
+                for moves to the suit stack.
+            count (int): The number of moved cards.
+        """
+        self.history.append((card, source, destination, previous, count))
+        cards = self.columns[destination][-count:] if count > 1 else [card]
+        self.__moved(cards, source, destination, previous)
+
+    def __moved(
+        self, cards: list, source: int, destination: int, previous: Card
+    ) -> None:
+        """
+        Updates the state derived from the board after cards were moved.
+
+        Args:
+            cards (list): The moved cards, bottom first.
+            source (int): The slot the cards were taken from.
+            destination (int): The slot the cards were put to.
+            previous (Card): The card below the moved card on the suit stack,
+                for moves to and from the suit stack.
+        """
+        self.__moves = None
+        if self.__dirty is not None:
+            self.__dirty.update(
+                slot for slot in (source, destination) if slot != SUIT_STACK_SLOT
+            )
+        if self.__locations is None and self.__column_hashes is None:
+            return
+
+        # The depths of the moved cards in column slots
+        start = len(self.columns[source]) if source < FREE_CELL_SLOT else 0
+        end = len(self.columns[destination]) if destination < FREE_CELL_SLOT else 0
+        end -= len(cards)
+        for i, card in enumerate(cards):
+            self.__place(card, destination, end + i)
+            if self.__column_hashes is not None:
+                self.__toggle_hash(card, source, previous, start + i)
+                self.__toggle_hash(card, destination, previous, end + i)
+
+    def __place(self, card: Card, slot: int, depth: int) -> None:
+        """
+        Updates the location of a card after it was put to a slot.
+
+        Args:
+            card (Card): The moved card.
+            slot (int): The slot the card was put to.
+            depth (int): The depth of the card in a column slot.
+        """
+        if self.__locations is None:
+            return
+        if slot == SUIT_STACK_SLOT:
+            location = (Zone.SUIT_STACK, card.index // 13, card.rank - 1)
+        elif slot >= FREE_CELL_SLOT:
+            location = (Zone.FREE_CELL, slot - FREE_CELL_SLOT, 0)
+        else:
+            location = (Zone.COLUMN, slot, depth)
+        self.__locations[card.index] = location
+
+    def __holds(self, location: tuple, card: Card) -> bool:
+        """
+        Checks if a card is still at a location, it may have been moved by
+        modifying the board in place.
+        """
+        zone, slot, depth = location
+        if zone == Zone.COLUMN:
+            column = self.columns[slot]
+            return depth < len(column) and column[depth] is card
+        if zone == Zone.FREE_CELL:
+            return self.free_cells[slot] is card
+        top = self.suit_stack[card.suit]
+        return top is not None and top.rank > depth
+
+    def __build_locations(self) -> list:
+        """
+        Finds the locations of all cards on the board.
+
+        Returns:
+            list: The location of every card by its index, None for cards
+                not on the board.
+        """
+        locations = [None] * 52
+        for slot, column in enumerate(self.columns):
+            for depth, card in enumerate(column):
+                locations[card.index] = (Zone.COLUMN, slot, depth)
+        for slot, card in enumerate(self.free_cells):
+            if card is not None:
+                locations[card.index] = (Zone.FREE_CELL, slot, 0)
+        for suit, top in enumerate(self.suit_stack[suit] for suit in SUITS):
+            for rank in range(1, 0 if top is None else top.rank + 1):
+                locations[suit * 13 + rank - 1] = (Zone.SUIT_STACK, suit, rank - 1)
+        return locations
+
+    def get_position(self) -> tuple:
+        """
+        Returns the cards on the board as card indices, without creating
+        any objects for the cards.
+
+        Returns:
+            tuple: The columns as bytes of Card.index values, the free cells
+                as bytes with 0xFF for empty cells, and the ranks on top of
+                the suit stacks as bytes in the order of Card.SUITS.
+        """
+        return (
+            tuple(bytes(card.index for card in col) for col in self.columns),
+            bytes(0xFF if card is None else card.index for card in self.free_cells),
+            bytes(
+                0 if self.suit_stack[suit] is None else self.suit_stack[suit].rank
+                for suit in SUITS
+            ),
+        )
+
+    def set_position(self, position: tuple) -> None:
+        """
+        Replaces the cards on the board and clears the history.
+
+        Args:
+            position (tuple): The columns, free cells and suit stacks as
+                returned by get_position.
+        """
+        columns, cells, foundations = position
+        self.columns = [[CARDS[card] for card in col] for col in columns]
+        self.free_cells = [None if card == 0xFF else CARDS[card] for card in cells]
+        self.suit_stack = {
+            suit: CARDS[i * 13 + rank - 1] if rank else None
+            for i, (suit, rank) in enumerate(zip(SUITS, foundations))
+        }
+        self.history = []
+
+    def copy(self) -> "Board":
+        """
+        Returns an independent copy of the board, cheaper than copy.deepcopy.
+
+        The cards are shared, as there is a single instance of every card,
+        and so are the columns until either board moves cards from or to
+        them: a column is only copied by the first move touching it. The
+        derived state, such as the locations of the cards and the hash, is
+        copied instead of being computed again. The columns of either board
+        must therefore not be modified in place afterwards, only assigned,
+        copy.deepcopy returns a copy with its own columns for that.
+
+        Returns:
+            Board: The copy, with the same history.
+        """
+        board = self.__clone(list(self.__columns))
+        self.__shared = set(range(len(self.__columns)))
+        board.__shared = set(self.__shared)
+        return board
+
+    def __deepcopy__(self, memo: dict) -> "Board":
+        board = memo[id(self)] = self.__clone([list(col) for col in self.__columns])
+        return board
+
+    def __clone(self, columns: list) -> "Board":
+        """
+        Returns a copy of the board with the given columns, which are not
+        shared with any board.
+        """
+        board = Board.__new__(Board)
+        board.supermoves = self.supermoves
+        board.__columns = columns
+        board.__shared = set()
+        board.__free_cells = list(self.__free_cells)
+        board.__suit_stack = dict(self.__suit_stack)
+        board.history = list(self.history)
+
+        # The cached moves are replaced and never modified, so they can be
+        # shared, the other derived state is updated in place
+        board.__moves = self.__moves
+        if self.__moves is not None:
+            board.__actions = self.__actions
+        board.__dirty = None if self.__dirty is None else set(self.__dirty)
+        if self.__dirty is not None:
+            board.__links = list(self.__links)
+        board.__locations = None if self.__locations is None else list(self.__locations)
+        board.__column_hashes = None
+        if self.__column_hashes is not None:
+            board.__column_hashes = list(self.__column_hashes)
+            board.__column_sum = self.__column_sum
+            board.__cell_hash = self.__cell_hash
+            board.__stack_hash = self.__stack_hash
+        return board
+
+    def __own(self, slot: int) -> list:
+        """
+        Returns a column to modify, copying it first if it may be shared
+        with a copy of the board.
+
+        Args:
+            slot (int): The index of the column.
+
+        Returns:
+            list: The column, only referenced by this board.
+        """
+        column = self.__columns[slot]
+        if slot in self.__shared:
+            column = self.__columns[slot] = list(column)
+            self.__shared.discard(slot)
+        return column
+
+    def __toggle_hash(self, card: Card, slot: int, previous: Card, depth: int) -> None:
         """
-        col = next((col for col in self.columns if col and card == col[-1]), [])
+        Updates the hash after a card was put to or taken from a slot.
 
-        return col
+        Args:
+            card (Card): The moved card.
+            slot (int): The slot the card was put to or taken from.
+            previous (Card): The card below the moved card on the suit stack.
+            depth (int): The depth of the card in a column slot.
+        """
+        if slot == SUIT_STACK_SLOT:
+            keys = STACK_KEYS[card.index // 13]
+            self.__stack_hash ^= (
+                keys[card.rank] ^ keys[0 if previous is None else previous.rank]
+            )
+        elif slot >= FREE_CELL_SLOT:
+            self.__cell_hash ^= CELL_KEYS[card.index]
+        else:
+            old = self.__column_hashes[slot]
+            new = old ^ COLUMN_KEYS[depth][card.index]
+            self.__column_hashes[slot] = new
+            self.__column_sum = (self.__column_sum - mix(old) + mix(new)) & MASK
 
     def __move_card_from_free_cell_to_card(
         self, card_to_move: Card, destination_card: Card
@@ -57,10 +392,14 @@ class Board:
         Returns:
             bool: True if the move was successful, False otherwise.
         """
-        self.columns[
-            next(i for i, col in enumerate(self.columns) if destination_card in col)
-        ].append(card_to_move)
-        self.free_cells[self.free_cells.index(card_to_move)] = None
+        location = self.locate(destination_card)
+        if location is None or location[0] != Zone.COLUMN:
+            return False
+        dest_index = location[1]
+        cell_index = self.__in_free_cell(card_to_move)
+        self.__own(dest_index).append(card_to_move)
+        self.free_cells[cell_index] = None
+        self.__record(card_to_move, FREE_CELL_SLOT + cell_index, dest_index)
         return True
 
     def __move_card_from_free_cell_to_empty_column(self, card_to_move: Card) -> bool:
@@ -73,10 +412,11 @@ class Board:
         Returns:
             bool: True if the move was successful, False otherwise.
         """
-        self.columns[next(i for i, col in enumerate(self.columns) if not col)].append(
-            card_to_move
-        )
-        self.free_cells[self.free_cells.index(card_to_move)] = None
+        dest_index = next(i for i, col in enumerate(self.columns) if not col)
+        cell_index = self.__in_free_cell(card_to_move)
+        self.__own(dest_index).append(card_to_move)
+        self.free_cells[cell_index] = None
+        self.__record(card_to_move, FREE_CELL_SLOT + cell_index, dest_index)
         return True
 
     def __make_deck(self, cards: list) -> None:
@@ -114,6 +454,406 @@ class Board:
                 movable_cards.append(column[-1])
         return movable_cards
 
+    def get_moves(self) -> list:
+        """Get all possible moves from the current board state.
+
+        The moves are cached until the board changes, and only the placements
+        involving the columns and free cells touched since the last call are
+        checked again. Changes made in place to columns, free_cells or
+        suit_stack are only seen after reset_cache.
+
+        :return: A list of moves in the notation described in
+            FreeCell.get_moves.
+        """
+        return list(self.__legal_moves())
+
+    def has_moves(self) -> bool:
+        """Check whether any move is possible, without listing the moves.
+
+        The cached moves are used if get_moves was called since the last
+        move. Otherwise the check stops at the first move found, and only
+        looks at the placements onto other cards if no card can be moved to
+        a free cell, an empty column or a suit stack. Sequences of cards
+        can then only be moved card by card, so supermoves do not matter.
+
+        :return: True if get_moves is not empty.
+        """
+        if self.__moves is not None:
+            return bool(self.__moves)
+
+        tops = [column[-1] for column in self.columns if column]
+        cards = tops + [card for card in self.free_cells if card is not None]
+        if not cards:
+            return False
+        if len(tops) < len(self.columns) or (tops and None in self.free_cells):
+            return True
+        for card in cards:
+            top = self.suit_stack[card.suit]
+            if card.rank == (0 if top is None else top.rank) + 1:
+                return True
+
+        self.__update_links()
+        return any(self.__links)
+
+    def get_pruned_moves(self) -> list:
+        """Get the possible moves without those a search never needs.
+
+        If a card can be moved to a suit stack safely (see autoplay), that
+        move is the only one returned. Otherwise the moves of a whole column
+        to an empty column and the move reverting the last move are left
+        out, as they only lead to positions which are equal or already
+        reached. A deal can be solved with the pruned moves whenever it can
+        be solved with get_moves.
+
+        :return: A list of moves in the order of get_moves.
+        """
+        moves = self.get_moves()
+        for move in moves:
+            if move[1] == Move.SUIT_STACK.value and self.__is_safe(
+                CARDS_BY_NAME[move[0]]
+            ):
+                return [move]
+
+        inverse = self.__inverse_of_last_move()
+        bottoms = {col[0].name for col in self.columns if col}
+        return [
+            move
+            for move in moves
+            if move != inverse
+            and not (move[1] == Move.EMPTY_COLUMN.value and move[0] in bottoms)
+        ]
+
+    def __inverse_of_last_move(self) -> tuple:
+        """
+        Returns the move putting the card moved last back to where it was
+        taken from, or None if there is no such move.
+        """
+        if not self.history:
+            return None
+        card, source, destination, previous, count = self.history[-1]
+        if destination == SUIT_STACK_SLOT:
+            return None
+        if source >= FREE_CELL_SLOT:
+            return (card.name, Move.FREECELL.value)
+        if not self.columns[source]:
+            return (card.name, Move.EMPTY_COLUMN.value)
+        return (card.name, self.columns[source][-1].name)
+
+    def is_valid_move(self, move: tuple) -> bool:
+        """Check whether a move is returned by get_moves.
+
+        :param move: A move tuple.
+        :return: True if the move can be made, False otherwise.
+        """
+        return move in self.__legal_moves()
+
+    def get_actions(self) -> list:
+        """Get the actions of all possible moves, see game.Action.
+
+        Moves of sequences to empty columns have no action.
+
+        :return: A list of actions in the order of get_moves.
+        """
+        return list(self.__legal_actions())
+
+    def is_valid_action(self, action: int) -> bool:
+        """Check whether an action is returned by get_actions.
+
+        :param action: An action.
+        :return: True if the action can be made, False otherwise.
+        """
+        return action in self.__legal_actions()
+
+    def move_to_action(self, move: tuple) -> int:
+        """Translate a possible move to its action.
+
+        :param move: A move tuple returned by get_moves.
+        :return: The action of the move.
+        :raises ValueError: If the move is not possible or has no action.
+        """
+        try:
+            action = self.__legal_moves()[move]
+        except KeyError:
+            raise ValueError("Invalid move, not in get_moves()") from None
+        if action is None:
+            raise ValueError(
+                "Invalid move, sequence moves to empty columns have no action"
+            )
+        return action
+
+    def action_to_move(self, action: int) -> tuple:
+        """Translate a possible action to its move.
+
+        :param action: An action returned by get_actions.
+        :return: The move tuple of the action.
+        :raises ValueError: If the action is not possible.
+        """
+        try:
+            return self.__legal_actions()[action]
+        except KeyError:
+            raise ValueError("Invalid action, not in get_actions()") from None
+
+    def __legal_moves(self) -> dict:
+        """
+        Returns the cached possible moves mapped to their actions, building
+        them first if the board changed.
+        """
+        if self.__moves is None:
+            self.__update_links()
+            self.__moves = self.__list_moves()
+            self.__actions = None
+        return self.__moves
+
+    def __legal_actions(self) -> dict:
+        """
+        Returns the cached possible actions mapped to their moves.
+        """
+        moves = self.__legal_moves()
+        if self.__actions is None:
+            self.__actions = {
+                action: move for move, action in moves.items() if action is not None
+            }
+        return self.__actions
+
+    def __update_links(self) -> None:
+        """
+        Updates the placements of the cards on top of the columns and in the
+        free cells: bit j of self.__links[slot] is set if the card in the slot
+        can be put on column j. Only the rows of the touched slots and the
+        bits of the touched columns are recomputed.
+        """
+        tops = [col[-1] if col else None for col in self.columns] + self.free_cells
+        if self.__dirty is None:
+            self.__links = [0] * len(tops)
+            dirty = range(len(tops))
+        else:
+            dirty = self.__dirty
+
+        links = self.__links
+        for slot in dirty:
+            card = tops[slot]
+            row = 0
+            if card is not None:
+                for column, top in enumerate(tops[:FREE_CELL_SLOT]):
+                    if top is not None and card.is_smaller_and_different_color(top):
+                        row |= 1 << column
+            links[slot] = row
+
+            if slot < FREE_CELL_SLOT:
+                top = tops[slot]
+                bit = 1 << slot
+                for source, card in enumerate(tops):
+                    if (
+                        top is not None
+                        and card is not None
+                        and card.is_smaller_and_different_color(top)
+                    ):
+                        links[source] |= bit
+                    else:
+                        links[source] &= ~bit
+
+        self.__dirty = set()
+
+    def __list_moves(self) -> dict:
+        """
+        Lists the moves in the order of the original full scan: moves to
+        empty columns, to free cells, then from free cells and from columns
+        to the suit stacks and onto other cards.
+
+        Returns:
+            dict: The moves mapped to their actions.
+        """
+        moves = dict()
+        names = [col[-1].name if col else None for col in self.columns]
+        names += [card.name if card else None for card in self.free_cells]
+        sources = list(range(FREE_CELL_SLOT, len(names))) + list(range(FREE_CELL_SLOT))
+
+        # Moves onto empty columns
+        if [] in self.columns:
+            empty_column = self.columns.index([])
+            for slot in sources:
+                if names[slot]:
+                    moves[(names[slot], Move.EMPTY_COLUMN.value)] = encode_action(
+                        slot, empty_column
+                    )
+
+        # Moves from the top of columns to a free cell
+        if None in self.free_cells:
+            free_cell = FREE_CELL_SLOT + self.free_cells.index(None)
+            for slot, name in enumerate(names[:FREE_CELL_SLOT]):
+                if name:
+                    moves[(name, Move.FREECELL.value)] = encode_action(slot, free_cell)
+
+        for slot in sources:
+            if names[slot]:
+                self.__list_moves_from(slot, names, moves)
+
+        if self.supermoves:
+            self.__list_sequence_moves(moves)
+        return moves
+
+    def __list_moves_from(self, slot: int, names: list, moves: dict) -> None:
+        """
+        Adds the moves of the card on top of a column or in a free cell to
+        its suit stack and onto other columns.
+
+        Args:
+            slot (int): The slot of the card.
+            names (list): The names of the cards on top of every slot, None
+                for empty slots.
+            moves (dict): The moves mapped to their actions to add to.
+        """
+        if slot < FREE_CELL_SLOT:
+            card = self.columns[slot][-1]
+        else:
+            card = self.free_cells[slot - FREE_CELL_SLOT]
+
+        # Moves to the suit stacks
+        if card.is_larger_and_same_suit(self.suit_stack[card.suit]):
+            moves[(names[slot], Move.SUIT_STACK.value)] = encode_action(
+                slot, SUIT_STACK_SLOT
+            )
+
+        # Moves onto other columns
+        row = self.__links[slot]
+        column = 0
+        while row:
+            if row & 1:
+                moves[(names[slot], names[column])] = encode_action(slot, column)
+            row >>= 1
+            column += 1
+
+    def __list_sequence_moves(self, moves: dict) -> None:
+        """
+        Adds the moves of sequences of two or more cards from the top of the
+        columns onto other columns and to an empty column. A move to an empty
+        column has no action, since the action would not tell how many cards
+        to move.
+
+        Args:
+            moves (dict): The moves mapped to their actions to add to.
+        """
+        to_card = self.max_sequence_length()
+        to_empty = self.max_sequence_length(True) if [] in self.columns else 0
+        tops = [col[-1] if col else None for col in self.columns]
+
+        for source, column in enumerate(self.columns):
+            if len(column) < 2:
+                continue
+            start = max(
+                self.__sequence_start(source), len(column) - max(to_card, to_empty)
+            )
+            for depth in range(len(column) - 2, start - 1, -1):
+                card = column[depth]
+                count = len(column) - depth
+                if count <= to_empty:
+                    moves[(card.name, Move.EMPTY_COLUMN.value)] = None
+                if count <= to_card:
+                    for destination, top in enumerate(tops):
+                        if top is not None and card.is_smaller_and_different_color(top):
+                            moves[(card.name, top.name)] = encode_action(
+                                source, destination
+                            )
+
+    def make_move(self, move: tuple) -> bool:
+        """Execute a move given in the (card, destination) notation.
+
+        The move is not validated against get_moves, the caller is
+        responsible for that.
+
+        :param move: A move tuple as returned by get_moves.
+        :return: True if the move was successful, False otherwise.
+        """
+        card = self.find_card_from_string(move[0])
+        if card is None:
+            return self.supermoves and self.__make_sequence_move(move)
+        match move[1]:
+            case Move.FREECELL.value:
+                return self.move_to_free_cell(card)
+            case Move.SUIT_STACK.value:
+                return self.move_to_stack(card)
+            case Move.EMPTY_COLUMN.value:
+                return self.move_to_free_column(card)
+            case _:
+                return self.move_to_card(card, self.find_card_from_string(move[1]))
+
+    def __make_sequence_move(self, move: tuple) -> bool:
+        """
+        Executes a move of a sequence of cards, named by its bottom card.
+
+        Args:
+            move (tuple): The move in the (card, destination) notation.
+
+        Returns:
+            bool: True if the move was successful, False otherwise.
+        """
+        card = CARDS_BY_NAME.get(move[0])
+        if card is None:
+            return False
+        match move[1]:
+            case Move.EMPTY_COLUMN.value:
+                return self.move_sequence_to_free_column(card)
+            case Move.FREECELL.value | Move.SUIT_STACK.value:
+                return False
+            case _:
+                destination_card = self.find_card_from_string(move[1])
+                if destination_card is None:
+                    return False
+                return self.move_sequence_to_card(card, destination_card)
+
+    def make_action(self, action: int) -> bool:
+        """Execute a move given as an action, see game.Action.
+
+        The action is not validated against get_actions, the caller is
+        responsible for that. A move from a column onto another column moves
+        as many cards as needed to reach the card fitting on the destination.
+
+        :param action: An action as returned by get_actions.
+        :return: True if the move was successful, False otherwise.
+        """
+        source, destination = decode_action(action)
+        if (
+            source < FREE_CELL_SLOT
+            and destination < FREE_CELL_SLOT
+            and self.columns[source]
+            and self.columns[destination]
+        ):
+            count = self.columns[destination][-1].rank - self.columns[source][-1].rank
+            if 1 < count <= len(self.columns[source]):
+                return self.__move_sequence(source, destination, count)
+
+        if source >= FREE_CELL_SLOT:
+            card = self.free_cells[source - FREE_CELL_SLOT]
+            if card is None:
+                return False
+            self.free_cells[source - FREE_CELL_SLOT] = None
+        else:
+            if not self.columns[source]:
+                return False
+            card = self.__own(source).pop()
+
+        previous = None
+        if destination == SUIT_STACK_SLOT:
+            previous = self.suit_stack[card.suit]
+            self.suit_stack[card.suit] = card
+        elif destination >= FREE_CELL_SLOT:
+            self.free_cells[destination - FREE_CELL_SLOT] = card
+        else:
+            self.__own(destination).append(card)
+
+        self.__record(card, source, destination, previous)
+        return True
+
+    def is_solved(self) -> bool:
+        """Check whether every suit stack holds its king.
+
+        :return: True if all cards are on the suit stacks, False otherwise.
+        """
+        for card in self.suit_stack.values():
+            if card is None or card.rank != 13:
+                return False
+        return True
+
     def find_card_from_string(self, card_string: str) -> Card:
         """Find a card from a string.
 
@@ -121,13 +861,12 @@ class Board:
         :return: A Card object if it is at the top of any column
         or free cells, else None.
         """
-        for column in self.columns:
-            if column and str(column[-1]) == card_string:
-                return column[-1]
-        for card in self.free_cells:
-            if card and str(card) == card_string:
-                return card
-        return None
+        card = CARDS_BY_NAME.get(card_string)
+        if card is None:
+            return None
+        if self.__is_on_top(card) is None and self.__in_free_cell(card) is None:
+            return None
+        return card
 
     def move_to_stack(self, card: Card) -> bool:
         """
@@ -139,21 +878,28 @@ class Board:
         Returns:
             bool: True if the move was successful, False otherwise.
         """
-        if card in self.free_cells:
-            if card.is_larger_and_same_suit(self.suit_stack[card.suit]):
+        previous = self.suit_stack[card.suit]
+
+        cell_index = self.__in_free_cell(card)
+        if cell_index is not None:
+            if card.is_larger_and_same_suit(previous):
                 self.suit_stack[card.suit] = card
-                self.free_cells[self.free_cells.index(card)] = None
+                self.free_cells[cell_index] = None
+                self.__record(
+                    card, FREE_CELL_SLOT + cell_index, SUIT_STACK_SLOT, previous
+                )
                 return True
             return False
 
-        col = self.__is_on_top(card)
+        col_index = self.__is_on_top(card)
 
-        if not col:
+        if col_index is None:
             return False
 
-        if card.is_larger_and_same_suit(self.suit_stack[card.suit]):
+        if card.is_larger_and_same_suit(previous):
             self.suit_stack[card.suit] = card
-            col.pop()
+            self.__own(col_index).pop()
+            self.__record(card, col_index, SUIT_STACK_SLOT, previous)
             return True
 
         return False
@@ -169,16 +915,17 @@ class Board:
             bool: True if the move was successful, False otherwise.
         """
 
-        col = self.__is_on_top(card)
+        col_index = self.__is_on_top(card)
 
-        if not col:
+        if col_index is None:
             return False
 
         if self.free_cells.count(None) > 0:
             for i in range(len(self.free_cells)):
                 if self.free_cells[i] is None:
                     self.free_cells[i] = card
-                    col.pop()
+                    self.__own(col_index).pop()
+                    self.__record(card, col_index, FREE_CELL_SLOT + i)
                     return True
 
     def move_to_free_column(self, card: Card) -> bool:
@@ -195,32 +942,16 @@ class Board:
         if self.columns.count([]) < 1:
             return False
 
-        if card in self.free_cells:
+        if self.__in_free_cell(card) is not None:
             return self.__move_card_from_free_cell_to_empty_column(card)
 
-        source_col = self.__is_on_top(card)
-        if source_col == []:
+        source_index = self.__is_on_top(card)
+        if source_index is None:
             return False
-        dest_col = next(col for col in self.columns if not col)
+        dest_index = next(i for i, col in enumerate(self.columns) if not col)
 
-        dest_col.append(source_col.pop())
-        return True
-
-    def __move_card_from_free_cell_to_card(
-        self, card_to_move: Card, destination_card: Card
-    ) -> bool:
-        self.columns[
-            next(i for i, col in enumerate(self.columns) if destination_card in col)
-        ].append(card_to_move)
-
-        self.free_cells[self.free_cells.index(card_to_move)] = None
-        return True
-
-    def __move_card_from_free_cell_to_empty_column(self, card_to_move: Card) -> bool:
-        self.columns[next(i for i, col in enumerate(self.columns) if not col)].append(
-            card_to_move
-        )
-        self.free_cells[self.free_cells.index(card_to_move)] = None
+        self.__own(dest_index).append(self.__own(source_index).pop())
+        self.__record(card, source_index, dest_index)
         return True
 
     def move_to_card(self, card_to_move: Card, destination_card: Card) -> bool:
@@ -236,16 +967,287 @@ class Board:
         """
         if card_to_move.is_smaller_and_different_color(destination_card):
             # Check if card is in free cell
-            if card_to_move in self.free_cells:
+            if self.__in_free_cell(card_to_move) is not None:
                 return self.__move_card_from_free_cell_to_card(
                     card_to_move, destination_card
                 )
 
-            dest_column = self.__is_on_top(destination_card)
-            source_column = self.__is_on_top(card_to_move)
+            dest_index = self.__is_on_top(destination_card)
+            source_index = self.__is_on_top(card_to_move)
 
-            if dest_column and source_column:
-                dest_column.append(source_column.pop())
+            if dest_index is not None and source_index is not None:
+                self.__own(dest_index).append(self.__own(source_index).pop())
+                self.__record(card_to_move, source_index, dest_index)
                 return True  # Move successful
 
         return False
+
+    def autoplay(self) -> list:
+        """
+        Moves all cards which are safe to move to the suit stacks, until no
+        such card is left on top of the columns or in the free cells.
+
+        A card is safe to move if it can never be needed to hold another
+        card: it is an ace or a two, or both suit stacks of the other color
+        hold the card one rank smaller.
+
+        Returns:
+            list: The executed moves, each recorded separately in history.
+        """
+        moves = []
+        moved = True
+        while moved:
+            moved = False
+            cards = self.get_movable_cards() + [c for c in self.free_cells if c]
+            for card in cards:
+                if self.__is_safe(card) and self.move_to_stack(card):
+                    moves.append((card.name, Move.SUIT_STACK.value))
+                    moved = True
+        return moves
+
+    def __is_safe(self, card: Card) -> bool:
+        """
+        Checks if a card can be moved to its suit stack without ever needing
+        it again, see autoplay.
+        """
+        if not card.is_larger_and_same_suit(self.suit_stack[card.suit]):
+            return False
+        if card.rank <= 2:
+            return True
+        for suit in SUITS:
+            top = self.suit_stack[suit]
+            if (suit in ("h", "d")) != card.color:
+                if top is None or top.rank < card.rank - 1:
+                    return False
+        return True
+
+    def max_sequence_length(self, to_empty_column: bool = False) -> int:
+        """
+        Returns the number of cards that can be moved at once, using the free
+        cells and the empty columns to hold the cards in between.
+
+        Args:
+            to_empty_column (bool): True for a move to an empty column, which
+                can not be used to hold the cards.
+
+        Returns:
+            int: (free cells + 1) * 2 ** (empty columns).
+        """
+        empty_columns = self.columns.count([]) - to_empty_column
+        return (self.free_cells.count(None) + 1) << max(empty_columns, 0)
+
+    def move_sequence_to_card(self, card: Card, destination_card: Card) -> bool:
+        """
+        Attempts to move a card together with the cards on top of it to
+        another card.
+
+        Args:
+            card (Card): The bottom card of the sequence to be moved.
+            destination_card (Card): The card where the move is attempted.
+
+        Returns:
+            bool: True if the move was successful, False otherwise.
+        """
+        location = self.__sequence_location(card, False)
+        dest_index = self.__is_on_top(destination_card)
+        if (
+            location is None
+            or dest_index is None
+            or not card.is_smaller_and_different_color(destination_card)
+        ):
+            return False
+        _, source, depth = location
+        return self.__move_sequence(
+            source, dest_index, len(self.columns[source]) - depth
+        )
+
+    def move_sequence_to_free_column(self, card: Card) -> bool:
+        """
+        Attempts to move a card together with the cards on top of it to an
+        empty column.
+
+        Args:
+            card (Card): The bottom card of the sequence to be moved.
+
+        Returns:
+            bool: True if the move was successful, False otherwise.
+        """
+        if [] not in self.columns:
+            return False
+        location = self.__sequence_location(card, True)
+        if location is None:
+            return False
+        _, source, depth = location
+        return self.__move_sequence(
+            source, self.columns.index([]), len(self.columns[source]) - depth
+        )
+
+    def __sequence_start(self, column: int) -> int:
+        """
+        Finds the bottom of the sequence on top of a column, in which every
+        card is one rank smaller and of a different color than the card below.
+
+        Args:
+            column (int): The index of a non-empty column.
+
+        Returns:
+            int: The depth of the bottom card of the sequence.
+        """
+        col = self.columns[column]
+        depth = len(col) - 1
+        while depth > 0 and col[depth].is_smaller_and_different_color(col[depth - 1]):
+            depth -= 1
+        return depth
+
+    def __sequence_location(self, card: Card, to_empty_column: bool) -> tuple:
+        """
+        Finds a card which is the bottom of a sequence that can be moved.
+
+        Args:
+            card (Card): The bottom card of the sequence.
+            to_empty_column (bool): True for a move to an empty column.
+
+        Returns:
+            tuple: The location of the card, see locate, or None if it is not
+                in a column or the cards above it can not be moved with it.
+        """
+        location = self.locate(card)
+        if location is None or location[0] != Zone.COLUMN:
+            return None
+        _, column, depth = location
+        count = len(self.columns[column]) - depth
+        if depth < self.__sequence_start(column):
+            return None
+        if count > self.max_sequence_length(to_empty_column):
+            return None
+        return location
+
+    def __move_sequence(self, source: int, destination: int, count: int) -> bool:
+        """
+        Moves cards from the top of a column to another column.
+
+        Args:
+            source (int): The column to take the cards from.
+            destination (int): The column to put the cards to.
+            count (int): The number of cards.
+
+        Returns:
+            bool: True, the move was made.
+        """
+        column = self.__own(source)
+        card = column[-count]
+        self.__own(destination).extend(column[-count:])
+        del column[-count:]
+        self.__record(card, source, destination, count=count)
+        return True
+
+    def undo_move(self) -> bool:
+        """
+        Reverts the last move executed by any of the move_to_* methods.
+
+        Returns:
+            bool: True if a move was reverted, False if there is nothing to undo.
+        """
+        if not self.history:
+            return False
+
+        card, source, destination, previous, count = self.history.pop()
+
+        cards = [card]
+        if destination == SUIT_STACK_SLOT:
+            self.suit_stack[card.suit] = previous
+        elif destination >= FREE_CELL_SLOT:
+            self.free_cells[destination - FREE_CELL_SLOT] = None
+        else:
+            cards = self.columns[destination][-count:]
+            del self.__own(destination)[-count:]
+
+        if source >= FREE_CELL_SLOT:
+            self.free_cells[source - FREE_CELL_SLOT] = card
+        else:
+            self.__own(source).extend(cards)
+
+        self.__moved(cards, destination, source, previous)
+        return True
+
+    def locate(self, card: Card) -> tuple:
+        """
+        Finds where a card is on the board in constant time.
+
+        The locations are computed on the first call and then updated by
+        every move and undo. A location made stale by modifying the board in
+        place is detected and all locations are computed again.
+
+        Args:
+            card (Card): The card to find.
+
+        Returns:
+            tuple: The Zone of the card, the slot within the zone and the depth
+                in the slot, or None if the card is not on the board. The slot
+                is the index of the column, of the free cell or of the suit in
+                Card.SUITS. The depth counts from the bottom of a column or of
+                a suit stack and is 0 in a free cell.
+        """
+        if self.__locations is None:
+            self.__locations = self.__build_locations()
+        location = self.__locations[card.index]
+        if location is None or not self.__holds(location, card):
+            self.__locations = self.__build_locations()
+            location = self.__locations[card.index]
+        return location
+
+    def is_on_top(self, card: Card) -> bool:
+        """
+        Checks if a card is on top of a column.
+
+        Args:
+            card (Card): The card to check.
+
+        Returns:
+            bool: True if the card is the last card of a column.
+        """
+        return self.__is_on_top(card) is not None
+
+    def zobrist_hash(self) -> int:
+        """
+        Returns a 64-bit hash of the position which does not depend on the
+        order of the columns and of the free cells.
+
+        The hash is computed on the first call and then updated
+        incrementally by every move and undo.
+
+        Returns:
+            int: The hash of the position.
+        """
+        if self.__column_hashes is None:
+            self.__column_hashes = [
+                column_hash(card.index for card in col) for col in self.columns
+            ]
+            self.__column_sum = sum(mix(value) for value in self.__column_hashes) & MASK
+            self.__cell_hash = cell_hash(
+                card.index for card in self.free_cells if card is not None
+            )
+            self.__stack_hash = stack_hash(
+                0 if self.suit_stack[suit] is None else self.suit_stack[suit].rank
+                for suit in SUITS
+            )
+        return self.__column_sum ^ self.__cell_hash ^ self.__stack_hash
+
+    def canonical_key(self) -> tuple:
+        """
+        Returns a key identifying the position regardless of the order of
+        the columns and of the free cells. Unlike zobrist_hash it can not
+        collide, but has to be built from scratch on every call.
+
+        Returns:
+            tuple: The sorted columns and free cells as bytes of card indices,
+                and the ranks on top of the suit stacks.
+        """
+        return (
+            tuple(sorted(bytes(card.index for card in col) for col in self.columns)),
+            bytes(sorted(card.index for card in self.free_cells if card is not None)),
+            bytes(
+                0 if self.suit_stack[suit] is None else self.suit_stack[suit].rank
+                for suit in SUITS
+            ),
+        )
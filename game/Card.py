@@ -1,3 +1,7 @@
+# The order of the suits used for card indices, the same as in Deck.
+SUITS = ("h", "d", "c", "s")
+
+
 class Card:
     """
     Represents a playing card with a rank, suit, and color.
@@ -10,6 +14,14 @@ class Card:
         rank (int): The rank of the card.
         suit (str): The suit of the card.
         color (bool): True if the card's suit is red (hearts or diamonds), False otherwise.
+        index (int): A unique number of the card in range 0..51, suit index * 13 + rank - 1.
+        name (str): The short name of the card, e.g. 'Th', returned by str.
+        long_name (str): The long name of the card, e.g. 'T of h', returned by repr.
+
+    There is a single instance of every card: calling Card with the rank and
+    suit of an existing card returns that card, also when unpickling or copying.
+    Cards are therefore equal only if they are the same object, or to a string
+    holding their name.
 
     Methods:
         is_smaller_and_different_color(self, other: Card) -> bool:
@@ -23,7 +35,11 @@ class Card:
             Compares the card with another card based on rank and suit.
 
         __eq__(self, other: object) -> bool:
-            Checks if the card is equal to another card or None.
+            Checks if the card is the same card as another card or its name.
+
+        __hash__(self) -> int:
+            Returns the hash of the name of the card, so a card and its name
+            find each other in sets and dicts.
 
         __repr__(self) -> str:
             Returns a string representation of the card.
@@ -33,12 +49,29 @@ class Card:
 
     """
 
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        self.color = suit in ["h", "d"]
+    __slots__ = ("rank", "suit", "color", "index", "name", "long_name")
+
+    rank_to_value = {1: "A", 10: "T", 11: "J", 12: "Q", 13: "K"}
 
-        self.rank_to_value = {1: "A", 10: "T", 11: "J", 12: "Q", 13: "K"}
+    # The interned cards by (rank, suit)
+    __cards = {}
+
+    def __new__(cls, rank, suit):
+        card = cls.__cards.get((rank, suit))
+        if card is not None:
+            return card
+
+        index = SUITS.index(suit) * 13 + rank - 1
+        value = cls.rank_to_value.get(rank, str(rank))
+        card = super().__new__(cls)
+        card.rank = rank
+        card.suit = suit
+        card.color = suit in ["h", "d"]
+        card.index = index
+        card.name = f"{value}{suit}"
+        card.long_name = f"{value} of {suit}"
+        cls.__cards[(rank, suit)] = card
+        return card
 
     def is_smaller_and_different_color(self, other: object) -> bool:
         """Checks if the card is one rank smaller and of a different color than another card.
@@ -71,20 +104,21 @@ class Card:
         return self.rank <= other.rank and self.suit == other.suit
 
     def __eq__(self, other):
-        if other is None:
-            return False
+        if other is self:
+            return True
         if isinstance(other, str):
-            return str(self) == other
+            return self.name == other
+        return False
+
+    def __hash__(self) -> int:
+        # Equal to the hash of the name, as cards compare equal to their name
+        return hash(self.name)
 
-        return self.rank == other.rank and self.suit == other.suit
+    def __reduce__(self):
+        return (Card, (self.rank, self.suit))
 
     def __repr__(self):
-        if self.rank in self.rank_to_value:
-            return f"{self.rank_to_value[self.rank]} of {self.suit}"
-        return f"{self.rank} of {self.suit}"
+        return self.long_name
 
     def __str__(self) -> str:
-        if self.rank in self.rank_to_value:
-            return f"{self.rank_to_value[self.rank]}{self.suit}"
-        else:
-            return f"{self.rank}{self.suit}"
+        return self.name
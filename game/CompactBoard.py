@@ -0,0 +1,800 @@
+from array import array
+
+from game.Action import FREE_CELL_SLOT, SUIT_STACK_SLOT, decode_action, encode_action
+from game.Card import SUITS, Card
+from game.Move import Move
+from game.Zobrist import (
+    CELL_KEYS,
+    COLUMN_KEYS,
+    MASK,
+    STACK_KEYS,
+    cell_hash,
+    column_hash,
+    mix,
+    stack_hash,
+)
+
+# Cards are encoded as their Card.index, an integer 0..51.
+EMPTY = 0xFF
+
+CARD_RANK = bytes(card % 13 + 1 for card in range(52))
+CARD_SUIT = bytes(card // 13 for card in range(52))
+CARD_RED = tuple(SUITS[card // 13] in ("h", "d") for card in range(52))
+CARDS = tuple(Card(card % 13 + 1, SUITS[card // 13]) for card in range(52))
+CARD_NAME = tuple(card.name for card in CARDS)
+CARD_ID = {name: card for card, name in enumerate(CARD_NAME)}
+
+# CARD_PARENTS[card] holds the cards it can be placed on in a column.
+CARD_PARENTS = tuple(
+    frozenset(
+        parent
+        for parent in range(52)
+        if CARD_RANK[parent] == CARD_RANK[card] + 1
+        and CARD_RED[parent] != CARD_RED[card]
+    )
+    for card in range(52)
+)
+
+
+def encode_card(card: Card) -> int:
+    """
+    Encodes a card as an integer in range 0..51.
+
+    Args:
+        card (Card): The card to encode.
+
+    Returns:
+        int: The integer code of the card.
+    """
+    return card.index
+
+
+def decode_card(card: int) -> Card:
+    """
+    Decodes an integer produced by encode_card back into a card.
+
+    Args:
+        card (int): The integer code of the card, or EMPTY.
+
+    Returns:
+        Card: The decoded card, or None for EMPTY.
+    """
+    if card == EMPTY:
+        return None
+    return CARDS[card]
+
+
+class CompactBoard:
+    """
+    Represents a FreeCell game board with integer encoded cards.
+
+    A drop-in replacement for Board which keeps the columns as bytearrays of
+    card codes, the free cells as a bytearray with EMPTY marking an empty
+    cell, and the suit stacks as a bytearray of ranks. get_moves and
+    make_move behave exactly like their Board counterparts.
+
+    Args:
+        cards (list): A list of card objects or card codes to initialize
+            the game board.
+        supermoves (bool): Also generate moves of sequences of cards.
+
+    Attributes:
+        cols (list of bytearray): The columns on the board.
+        cells (bytearray): The free cells, each holding a card code or EMPTY.
+        foundations (bytearray): The rank on top of the suit stack of each
+            suit, 0 for an empty stack.
+        history (array): The executed moves, each packed into an integer as
+            card | source << 6 | destination << 10 | (count - 1) << 14 with
+            slots numbered as in Board, used by undo_move. card is the bottom
+            card of the count moved cards.
+        supermoves (bool): True if get_moves also returns moves of sequences
+            of cards, as in Board.
+
+    Properties:
+        columns, free_cells, suit_stack: Card based views of the board in the
+            same shape as the attributes of Board.
+
+    The attributes may be modified directly, but reset_cache has to be called
+    afterwards. The columns of a board which was copied with copy must not be
+    modified in place, only assigned.
+    """
+
+    def __init__(self, cards: list, supermoves: bool = False) -> None:
+        codes = bytes(
+            card if isinstance(card, int) else encode_card(card) for card in cards
+        )
+        self.cols = []
+        self.cells = bytearray([EMPTY] * 4)
+        self.foundations = bytearray(4)
+        self.supermoves = supermoves
+        self.history = array("I")
+        self.__shared = set()
+        self.reset_cache()
+
+        start = 0
+        for num_cards in [6] * 4 + [7] * 4:
+            self.cols.append(bytearray(codes[start : start + num_cards]))
+            start += num_cards
+
+    @property
+    def columns(self) -> list:
+        return [[decode_card(card) for card in col] for col in self.cols]
+
+    @property
+    def free_cells(self) -> list:
+        return [decode_card(card) for card in self.cells]
+
+    @property
+    def suit_stack(self) -> dict:
+        return {
+            suit: Card(rank, suit) if rank else None
+            for suit, rank in zip(SUITS, self.foundations)
+        }
+
+    def empty_cells(self) -> int:
+        """
+        Returns the number of empty cells in the columns and free cells.
+
+        Returns:
+            int: The number of empty cells.
+        """
+        return self.cells.count(EMPTY) + sum(1 for col in self.cols if not col)
+
+    def get_moves(self) -> list:
+        """Get all possible moves from the current board state.
+
+        The moves are cached until the board changes.
+
+        :return: A list of moves in the notation described in
+            FreeCell.get_moves, in the same order as Board.get_moves.
+        """
+        return list(self.__legal_moves())
+
+    def has_moves(self) -> bool:
+        """Check whether any move is possible, without listing the moves, see
+        Board.has_moves.
+
+        :return: True if get_moves is not empty.
+        """
+        if self.__moves is not None:
+            return bool(self.__moves)
+
+        tops = [col[-1] for col in self.cols if col]
+        cards = tops + [card for card in self.cells if card != EMPTY]
+        if not cards:
+            return False
+        if len(tops) < len(self.cols) or (tops and EMPTY in self.cells):
+            return True
+        foundations = self.foundations
+        for card in cards:
+            if CARD_RANK[card] == foundations[CARD_SUIT[card]] + 1:
+                return True
+            if not CARD_PARENTS[card].isdisjoint(tops):
+                return True
+        return False
+
+    def get_pruned_moves(self) -> list:
+        """Get the possible moves without those a search never needs, see
+        Board.get_pruned_moves.
+
+        :return: A list of moves in the order of get_moves.
+        """
+        moves = self.get_moves()
+        for move in moves:
+            if move[1] == Move.SUIT_STACK.value and self.__is_safe(CARD_ID[move[0]]):
+                return [move]
+
+        inverse = self.__inverse_of_last_move()
+        bottoms = {CARD_NAME[col[0]] for col in self.cols if col}
+        return [
+            move
+            for move in moves
+            if move != inverse
+            and not (move[1] == Move.EMPTY_COLUMN.value and move[0] in bottoms)
+        ]
+
+    def __inverse_of_last_move(self) -> tuple:
+        """
+        Returns the move putting the card moved last back to where it was
+        taken from, or None if there is no such move.
+        """
+        if not self.history:
+            return None
+        entry = self.history[-1]
+        card, source, destination = entry & 0x3F, entry >> 6 & 0xF, entry >> 10 & 0xF
+        if destination == SUIT_STACK_SLOT:
+            return None
+        if source >= FREE_CELL_SLOT:
+            return (CARD_NAME[card], Move.FREECELL.value)
+        if not self.cols[source]:
+            return (CARD_NAME[card], Move.EMPTY_COLUMN.value)
+        return (CARD_NAME[card], CARD_NAME[self.cols[source][-1]])
+
+    def is_valid_move(self, move: tuple) -> bool:
+        """Check whether a move is returned by get_moves.
+
+        :param move: A move tuple.
+        :return: True if the move can be made, False otherwise.
+        """
+        return move in self.__legal_moves()
+
+    def get_actions(self) -> list:
+        """Get the actions of all possible moves, see game.Action.
+
+        Moves of sequences to empty columns have no action.
+
+        :return: A list of actions in the order of get_moves.
+        """
+        return list(self.__legal_actions())
+
+    def is_valid_action(self, action: int) -> bool:
+        """Check whether an action is returned by get_actions.
+
+        :param action: An action.
+        :return: True if the action can be made, False otherwise.
+        """
+        return action in self.__legal_actions()
+
+    def move_to_action(self, move: tuple) -> int:
+        """Translate a possible move to its action.
+
+        :param move: A move tuple returned by get_moves.
+        :return: The action of the move.
+        :raises ValueError: If the move is not possible or has no action.
+        """
+        try:
+            action = self.__legal_moves()[move]
+        except KeyError:
+            raise ValueError("Invalid move, not in get_moves()") from None
+        if action is None:
+            raise ValueError(
+                "Invalid move, sequence moves to empty columns have no action"
+            )
+        return action
+
+    def action_to_move(self, action: int) -> tuple:
+        """Translate a possible action to its move.
+
+        :param action: An action returned by get_actions.
+        :return: The move tuple of the action.
+        :raises ValueError: If the action is not possible.
+        """
+        try:
+            return self.__legal_actions()[action]
+        except KeyError:
+            raise ValueError("Invalid action, not in get_actions()") from None
+
+    def __legal_moves(self) -> dict:
+        if self.__moves is None:
+            self.__moves = self.__list_moves()
+            self.__actions = None
+        return self.__moves
+
+    def __legal_actions(self) -> dict:
+        moves = self.__legal_moves()
+        if self.__actions is None:
+            self.__actions = {
+                action: move for move, action in moves.items() if action is not None
+            }
+        return self.__actions
+
+    def __list_moves(self) -> dict:
+        """
+        Lists the moves in the same order as Board.get_moves. Instead of
+        checking every pair of cards, the cards a card can be put on are
+        looked up among the tops of the columns.
+
+        Returns:
+            dict: The moves mapped to their actions.
+        """
+        moves = dict()
+        foundations = self.foundations
+        tops = [(i, col[-1]) for i, col in enumerate(self.cols) if col]
+        columns = {card: i for i, card in tops}
+        cells = [
+            (FREE_CELL_SLOT + i, card)
+            for i, card in enumerate(self.cells)
+            if card != EMPTY
+        ]
+
+        # Moves onto empty columns
+        if len(tops) < len(self.cols):
+            empty_column = next(i for i, col in enumerate(self.cols) if not col)
+            for slot, card in cells + tops:
+                moves[(CARD_NAME[card], "0")] = encode_action(slot, empty_column)
+
+        # Moves from the top of columns to a free cell
+        if len(cells) < len(self.cells):
+            free_cell = FREE_CELL_SLOT + self.cells.index(EMPTY)
+            for slot, card in tops:
+                moves[(CARD_NAME[card], "F")] = encode_action(slot, free_cell)
+
+        for sources in (cells, tops):
+            for slot, card in sources:
+                if CARD_RANK[card] == foundations[CARD_SUIT[card]] + 1:
+                    moves[(CARD_NAME[card], "S")] = encode_action(slot, SUIT_STACK_SLOT)
+
+                destinations = [
+                    columns[parent]
+                    for parent in CARD_PARENTS[card]
+                    if parent in columns
+                ]
+                for destination in sorted(destinations):
+                    move = (CARD_NAME[card], CARD_NAME[self.cols[destination][-1]])
+                    moves[move] = encode_action(slot, destination)
+
+        if self.supermoves:
+            self.__list_sequence_moves(moves, columns)
+        return moves
+
+    def __list_sequence_moves(self, moves: dict, columns: dict) -> None:
+        """
+        Adds the moves of sequences of two or more cards in the same order as
+        Board.get_moves.
+
+        Args:
+            moves (dict): The moves mapped to their actions to add to.
+            columns (dict): The columns by the card on top of them.
+        """
+        to_card = self.max_sequence_length()
+        to_empty = self.max_sequence_length(True) if len(columns) < 8 else 0
+
+        for source, column in enumerate(self.cols):
+            if len(column) < 2:
+                continue
+            start = max(
+                self.__sequence_start(source), len(column) - max(to_card, to_empty)
+            )
+            for depth in range(len(column) - 2, start - 1, -1):
+                card = column[depth]
+                count = len(column) - depth
+                if count <= to_empty:
+                    moves[(CARD_NAME[card], "0")] = None
+                if count <= to_card:
+                    destinations = [
+                        columns[parent]
+                        for parent in CARD_PARENTS[card]
+                        if parent in columns
+                    ]
+                    for destination in sorted(destinations):
+                        move = (CARD_NAME[card], CARD_NAME[self.cols[destination][-1]])
+                        moves[move] = encode_action(source, destination)
+
+    def autoplay(self) -> list:
+        """
+        Moves all cards which are safe to move to the suit stacks, see
+        Board.autoplay.
+
+        Returns:
+            list: The executed moves, each recorded separately in history.
+        """
+        moves = []
+        moved = True
+        while moved:
+            moved = False
+            sources = [(i, col[-1]) for i, col in enumerate(self.cols) if col]
+            sources += [(FREE_CELL_SLOT + i, card) for i, card in enumerate(self.cells)]
+            for slot, card in sources:
+                if card != EMPTY and self.__is_safe(card):
+                    self.__take(slot, card)
+                    self.__put(SUIT_STACK_SLOT, card)
+                    self.history.append(card | slot << 6 | SUIT_STACK_SLOT << 10)
+                    moves.append((CARD_NAME[card], Move.SUIT_STACK.value))
+                    moved = True
+        return moves
+
+    def __is_safe(self, card: int) -> bool:
+        """
+        Checks if a card can be moved to its suit stack without ever needing
+        it again, see Board.autoplay.
+        """
+        foundations = self.foundations
+        rank = CARD_RANK[card]
+        if rank != foundations[CARD_SUIT[card]] + 1:
+            return False
+        if rank <= 2:
+            return True
+        red = CARD_RED[card]
+        return all(
+            foundations[suit] >= rank - 1 for suit in range(4) if (suit < 2) != red
+        )
+
+    def max_sequence_length(self, to_empty_column: bool = False) -> int:
+        """
+        Returns the number of cards that can be moved at once, see
+        Board.max_sequence_length.
+
+        Args:
+            to_empty_column (bool): True for a move to an empty column.
+
+        Returns:
+            int: (free cells + 1) * 2 ** (empty columns).
+        """
+        empty_columns = sum(1 for col in self.cols if not col) - to_empty_column
+        return (self.cells.count(EMPTY) + 1) << max(empty_columns, 0)
+
+    def __sequence_start(self, column: int) -> int:
+        """
+        Finds the depth of the bottom card of the sequence on top of a
+        non-empty column.
+        """
+        col = self.cols[column]
+        depth = len(col) - 1
+        while depth > 0 and col[depth - 1] in CARD_PARENTS[col[depth]]:
+            depth -= 1
+        return depth
+
+    def __make_sequence_move(self, card: int, destination: str) -> bool:
+        """
+        Executes a move of a sequence of cards, named by its bottom card.
+
+        Args:
+            card (int): The bottom card of the sequence.
+            destination (str): The destination in the notation of get_moves.
+
+        Returns:
+            bool: True if the move was successful, False otherwise.
+        """
+        source = next((i for i, col in enumerate(self.cols) if card in col), None)
+        if source is None:
+            return False
+        depth = self.cols[source].index(card)
+        if depth < self.__sequence_start(source):
+            return False
+
+        match destination:
+            case Move.EMPTY_COLUMN.value:
+                target = next((i for i, col in enumerate(self.cols) if not col), None)
+                if target is None:
+                    return False
+            case Move.FREECELL.value | Move.SUIT_STACK.value:
+                return False
+            case _:
+                target = self.__find_column(CARD_ID[destination])
+                if target is None or self.cols[target][-1] not in CARD_PARENTS[card]:
+                    return False
+
+        count = len(self.cols[source]) - depth
+        to_empty = destination == Move.EMPTY_COLUMN.value
+        if count > self.max_sequence_length(to_empty):
+            return False
+        self.__move_cards(source, target, count)
+        return True
+
+    def __move_cards(self, source: int, destination: int, count: int) -> None:
+        """
+        Moves cards from the top of a column to another column and records
+        the move.
+        """
+        cards = bytes(self.cols[source][-count:])
+        for card in reversed(cards):
+            self.__take(source, card)
+        for card in cards:
+            self.__put(destination, card)
+        self.history.append(
+            cards[0] | source << 6 | destination << 10 | (count - 1) << 14
+        )
+
+    def make_move(self, move: tuple) -> bool:
+        """Execute a move given in the (card, destination) notation.
+
+        Only the cards involved are checked, the moves are not listed, but
+        exactly the moves returned by get_moves succeed.
+
+        :param move: A move tuple as returned by get_moves.
+        :return: True if the move was successful, False otherwise.
+        """
+        card = CARD_ID[move[0]]
+        source = self.__find_column(card)
+        if source is None:
+            if card not in self.cells:
+                if self.supermoves:
+                    return self.__make_sequence_move(card, move[1])
+                return False
+            source = FREE_CELL_SLOT + self.cells.index(card)
+
+        match move[1]:
+            case Move.FREECELL.value:
+                if source >= FREE_CELL_SLOT or EMPTY not in self.cells:
+                    return False
+                destination = FREE_CELL_SLOT + self.cells.index(EMPTY)
+            case Move.SUIT_STACK.value:
+                if CARD_RANK[card] != self.foundations[CARD_SUIT[card]] + 1:
+                    return False
+                destination = SUIT_STACK_SLOT
+            case Move.EMPTY_COLUMN.value:
+                destination = next(
+                    (i for i, col in enumerate(self.cols) if not col), None
+                )
+                if destination is None:
+                    return False
+            case _:
+                destination = self.__find_column(CARD_ID[move[1]])
+                if (
+                    destination is None
+                    or self.cols[destination][-1] not in CARD_PARENTS[card]
+                ):
+                    return False
+
+        self.__take(source, card)
+        self.__put(destination, card)
+        self.history.append(card | source << 6 | destination << 10)
+        return True
+
+    def make_action(self, action: int) -> bool:
+        """Execute a move given as an action, see game.Action.
+
+        The action is not validated against get_actions, the caller is
+        responsible for that. A move from a column onto another column moves
+        as many cards as needed to reach the card fitting on the destination.
+
+        :param action: An action as returned by get_actions.
+        :return: True if the move was successful, False otherwise.
+        """
+        source, destination = decode_action(action)
+        if (
+            source < FREE_CELL_SLOT
+            and destination < FREE_CELL_SLOT
+            and self.cols[source]
+            and self.cols[destination]
+        ):
+            count = (
+                CARD_RANK[self.cols[destination][-1]] - CARD_RANK[self.cols[source][-1]]
+            )
+            if 1 < count <= len(self.cols[source]):
+                self.__move_cards(source, destination, count)
+                return True
+
+        if source >= FREE_CELL_SLOT:
+            card = self.cells[source - FREE_CELL_SLOT]
+            if card == EMPTY:
+                return False
+        elif self.cols[source]:
+            card = self.cols[source][-1]
+        else:
+            return False
+
+        self.__take(source, card)
+        self.__put(destination, card)
+        self.history.append(card | source << 6 | destination << 10)
+        return True
+
+    def undo_move(self) -> bool:
+        """
+        Reverts the last move executed by make_move.
+
+        Returns:
+            bool: True if a move was reverted, False if there is nothing to undo.
+        """
+        if not self.history:
+            return False
+
+        entry = self.history.pop()
+        source, destination = entry >> 6 & 0xF, entry >> 10 & 0xF
+        count = (entry >> 14) + 1
+        if count > 1:
+            cards = bytes(self.cols[destination][-count:])
+        else:
+            cards = bytes([entry & 0x3F])
+
+        for card in reversed(cards):
+            self.__take(destination, card)
+        for card in cards:
+            self.__put(source, card)
+        return True
+
+    def is_solved(self) -> bool:
+        """Check whether every suit stack holds its king.
+
+        :return: True if all cards are on the suit stacks, False otherwise.
+        """
+        return self.foundations.count(13) == 4
+
+    def reset_cache(self) -> None:
+        """
+        Drops the state derived from the cards on the board, has to be called
+        after modifying cols, cells or foundations directly.
+        """
+        self.__column_hashes = None
+        self.__moves = None
+
+    def zobrist_hash(self) -> int:
+        """
+        Returns a 64-bit hash of the position, equal to Board.zobrist_hash of
+        the same position.
+
+        The hash is computed on the first call and then updated
+        incrementally by every move and undo.
+
+        Returns:
+            int: The hash of the position.
+        """
+        if self.__column_hashes is None:
+            self.__column_hashes = [column_hash(col) for col in self.cols]
+            self.__column_sum = sum(mix(value) for value in self.__column_hashes) & MASK
+            self.__cell_hash = cell_hash(card for card in self.cells if card != EMPTY)
+            self.__stack_hash = stack_hash(self.foundations)
+        return self.__column_sum ^ self.__cell_hash ^ self.__stack_hash
+
+    def canonical_key(self) -> tuple:
+        """
+        Returns a key identifying the position regardless of the order of
+        the columns and of the free cells, equal to Board.canonical_key of
+        the same position.
+
+        Returns:
+            tuple: The sorted columns and free cells as bytes of card codes,
+                and the ranks on top of the suit stacks.
+        """
+        return (
+            tuple(sorted(bytes(col) for col in self.cols)),
+            bytes(sorted(card for card in self.cells if card != EMPTY)),
+            bytes(self.foundations),
+        )
+
+    def get_position(self) -> tuple:
+        """
+        Returns the cards on the board as card codes, see
+        Board.get_position.
+
+        Returns:
+            tuple: The columns as bytes, the free cells as bytes with EMPTY
+                for empty cells, and the ranks on top of the suit stacks as
+                bytes in the order of Card.SUITS.
+        """
+        return (
+            tuple(bytes(col) for col in self.cols),
+            bytes(self.cells),
+            bytes(self.foundations),
+        )
+
+    def set_position(self, position: tuple) -> None:
+        """
+        Replaces the cards on the board and clears the history.
+
+        Args:
+            position (tuple): The columns, free cells and suit stacks as
+                returned by get_position.
+        """
+        columns, cells, foundations = position
+        self.cols = [bytearray(col) for col in columns]
+        self.__shared = set()
+        self.cells[:] = cells
+        self.foundations[:] = foundations
+        del self.history[:]
+        self.reset_cache()
+
+    def copy(self) -> "CompactBoard":
+        """
+        Returns an independent copy of the board, cheaper than
+        copy.deepcopy. The columns are shared until either board moves
+        cards from or to them, see Board.copy, and the cached moves and hash
+        are kept.
+
+        Returns:
+            CompactBoard: The copy, with the same history.
+        """
+        board = self.__clone(list(self.cols))
+        self.__shared = set(range(len(self.cols)))
+        board.__shared = set(self.__shared)
+        return board
+
+    def __deepcopy__(self, memo: dict) -> "CompactBoard":
+        board = memo[id(self)] = self.__clone([bytearray(col) for col in self.cols])
+        return board
+
+    def __clone(self, cols: list) -> "CompactBoard":
+        """
+        Returns a copy of the board with the given columns, which are not
+        shared with any board.
+        """
+        board = CompactBoard.__new__(CompactBoard)
+        board.supermoves = self.supermoves
+        board.cols = cols
+        board.__shared = set()
+        board.cells = bytearray(self.cells)
+        board.foundations = bytearray(self.foundations)
+        board.history = array("I", self.history)
+
+        board.__moves = self.__moves
+        if self.__moves is not None:
+            board.__actions = self.__actions
+        board.__column_hashes = None
+        if self.__column_hashes is not None:
+            board.__column_hashes = list(self.__column_hashes)
+            board.__column_sum = self.__column_sum
+            board.__cell_hash = self.__cell_hash
+            board.__stack_hash = self.__stack_hash
+        return board
+
+    def __own(self, slot: int) -> bytearray:
+        """
+        Returns a column to modify, copying it first if it may be shared
+        with a copy of the board.
+        """
+        col = self.cols[slot]
+        if slot in self.__shared:
+            col = self.cols[slot] = bytearray(col)
+            self.__shared.discard(slot)
+        return col
+
+    def __toggle_hash(self, card: int, slot: int, depth: int) -> None:
+        """
+        Updates the hash for a card put to or taken from a slot.
+
+        Args:
+            card (int): The moved card.
+            slot (int): The slot the card was put to or taken from.
+            depth (int): The depth of the card in a column slot, or the rank
+                below the card for the suit stack slot.
+        """
+        if slot == SUIT_STACK_SLOT:
+            keys = STACK_KEYS[CARD_SUIT[card]]
+            self.__stack_hash ^= keys[depth] ^ keys[depth + 1]
+        elif slot >= FREE_CELL_SLOT:
+            self.__cell_hash ^= CELL_KEYS[card]
+        else:
+            old = self.__column_hashes[slot]
+            new = old ^ COLUMN_KEYS[depth][card]
+            self.__column_hashes[slot] = new
+            self.__column_sum = (self.__column_sum - mix(old) + mix(new)) & MASK
+
+    def __find_column(self, card: int) -> int:
+        """
+        Finds the column with the given card on top.
+
+        Args:
+            card (int): The card code to search for.
+
+        Returns:
+            int: The index of the column with the card on top, None if there is none.
+        """
+        return next(
+            (i for i, col in enumerate(self.cols) if col and col[-1] == card), None
+        )
+
+    def __take(self, slot: int, card: int) -> None:
+        """
+        Removes a card from the top of a slot.
+
+        Args:
+            slot (int): The slot to take the card from.
+            card (int): The card on top of the slot.
+        """
+        if slot == SUIT_STACK_SLOT:
+            self.foundations[CARD_SUIT[card]] -= 1
+            depth = self.foundations[CARD_SUIT[card]]
+        elif slot >= FREE_CELL_SLOT:
+            self.cells[slot - FREE_CELL_SLOT] = EMPTY
+            depth = None
+        else:
+            col = self.__own(slot)
+            col.pop()
+            depth = len(col)
+
+        self.__moves = None
+        if self.__column_hashes is not None:
+            self.__toggle_hash(card, slot, depth)
+
+    def __put(self, slot: int, card: int) -> None:
+        """
+        Puts a card on top of a slot.
+
+        Args:
+            slot (int): The slot to put the card to.
+            card (int): The card to put.
+        """
+        if slot == SUIT_STACK_SLOT:
+            depth = self.foundations[CARD_SUIT[card]]
+            self.foundations[CARD_SUIT[card]] += 1
+        elif slot >= FREE_CELL_SLOT:
+            self.cells[slot - FREE_CELL_SLOT] = card
+            depth = None
+        else:
+            col = self.__own(slot)
+            depth = len(col)
+            col.append(card)
+
+        self.__moves = None
+        if self.__column_hashes is not None:
+            self.__toggle_hash(card, slot, depth)
@@ -0,0 +1,173 @@
+import mmap
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+# Deals are stored as the 52 card indices (Card.index) in the order returned
+# by Deck.cards_shuffled. A table file holds the deals of a range of seeds
+# after a header with the first seed and the number of deals.
+DEAL_SIZE = 52
+TABLE_MAGIC = b"FCDEALS1"
+TABLE_HEADER = struct.Struct("<8sqq")
+MAX_INT32 = (1 << 31) - 1
+
+
+def shuffle(seed: int) -> bytes:
+    """
+    Deals the cards for a seed, with the generator of Deck.
+
+    Args:
+        seed (int): The seed of the deal.
+
+    Returns:
+        bytes: The card indices in the order of Deck.cards_shuffled.
+    """
+    cards = bytearray(range(DEAL_SIZE))
+    state = seed & MAX_INT32
+    for i in range(DEAL_SIZE):
+        state = (state * 214013 + 2531011) & MAX_INT32
+        j = DEAL_SIZE - 1 - (state >> 16) % (DEAL_SIZE - i)
+        cards[i], cards[j] = cards[j], cards[i]
+    return bytes(cards)
+
+
+def deal(seeds) -> np.ndarray:
+    """
+    Shuffles decks for many seeds at once with NumPy, giving the same deals
+    as shuffle. Used by write_table and FreeCellBatch.
+
+    Args:
+        seeds (array_like): The seeds of the deals.
+
+    Returns:
+        np.ndarray: An int8 array of shape (len(seeds), DEAL_SIZE) with the
+            card indices of every deal in the order of Deck.cards_shuffled.
+    """
+    state = np.asarray(seeds, dtype=np.int64).reshape(-1) & MAX_INT32
+    rows = np.arange(len(state))
+    cards = np.tile(np.arange(DEAL_SIZE, dtype=np.int8), (len(state), 1))
+
+    for i in range(DEAL_SIZE):
+        state = (state * 214013 + 2531011) & MAX_INT32
+        j = DEAL_SIZE - 1 - (state >> 16) % (DEAL_SIZE - i)
+        cards[rows, i], cards[rows, j] = cards[rows, j], cards[rows, i]
+    return cards
+
+
+def write_table(path: str, first: int, count: int, chunk: int = 65536) -> None:
+    """
+    Writes the deals of a range of seeds to a table file for DealCache.
+
+    Args:
+        path (str): The file to write.
+        first (int): The first seed.
+        count (int): The number of seeds.
+        chunk (int): The number of deals computed at once.
+    """
+    with open(path, "wb") as file:
+        file.write(TABLE_HEADER.pack(TABLE_MAGIC, first, count))
+        for start in range(first, first + count, chunk):
+            seeds = np.arange(start, min(start + chunk, first + count))
+            file.write(deal(seeds).astype(np.uint8).tobytes())
+
+
+class DealCache:
+    """
+    Stores the deals of seeds, so they are shuffled only once.
+
+    Deals are looked up in a memory-mapped table file if one is opened and
+    covers the seed, then in an in-memory cache bounded by least recently
+    used eviction, and are shuffled and cached otherwise.
+
+    Args:
+        capacity (int): The maximum number of deals in the in-memory cache.
+        path (str): A table file written by write_table to open.
+
+    Attributes:
+        capacity (int): The maximum number of deals in the in-memory cache.
+
+    Methods:
+        get(seed) -> bytes: Returns the deal of a seed.
+        open(path): Uses a table file for the seeds it covers.
+        close(): Closes the table file.
+        clear(): Empties the in-memory cache.
+    """
+
+    def __init__(self, capacity: int = 65536, path: str = None) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity of a deal cache must be positive")
+        self.capacity = capacity
+        self.__deals = OrderedDict()
+        self.__table = None
+        self.__first = 0
+        self.__count = 0
+        if path is not None:
+            self.open(path)
+
+    def get(self, seed: int) -> bytes:
+        """
+        Returns the deal of a seed.
+
+        Args:
+            seed (int): The seed of the deal.
+
+        Returns:
+            bytes: The 52 card indices in the order of Deck.cards_shuffled.
+        """
+        offset = seed - self.__first
+        if 0 <= offset < self.__count:
+            start = TABLE_HEADER.size + offset * DEAL_SIZE
+            return self.__table[start : start + DEAL_SIZE]
+
+        deals = self.__deals
+        cards = deals.get(seed)
+        if cards is not None:
+            deals.move_to_end(seed)
+            return cards
+
+        cards = deals[seed] = shuffle(seed)
+        if len(deals) > self.capacity:
+            deals.popitem(last=False)
+        return cards
+
+    def open(self, path: str) -> None:
+        """
+        Uses a table file for the seeds it covers, replacing any open table.
+
+        Args:
+            path (str): A table file written by write_table.
+
+        Raises:
+            ValueError: If the file is not a deal table.
+        """
+        with open(path, "rb") as file:
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, first, count = TABLE_HEADER.unpack_from(table)
+        if magic != TABLE_MAGIC or len(table) != TABLE_HEADER.size + count * DEAL_SIZE:
+            table.close()
+            raise ValueError(f"{path} is not a deal table")
+
+        self.close()
+        self.__table, self.__first, self.__count = table, first, count
+
+    def close(self) -> None:
+        """
+        Closes the table file, the deals are shuffled again afterwards.
+        """
+        if self.__table is not None:
+            self.__table.close()
+        self.__table, self.__first, self.__count = None, 0, 0
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory cache.
+        """
+        self.__deals.clear()
+
+    def __len__(self) -> int:
+        return len(self.__deals)
+
+
+# The cache used by Deck and FreeCell.
+DEALS = DealCache()
@@ -0,0 +1,315 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from enum import IntEnum
+from multiprocessing import Pool
+
+import numpy as np
+
+from game.Solver import Solver
+
+# A database file holds a header with the first seed and the number of seeds,
+# followed by one fixed size record per seed in seed order. New files are
+# filled with PENDING records, which are overwritten as the deals are solved.
+DATABASE_MAGIC = b"FCSOLVE1"
+DATABASE_HEADER = struct.Struct("<8sqq")
+RECORD = np.dtype(
+    {
+        "names": ["status", "length", "nodes"],
+        "formats": ["u1", "<u2", "<u4"],
+        "offsets": [0, 2, 4],
+        "itemsize": 8,
+    }
+)
+MAX_LENGTH = (1 << 16) - 1
+MAX_NODES = (1 << 32) - 1
+
+# The outcome of solving one deal, length is the number of moves of the
+# solution and nodes the number of positions the solver expanded.
+DealRecord = namedtuple("DealRecord", ["seed", "status", "length", "nodes"])
+
+# The solver used by the worker processes of a pool, set by _init_worker.
+_solver = None
+
+
+class Status(IntEnum):
+    PENDING = 0
+    SOLVED = 1
+    UNSOLVABLE = 2
+    GAVE_UP = 3
+
+
+class DealDatabase:
+    """
+    Stores whether the deals of a range of seeds are solvable and how hard
+    they are to solve, in a memory-mapped file.
+
+    Records are read and written in place, so ranges of millions of seeds
+    can be queried without loading the file. solve fills in the pending
+    records in worker processes and flushes the file regularly, so an
+    interrupted run continues where it stopped when it is started again.
+
+    Args:
+        path (str): The database file, created if it does not exist.
+        first (int): The first seed, required to create the file.
+        count (int): The number of seeds, required to create the file.
+
+    Attributes:
+        first (int): The first seed.
+        count (int): The number of seeds.
+
+    Methods:
+        get(seed) -> DealRecord: Returns the record of a seed.
+        put(seed, status, length=0, nodes=0): Stores the record of a seed.
+        records(start=None, stop=None) -> np.ndarray: Returns a range of
+            records without copying them.
+        pending(retry_below=None) -> np.ndarray: Returns the seeds not
+            solved yet.
+        solve(...) -> int: Solves the pending deals.
+        flush(): Writes the changes to the file.
+        close(): Closes the file.
+    """
+
+    def __init__(self, path: str, first: int = None, count: int = None) -> None:
+        if not os.path.exists(path):
+            if first is None or count is None:
+                raise ValueError("A new deal database needs a first seed and count")
+            with open(path, "wb") as file:
+                file.write(DATABASE_HEADER.pack(DATABASE_MAGIC, first, count))
+                file.truncate(DATABASE_HEADER.size + count * RECORD.itemsize)
+
+        with open(path, "r+b") as file:
+            self.__file = mmap.mmap(file.fileno(), 0)
+        magic, self.first, self.count = DATABASE_HEADER.unpack_from(self.__file)
+        size = DATABASE_HEADER.size + self.count * RECORD.itemsize
+        if magic != DATABASE_MAGIC or len(self.__file) != size:
+            self.__file.close()
+            raise ValueError(f"{path} is not a deal database")
+        if first not in (None, self.first) or count not in (None, self.count):
+            self.__file.close()
+            raise ValueError(f"{path} holds other seeds")
+
+        self.__records = np.ndarray(
+            (self.count,), RECORD, self.__file, DATABASE_HEADER.size
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __index(self, seed: int) -> int:
+        index = seed - self.first
+        if not 0 <= index < self.count:
+            raise ValueError(f"Seed {seed} is not in the deal database")
+        return index
+
+    def get(self, seed: int) -> DealRecord:
+        """
+        Returns the record of a seed.
+
+        Args:
+            seed (int): The seed of the deal.
+
+        Returns:
+            DealRecord: The record, with status PENDING if not solved yet.
+
+        Raises:
+            ValueError: If the seed is not in the database.
+        """
+        status, length, nodes = self.__records[self.__index(seed)].tolist()
+        return DealRecord(seed, Status(status), length, nodes)
+
+    def put(self, seed: int, status: Status, length: int = 0, nodes: int = 0) -> None:
+        """
+        Stores the record of a seed.
+
+        Args:
+            seed (int): The seed of the deal.
+            status (Status): Whether the deal was solved.
+            length (int): The number of moves of the solution.
+            nodes (int): The number of positions expanded by the solver.
+
+        Raises:
+            ValueError: If the seed is not in the database.
+        """
+        self.__records[self.__index(seed)] = (
+            status,
+            min(length, MAX_LENGTH),
+            min(nodes, MAX_NODES),
+        )
+
+    def records(self, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        Returns the records of a range of seeds without copying them.
+
+        Args:
+            start (int): The first seed of the range, the first seed of the
+                database if not given.
+            stop (int): The seed after the range, the end of the database if
+                not given.
+
+        Returns:
+            np.ndarray: A structured array of RECORD with the fields status,
+                length and nodes, a view of the file.
+        """
+        start = self.first if start is None else max(start, self.first)
+        stop = self.first + self.count if stop is None else stop
+        return self.__records[start - self.first : max(stop - self.first, 0)]
+
+    def pending(self, retry_below: int = None) -> np.ndarray:
+        """
+        Returns the seeds not solved yet.
+
+        Args:
+            retry_below (int): Also return the seeds the solver gave up on
+                after expanding fewer positions.
+
+        Returns:
+            np.ndarray: The seeds with status PENDING, and GAVE_UP if
+                retry_below is given, in order.
+        """
+        status = self.__records["status"]
+        selected = status == Status.PENDING
+        if retry_below is not None:
+            selected |= (status == Status.GAVE_UP) & (
+                self.__records["nodes"] < retry_below
+            )
+        return np.flatnonzero(selected) + self.first
+
+    def solve(
+        self,
+        processes: int = None,
+        max_nodes: int = 200000,
+        max_time: float = None,
+        checkpoint: int = 1000,
+        retry_gave_up: bool = False,
+    ) -> int:
+        """
+        Solves the pending deals, distributing them across a pool of worker
+        processes. The file is flushed after every checkpoint deals, so an
+        interrupted run loses at most that many results.
+
+        Args:
+            processes (int): The number of worker processes, the number of
+                CPUs if not given. With 1 the deals are solved in the calling
+                process.
+            max_nodes (int): The maximum number of positions the solver
+                expands for a deal before giving up.
+            max_time (float): The maximum time in seconds spent on a deal.
+            checkpoint (int): The number of deals between flushes.
+            retry_gave_up (bool): Also solve the deals the solver gave up on
+                after expanding fewer than max_nodes positions, e.g. in an
+                earlier run with a smaller budget.
+
+        Returns:
+            int: The number of deals solved by this call.
+        """
+        seeds = self.pending(max_nodes if retry_gave_up else None).tolist()
+        solver = Solver(max_nodes, max_time)
+        if processes == 1:
+            _init_worker(solver)
+            return self.__store(map(_solve, seeds), checkpoint)
+
+        with Pool(processes, initializer=_init_worker, initargs=(solver,)) as pool:
+            results = pool.imap_unordered(_solve, seeds, chunksize=16)
+            return self.__store(results, checkpoint)
+
+    def __store(self, results, checkpoint: int) -> int:
+        """
+        Stores the records of solved deals as they arrive.
+
+        Returns:
+            int: The number of stored records.
+        """
+        stored = 0
+        try:
+            for record in results:
+                self.put(*record)
+                stored += 1
+                if stored % checkpoint == 0:
+                    self.flush()
+        finally:
+            self.flush()
+        return stored
+
+    def flush(self) -> None:
+        """
+        Writes the changes to the file.
+        """
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the file. The arrays returned by records have to
+        be deleted before.
+        """
+        if not self.__file.closed:
+            self.__records = None
+            self.__file.flush()
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _init_worker(solver: Solver) -> None:
+    global _solver
+    _solver = solver
+
+
+def _solve(seed: int) -> DealRecord:
+    moves = _solver.solve(seed)
+    if moves is not None:
+        status = Status.SOLVED
+    elif _solver.exhausted:
+        status = Status.UNSOLVABLE
+    else:
+        status = Status.GAVE_UP
+    return DealRecord(
+        seed, status, 0 if moves is None else len(moves), _solver.expanded
+    )
+
+
+def main(argv=None) -> int:
+    """
+    Solves a range of seeds from the command line, see --help. Running the
+    same command again resumes an interrupted run.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Build a FreeCell deal database.")
+    parser.add_argument("path", help="the database file")
+    parser.add_argument("--first", type=int, default=1)
+    parser.add_argument("--count", type=int, default=32000)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--max-nodes", type=int, default=200000)
+    parser.add_argument("--max-time", type=float)
+    parser.add_argument("--checkpoint", type=int, default=1000)
+    parser.add_argument(
+        "--retry",
+        action="store_true",
+        help="solve the deals given up on with fewer than --max-nodes again",
+    )
+    args = parser.parse_args(argv)
+
+    with DealDatabase(args.path, args.first, args.count) as database:
+        database.solve(
+            args.processes, args.max_nodes, args.max_time, args.checkpoint, args.retry
+        )
+        records = database.records()
+        for status in Status:
+            print(
+                f"{status.name:<12}{np.count_nonzero(records['status'] == status):>12,}"
+            )
+        del records
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+import multiprocessing
+import os
+from random import Random
+
+import numpy as np
+
+from game.Action import NUM_ACTIONS
+from game.Freecell import FreeCell
+from game.Game import State
+from game.Observation import OBSERVATION_SHAPE, encode
+
+# Deals drawn by an environment when reset without a seed, as in FreeCell.
+MAX_SEED = 1000000
+
+# The arrays shared by the environments of a vector environment and the
+# process stepping them, as (name, dtype, shape of one environment's part).
+# A negative seed written before a reset stands for a random deal.
+FIELDS = (
+    ("observations", np.float32, OBSERVATION_SHAPE),
+    ("final_observations", np.float32, OBSERVATION_SHAPE),
+    ("action_masks", np.bool_, (NUM_ACTIONS,)),
+    ("rewards", np.float64, ()),
+    ("terminated", np.bool_, ()),
+    ("truncated", np.bool_, ()),
+    ("actions", np.int64, ()),
+    ("seeds", np.int64, ()),
+)
+
+
+class FreeCellEnv:
+    """
+    A FreeCell game with the interface of a Gymnasium environment.
+
+    Observations are arrays of OBSERVATION_SHAPE from game.Observation and
+    actions are those of game.Action. A game ends when it is won or lost,
+    and is truncated after max_steps moves. The reward is REWARDS of the
+    state of the game after the move.
+
+    Unlike Gymnasium, the seed of reset is the seed of the deal, so the same
+    deal can be played again. Without one, deals are drawn from a generator
+    seeded with the seed of the environment.
+
+    Args:
+        seed (int): The seed of the deals drawn by reset.
+        max_steps (int): The number of moves after which a game is truncated.
+        compact (bool): Play on the CompactBoard backend.
+        supermoves (bool): Allow moving sequences of cards, see FreeCell.
+        autoplay (bool): Move safe cards to the suit stacks, see FreeCell.
+
+    Attributes:
+        freecell (FreeCell): The game being played, None before reset.
+
+    Methods:
+        reset(seed=None, options=None) -> tuple: Deals a new game.
+        step(action) -> tuple: Makes a move.
+        action_masks(out=None) -> np.ndarray: Returns the legal actions.
+        start(seed=None): Deals a new game without encoding it.
+        play(action) -> tuple: Makes a move without encoding the game.
+    """
+
+    REWARDS = {State.ONGOING: 0.0, State.WON: 1.0, State.LOST: -1.0}
+
+    def __init__(
+        self,
+        seed: int = None,
+        max_steps: int = 1000,
+        compact: bool = True,
+        supermoves: bool = False,
+        autoplay: bool = False,
+    ) -> None:
+        self.max_steps = max_steps
+        self.compact = compact
+        self.supermoves = supermoves
+        self.autoplay = autoplay
+        self.freecell = None
+        self.__random = Random(seed)
+
+    def reset(self, seed: int = None, options: dict = None) -> tuple:
+        """
+        Deals a new game.
+
+        Args:
+            seed (int): The seed of the deal, a random one if not given.
+            options (dict): Unused, for compatibility with Gymnasium.
+
+        Returns:
+            tuple: The observation and an info dict with the seed, the
+                move_count and the action_mask of the game.
+        """
+        self.start(seed)
+        return encode(self.freecell), self.__info()
+
+    def step(self, action: int) -> tuple:
+        """
+        Makes a move.
+
+        Args:
+            action (int): A legal action, see action_masks.
+
+        Returns:
+            tuple: The observation, the reward, whether the game ended,
+                whether it was truncated and an info dict as from reset.
+
+        Raises:
+            ValueError: If the action is not legal.
+        """
+        reward, terminated, truncated = self.play(action)
+        return encode(self.freecell), reward, terminated, truncated, self.__info()
+
+    def action_masks(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the legal actions.
+
+        Args:
+            out (np.ndarray): A bool array of length NUM_ACTIONS to write the
+                mask to, a new one if not given.
+
+        Returns:
+            np.ndarray: The mask, True for every legal action.
+        """
+        if out is None:
+            out = np.zeros(NUM_ACTIONS, dtype=bool)
+        else:
+            out.fill(False)
+        out[self.freecell.board.get_actions()] = True
+        return out
+
+    def start(self, seed: int = None) -> None:
+        """
+        Deals a new game like reset, without encoding it.
+        """
+        if seed is None:
+            seed = self.__random.randint(0, MAX_SEED)
+        self.freecell = FreeCell(seed, self.compact, self.supermoves, self.autoplay)
+
+    def play(self, action: int) -> tuple:
+        """
+        Makes a move like step, without encoding the game.
+
+        Returns:
+            tuple: The reward, whether the game ended and whether it was
+                truncated.
+        """
+        freecell = self.freecell
+        freecell.step(action)
+        state = freecell.get_state()
+        terminated = state != State.ONGOING
+        truncated = not terminated and freecell._move_count >= self.max_steps
+        return self.REWARDS[state], terminated, truncated
+
+    def __info(self) -> dict:
+        return {
+            "seed": self.freecell.deck.seed,
+            "move_count": self.freecell._move_count,
+            "action_mask": self.action_masks(),
+        }
+
+
+def _layout(num_envs: int) -> tuple:
+    # The offsets of the arrays are rounded up to multiples of 8 bytes, so
+    # the arrays of the wider types stay aligned
+    offsets, size = [], 0
+    for _, dtype, shape in FIELDS:
+        offsets.append(size)
+        size += num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        size = -(-size // 8) * 8
+    return offsets, size
+
+
+def _arrays(buffer, num_envs: int) -> dict:
+    offsets, _ = _layout(num_envs)
+    return {
+        name: np.ndarray((num_envs,) + shape, dtype, buffer, offset)
+        for (name, dtype, shape), offset in zip(FIELDS, offsets)
+    }
+
+
+def _reset_envs(envs: list, arrays: dict, rows) -> None:
+    for env, row in zip(envs, rows):
+        seed = int(arrays["seeds"][row])
+        env.start(None if seed < 0 else seed)
+        _observe(env, arrays, row)
+
+
+def _step_envs(envs: list, arrays: dict, rows) -> None:
+    for env, row in zip(envs, rows):
+        reward, terminated, truncated = env.play(int(arrays["actions"][row]))
+        arrays["rewards"][row] = reward
+        arrays["terminated"][row] = terminated
+        arrays["truncated"][row] = truncated
+        if terminated or truncated:
+            encode(env.freecell, arrays["final_observations"][row])
+            env.start()
+        _observe(env, arrays, row)
+
+
+def _observe(env: FreeCellEnv, arrays: dict, row: int) -> None:
+    encode(env.freecell, arrays["observations"][row])
+    env.action_masks(arrays["action_masks"][row])
+    arrays["seeds"][row] = env.freecell.deck.seed
+
+
+COMMANDS = {"reset": _reset_envs, "step": _step_envs}
+
+
+class SyncVectorEnv:
+    """
+    Steps many FreeCellEnv environments in the calling process.
+
+    The observations and the other results of all environments are written
+    into arrays allocated once. A game which ends is replaced by a new one
+    in the same step, its last observation is in the final_observation
+    info, as in Gymnasium vector environments.
+
+    Args:
+        num_envs (int): The number of environments.
+        seed (int): The seed of the deals drawn by environment i is seed + i.
+        copy (bool): Return copies of the arrays. Otherwise the arrays are
+            overwritten by the next reset or step.
+        kwargs: The arguments of FreeCellEnv.
+
+    Methods:
+        reset(seed=None, options=None) -> tuple: Deals new games.
+        step(actions) -> tuple: Makes a move in every environment.
+        close(): Releases the resources of the environments.
+    """
+
+    def __init__(
+        self, num_envs: int, seed: int = None, copy: bool = True, **kwargs
+    ) -> None:
+        self.num_envs = num_envs
+        self.copy = copy
+        self._arrays = _arrays(self._allocate(_layout(num_envs)[1]), num_envs)
+        self._start(
+            [None if seed is None else seed + i for i in range(num_envs)], kwargs
+        )
+
+    def _allocate(self, size: int):
+        return bytearray(size)
+
+    def _start(self, seeds: list, kwargs: dict) -> None:
+        self.envs = [FreeCellEnv(seed, **kwargs) for seed in seeds]
+
+    def _run(self, command: str) -> None:
+        COMMANDS[command](self.envs, self._arrays, range(self.num_envs))
+
+    def reset(self, seed=None, options: dict = None) -> tuple:
+        """
+        Deals new games in all environments.
+
+        Args:
+            seed (int or array_like): The seeds of the deals, one per
+                environment, or the seed of the first deal followed by the
+                next seeds. Random deals if not given.
+            options (dict): Unused, for compatibility with Gymnasium.
+
+        Returns:
+            tuple: The observations and an info dict with the seed and the
+                action_mask of every environment.
+        """
+        if seed is None:
+            seeds = -1
+        elif np.ndim(seed) == 0:
+            seeds = seed + np.arange(self.num_envs)
+        else:
+            seeds = seed
+        self._arrays["seeds"][:] = seeds
+        self._run("reset")
+        return self.__get("observations"), self.__infos()
+
+    def step(self, actions) -> tuple:
+        """
+        Makes a move in every environment.
+
+        Args:
+            actions (array_like): One legal action per environment.
+
+        Returns:
+            tuple: The observations, rewards, terminated and truncated flags
+                and an info dict as from reset, with the final_observation of
+                the environments whose game ended.
+
+        Raises:
+            ValueError: If an action is not legal.
+        """
+        self._arrays["actions"][:] = actions
+        self._run("step")
+        done = self._arrays["terminated"] | self._arrays["truncated"]
+        infos = self.__infos()
+        infos["final_observation"] = self._arrays["final_observations"][done]
+        infos["_final_observation"] = done
+        return (
+            self.__get("observations"),
+            self.__get("rewards"),
+            self.__get("terminated"),
+            self.__get("truncated"),
+            infos,
+        )
+
+    def close(self) -> None:
+        """
+        Releases the resources of the environments.
+        """
+
+    def __get(self, name: str) -> np.ndarray:
+        array = self._arrays[name]
+        return array.copy() if self.copy else array
+
+    def __infos(self) -> dict:
+        return {"seed": self.__get("seeds"), "action_mask": self.__get("action_masks")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class SubprocVectorEnv(SyncVectorEnv):
+    """
+    Steps many FreeCellEnv environments in worker processes.
+
+    The environments are split into one contiguous group per process. The
+    workers write the observations and results directly into shared memory,
+    so only the commands pass through pipes.
+
+    Args:
+        num_envs (int): The number of environments.
+        seed (int): The seed of the deals drawn by environment i is seed + i.
+        copy (bool): Return copies of the shared arrays. Otherwise the arrays
+            are overwritten by the next reset or step.
+        processes (int): The number of worker processes, at most the number
+            of CPUs if not given.
+        kwargs: The arguments of FreeCellEnv.
+
+    Raises:
+        ValueError: From reset or step, if an action is not legal.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        seed: int = None,
+        copy: bool = True,
+        processes: int = None,
+        **kwargs,
+    ) -> None:
+        self.processes = min(processes or os.cpu_count(), num_envs)
+        self.__connections = []
+        self.__workers = []
+        super().__init__(num_envs, seed, copy, **kwargs)
+
+    def _allocate(self, size: int):
+        self.__memory = multiprocessing.RawArray("b", size)
+        return self.__memory
+
+    def _start(self, seeds: list, kwargs: dict) -> None:
+        for rows in np.array_split(np.arange(self.num_envs), self.processes):
+            connection, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_worker,
+                args=(
+                    child,
+                    self.__memory,
+                    self.num_envs,
+                    rows.tolist(),
+                    [seeds[row] for row in rows],
+                    kwargs,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            child.close()
+            self.__connections.append(connection)
+            self.__workers.append(worker)
+
+    def _run(self, command: str) -> None:
+        for connection in self.__connections:
+            connection.send(command)
+        errors = [connection.recv() for connection in self.__connections]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        """
+        Stops the worker processes.
+        """
+        for connection in self.__connections:
+            connection.send("close")
+            connection.close()
+        for worker in self.__workers:
+            worker.join()
+        self.__connections, self.__workers = [], []
+
+
+def _worker(connection, memory, num_envs: int, rows: list, seeds: list, kwargs):
+    arrays = _arrays(memory, num_envs)
+    envs = [FreeCellEnv(seed, **kwargs) for seed in seeds]
+    while True:
+        command = connection.recv()
+        if command == "close":
+            break
+        try:
+            COMMANDS[command](envs, arrays, rows)
+            connection.send(None)
+        except Exception as error:
+            connection.send(error)
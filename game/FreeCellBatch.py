@@ -0,0 +1,266 @@
+import numpy as np
+
+from game.Action import (
+    FREE_CELL_SLOT,
+    NUM_ACTIONS,
+    NUM_COLUMNS,
+    NUM_DESTINATIONS,
+    NUM_FREE_CELLS,
+    NUM_SOURCES,
+    SUIT_STACK_SLOT,
+    decode_action,
+)
+from game.CompactBoard import CARD_NAME, decode_card
+from game.DealCache import deal
+from game.Game import State
+from game.Move import Move
+
+# Columns hold at most 7 dealt cards followed by a sequence from queen to ace.
+MAX_HEIGHT = 7 + 12
+NO_CARD = -1
+
+CARD_RANKS = np.arange(52, dtype=np.int8) % 13 + 1
+CARD_SUITS = np.arange(52, dtype=np.int8) // 13
+CARD_REDS = CARD_SUITS < 2
+
+
+class FreeCellBatch:
+    """
+    Runs many FreeCell games in lockstep with all boards stored in NumPy
+    arrays.
+
+    Moves are given as actions from game.Action. The legal actions, the
+    results of the moves and the states of the games are the same as those
+    of FreeCell with the same seeds.
+
+    Args:
+        seeds (array_like): The seeds of the games, one per game.
+
+    Attributes:
+        seeds (np.ndarray): The seeds of the games.
+        columns (np.ndarray): int8 array of shape (games, 8, MAX_HEIGHT) with
+            the card indices in the columns, bottom first, padded with NO_CARD.
+        heights (np.ndarray): int8 array of shape (games, 8), the number of
+            cards in every column.
+        cells (np.ndarray): int8 array of shape (games, 4), the cards in the
+            free cells or NO_CARD.
+        foundations (np.ndarray): int8 array of shape (games, 4), the rank on
+            top of the suit stacks in the order of Card.SUITS.
+        move_count (np.ndarray): The number of moves made in every game.
+
+    Methods:
+        reset(seeds, index=None): Deals new games.
+        action_masks() -> np.ndarray: Returns the legal actions of every game.
+        step(actions) -> np.ndarray: Makes a move in every game.
+        get_states() -> np.ndarray: Returns the State value of every game.
+    """
+
+    def __init__(self, seeds) -> None:
+        seeds = np.asarray(seeds, dtype=np.int64).reshape(-1)
+        games = len(seeds)
+        self.seeds = np.zeros(games, dtype=np.int64)
+        self.columns = np.full((games, NUM_COLUMNS, MAX_HEIGHT), NO_CARD, np.int8)
+        self.heights = np.zeros((games, NUM_COLUMNS), dtype=np.int8)
+        self.cells = np.full((games, NUM_FREE_CELLS), NO_CARD, dtype=np.int8)
+        self.foundations = np.zeros((games, 4), dtype=np.int8)
+        self.move_count = np.zeros(games, dtype=np.int64)
+        self.reset(seeds)
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def reset(self, seeds, index=None) -> None:
+        """
+        Deals new games.
+
+        Args:
+            seeds (array_like): The seeds of the new games.
+            index (array_like): The games to replace, as indices or a boolean
+                mask. All games if not given.
+        """
+        index = np.arange(len(self))[slice(None) if index is None else index]
+        seeds = np.broadcast_to(np.asarray(seeds, dtype=np.int64), index.shape)
+        cards = deal(seeds)
+
+        self.seeds[index] = seeds
+        self.columns[index] = NO_CARD
+        start = 0
+        for column, num_cards in enumerate([6] * 4 + [7] * 4):
+            self.columns[index, column, :num_cards] = cards[
+                :, start : start + num_cards
+            ]
+            self.heights[index, column] = num_cards
+            start += num_cards
+        self.cells[index] = NO_CARD
+        self.foundations[index] = 0
+        self.move_count[index] = 0
+
+    def sources(self) -> np.ndarray:
+        """
+        Returns the cards which can be moved.
+
+        Returns:
+            np.ndarray: int8 array of shape (games, NUM_SOURCES) with the card
+                on top of every column followed by the free cells, NO_CARD for
+                empty slots.
+        """
+        top = np.maximum(self.heights - 1, 0).astype(np.intp)[..., None]
+        tops = np.take_along_axis(self.columns, top, axis=2)[..., 0]
+        tops = np.where(self.heights > 0, tops, NO_CARD)
+        return np.concatenate([tops, self.cells], axis=1)
+
+    def action_masks(self) -> np.ndarray:
+        """
+        Returns the legal actions of every game.
+
+        Returns:
+            np.ndarray: bool array of shape (games, NUM_ACTIONS).
+        """
+        games = len(self)
+        rows = np.arange(games)
+        sources = self.sources()
+        valid = sources != NO_CARD
+        cards = np.where(valid, sources, 0)
+        ranks = CARD_RANKS[cards]
+        reds = CARD_REDS[cards]
+        mask = np.zeros((games, NUM_SOURCES, NUM_DESTINATIONS), dtype=bool)
+
+        # Moves onto the cards on top of the columns
+        top_valid = valid[:, :NUM_COLUMNS]
+        top_ranks = ranks[:, None, :NUM_COLUMNS]
+        top_reds = reds[:, None, :NUM_COLUMNS]
+        mask[:, :, :NUM_COLUMNS] = (
+            valid[:, :, None]
+            & top_valid[:, None, :]
+            & (ranks[:, :, None] == top_ranks - 1)
+            & (reds[:, :, None] != top_reds)
+        )
+
+        # Moves to the first empty column
+        empty = ~top_valid
+        has_empty = empty.any(axis=1)
+        first_empty = np.argmax(empty, axis=1)
+        mask[rows[has_empty], :, first_empty[has_empty]] = valid[has_empty]
+
+        # Moves from the columns to the first empty free cell
+        free = self.cells == NO_CARD
+        has_free = free.any(axis=1)
+        first_free = FREE_CELL_SLOT + np.argmax(free, axis=1)
+        mask[rows[has_free], :NUM_COLUMNS, first_free[has_free]] = valid[
+            has_free, :NUM_COLUMNS
+        ]
+
+        # Moves to the suit stacks
+        stacks = np.take_along_axis(self.foundations, CARD_SUITS[cards], axis=1)
+        mask[:, :, SUIT_STACK_SLOT] = valid & (ranks == stacks + 1)
+
+        return mask.reshape(games, NUM_ACTIONS)
+
+    def step(self, actions, validate: bool = True) -> np.ndarray:
+        """
+        Makes a move in every game.
+
+        Args:
+            actions (array_like): One action per game, a negative action
+                leaves the game unchanged.
+            validate (bool): Check that the actions are legal.
+
+        Returns:
+            np.ndarray: The State values of the games after the moves.
+
+        Raises:
+            ValueError: If an action is not below NUM_ACTIONS, or validate is
+                set and an action is not legal.
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+        rows = np.nonzero(actions >= 0)[0]
+        actions = actions[rows]
+        if (actions >= NUM_ACTIONS).any():
+            raise ValueError(f"Invalid action, not in range({NUM_ACTIONS})")
+        if validate and not self.action_masks()[rows, actions].all():
+            raise ValueError("Invalid move, not in action_masks()")
+
+        source, destination = np.divmod(actions, NUM_DESTINATIONS)
+        cards = self.sources()[rows, source]
+
+        # Take the cards from their slots
+        from_column = source < FREE_CELL_SLOT
+        game, column = rows[from_column], source[from_column]
+        self.heights[game, column] -= 1
+        self.columns[game, column, self.heights[game, column]] = NO_CARD
+        self.cells[rows[~from_column], source[~from_column] - FREE_CELL_SLOT] = NO_CARD
+
+        # Put them to their destinations
+        to_column = destination < FREE_CELL_SLOT
+        game, column = rows[to_column], destination[to_column]
+        self.columns[game, column, self.heights[game, column]] = cards[to_column]
+        self.heights[game, column] += 1
+        to_cell = ~to_column & (destination < SUIT_STACK_SLOT)
+        self.cells[rows[to_cell], destination[to_cell] - FREE_CELL_SLOT] = cards[
+            to_cell
+        ]
+        to_stack = destination == SUIT_STACK_SLOT
+        self.foundations[rows[to_stack], CARD_SUITS[cards[to_stack]]] += 1
+
+        self.move_count[rows] += 1
+        return self.get_states()
+
+    def get_states(self) -> np.ndarray:
+        """
+        Returns the states of the games, like FreeCell.get_state.
+
+        Returns:
+            np.ndarray: int8 array with the State value of every game.
+        """
+        won = (self.foundations == 13).all(axis=1)
+        ongoing = self.action_masks().any(axis=1)
+        return np.where(
+            won,
+            State.WON.value,
+            np.where(ongoing, State.ONGOING.value, State.LOST.value),
+        ).astype(np.int8)
+
+    def action_to_move(self, game: int, action: int) -> tuple:
+        """
+        Translates an action of one game to the notation of FreeCell.get_moves.
+
+        Args:
+            game (int): The index of the game.
+            action (int): The action.
+
+        Returns:
+            tuple: The move as a (card, destination) tuple.
+        """
+        source, destination = decode_action(action)
+        card = CARD_NAME[self.sources()[game, source]]
+        if destination == SUIT_STACK_SLOT:
+            return (card, Move.SUIT_STACK.value)
+        if destination >= FREE_CELL_SLOT:
+            return (card, Move.FREECELL.value)
+        height = self.heights[game, destination]
+        if height == 0:
+            return (card, Move.EMPTY_COLUMN.value)
+        return (card, CARD_NAME[self.columns[game, destination, height - 1]])
+
+    def get_board(self, game: int) -> tuple:
+        """
+        Returns the board of one game in the format of FreeCell.get_board.
+
+        Args:
+            game (int): The index of the game.
+
+        Returns:
+            tuple: The columns, free cells and suit stack tops as cards.
+        """
+        columns = [
+            [decode_card(card) for card in self.columns[game, column, :height]]
+            for column, height in enumerate(self.heights[game])
+        ]
+        free_cells = [
+            None if card == NO_CARD else decode_card(card) for card in self.cells[game]
+        ]
+        suit_stack = [
+            None if rank == 0 else decode_card(suit * 13 + rank - 1)
+            for suit, rank in enumerate(self.foundations[game])
+        ]
+        return (columns, free_cells, suit_stack)
@@ -1,17 +1,59 @@
+import copy
+
+import numpy as np
+
+from game.Action import NUM_ACTIONS
 from game.Game import Game, State
 from game.Board import Board
+from game.CompactBoard import CompactBoard
+from game.DealCache import DEALS
 from game.Deck import Deck
 from game.Move import Move
+from game.Snapshot import STATE_SIZE, decode_state, encode_state
 from random import Random
 
 
 class FreeCell(Game):
-    def __init__(self, seed: int = None):
+    def __init__(
+        self,
+        seed: int = None,
+        compact: bool = False,
+        supermoves: bool = False,
+        autoplay: bool = False,
+    ):
+        """
+        Args:
+            seed (int): The seed of the deal, a random one if not given.
+            compact (bool): Use the integer encoded CompactBoard backend
+                instead of Board. Both produce identical moves and states.
+            supermoves (bool): Also allow moving sequences of cards at once,
+                see get_moves.
+            autoplay (bool): After the deal and after every move, move all
+                cards which are safe to move to the suit stacks, see
+                Board.autoplay. The moves are reported in autoplayed.
+        """
         if seed is None:
             seed = Random().randint(0, 1000000)
         self._move_count = 0
+        self.compact = compact
+        self.supermoves = supermoves
+        self.autoplay = autoplay
         self.deck = Deck(seed)
-        self.board = Board(self.deck.cards_shuffled())
+        if compact:
+            self.board = CompactBoard(DEALS.get(seed), supermoves)
+        else:
+            self.board = Board(self.deck.cards_shuffled(), supermoves)
+
+        # The moves autoplayed after the last move, and their number after
+        # every move for undo_move
+        self.autoplayed = self.board.autoplay() if autoplay else []
+        self.__autoplay_counts = []
+
+    def __after_move(self) -> None:
+        self.increment_move_count()
+        if self.autoplay:
+            self.autoplayed = self.board.autoplay()
+            self.__autoplay_counts.append(len(self.autoplayed))
 
     def increment_move_count(self):
         self._move_count += 1
@@ -43,82 +85,214 @@ class FreeCell(Game):
                 means moving the Ace of Diamonds to the 2 of Clubs
                 - ('AD', '0')
                 means moving the Ace of Diamonds to an empty column
-        """
-        moves = list()
 
-        # Moves onto empty columns
-        if [] in self.board.columns:
-            for card in self.board.free_cells + self.board.get_movable_cards():
-                if card:
-                    moves.append((str(card), "0"))
-
-        # Get cards from the top of columns
-        suspected_moves = self.board.get_movable_cards()
-
-        # Check if at least one of freecells is empty
-        if None in self.board.free_cells:
-            # Append moving every from the top of column to a freecell
-            for card in suspected_moves:
-                moves.append((str(card), "F"))
-
-        for card in self.board.free_cells:
-            if card:
-                # Check for suit stack moves
-                if card.is_larger_and_same_suit(self.board.suit_stack[card.suit]):
-                    moves.append((str(card), "S"))
-
-                # Check if any card from freecells can be moved onto a column
-                for card_destination in suspected_moves:
-                    if card.is_smaller_and_different_color(card_destination):
-                        moves.append((str(card), str(card_destination)))
-
-        for card in suspected_moves:
-            # Check if any card from columns can be moved onto a suit stack
-            if card.is_larger_and_same_suit(self.board.suit_stack[card.suit]):
-                moves.append((str(card), "S"))
+        :supermoves: If enabled, a card in a column may also be moved together
+            with the cards on top of it, when every card is one rank smaller
+            and of a different color than the card below. The move names the
+            bottom card, e.g. ('9h', 'Ts') moves the 9 of Hearts and the cards
+            on it onto the 10 of Spades. At most (free cells + 1) *
+            2 ** (empty columns) cards can be moved, not counting the empty
+            column moved to.
+        """
+        return self.board.get_moves()
 
-            # Check if any card from columns can be moved onto another column
-            for card_destination in suspected_moves:
-                if card != card_destination and (
-                    card.is_smaller_and_different_color(card_destination)
-                ):
-                    moves.append((str(card), str(card_destination)))
+    def get_pruned_moves(self) -> list:
+        """Get the possible moves without redundant ones, for search.
 
-        return moves
+        :return: A subset of get_moves, see Board.get_pruned_moves.
+        """
+        return self.board.get_pruned_moves()
 
     def make_move(self, move: tuple) -> bool:
-        if move not in self.get_moves():
+        if not self.board.is_valid_move(move):
             # return False
             raise ValueError("Invalid move, not in get_moves()")
 
-        card = self.board.find_card_from_string(move[0])
-        match move[1]:
-            case Move.FREECELL.value:
-                move_completed = self.board.move_to_free_cell(card)
-            case Move.SUIT_STACK.value:
-                move_completed = self.board.move_to_stack(card)
-            case Move.EMPTY_COLUMN.value:
-                move_completed = self.board.move_to_free_column(card)
-            case _:
-                move_completed = self.board.move_to_card(
-                    card, self.board.find_card_from_string(move[1])
-                )
+        move_completed = self.board.make_move(move)
         if move_completed:
-            self.increment_move_count()
+            self.__after_move()
         else:
             raise ValueError("Invalid move, problem with execution")
         return move_completed
 
+    def get_action_mask(self) -> np.ndarray:
+        """Get the possible moves as a mask over the actions of game.Action.
+
+        :return: A bool array of length NUM_ACTIONS, True for every action
+            returned by Board.get_actions.
+        """
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        mask[self.board.get_actions()] = True
+        return mask
+
+    def step(self, action: int) -> bool:
+        """Make a move given as an action, see game.Action.
+
+        :param action: An action allowed by get_action_mask.
+        :return: True if the move was made.
+        :raises ValueError: If the action is not possible.
+        """
+        if not self.board.is_valid_action(action):
+            raise ValueError("Invalid action, not in get_action_mask()")
+
+        if not self.board.make_action(action):
+            raise ValueError("Invalid action, problem with execution")
+        self.__after_move()
+        return True
+
+    def action_to_move(self, action: int) -> tuple:
+        """Translate a possible action to the notation of get_moves.
+
+        :raises ValueError: If the action is not possible.
+        """
+        return self.board.action_to_move(action)
+
+    def move_to_action(self, move: tuple) -> int:
+        """Translate a move returned by get_moves to its action.
+
+        :raises ValueError: If the move is not possible.
+        """
+        return self.board.move_to_action(move)
+
+    def undo_move(self) -> bool:
+        """Revert the last move made with make_move or step.
+
+        In autoplay mode the moves autoplayed after it are reverted as well,
+        the moves autoplayed after the deal can not be reverted.
+
+        :return: True if the move was reverted.
+        :raises ValueError: If there is no move to undo.
+        """
+        autoplayed = 0
+        if self.autoplay:
+            if not self.__autoplay_counts:
+                raise ValueError("Invalid undo, no move to revert")
+            autoplayed = self.__autoplay_counts.pop()
+
+        for _ in range(autoplayed):
+            self.board.undo_move()
+        if not self.board.undo_move():
+            raise ValueError("Invalid undo, no move to revert")
+        self._move_count -= 1
+        self.autoplayed = []
+        return True
+
+    def copy(self) -> "FreeCell":
+        """Create an independent copy of the game, cheaper than copy.deepcopy.
+
+        The deck and the cards are shared, and the board is copied with
+        Board.copy, which only copies a column when a move touches it. A
+        copy is therefore cheap enough to branch from in a search, but its
+        columns must not be modified in place, see Board.copy.
+
+        :return: The copy, with the same history, so its moves can be undone.
+        """
+        return self.__clone(self.board.copy())
+
+    def __deepcopy__(self, memo: dict) -> "FreeCell":
+        freecell = memo[id(self)] = self.__clone(copy.deepcopy(self.board, memo))
+        # Cards are immutable and interned, copying the list is enough
+        freecell.deck = copy.copy(self.deck)
+        freecell.deck.cards = list(self.deck.cards)
+        return freecell
+
+    def __clone(self, board) -> "FreeCell":
+        freecell = type(self).__new__(type(self))
+        freecell.__dict__.update(self.__dict__)
+        freecell.board = board
+        freecell.autoplayed = list(self.autoplayed)
+        freecell.__autoplay_counts = list(self.__autoplay_counts)
+        return freecell
+
+    def to_bytes(self) -> bytes:
+        """Encode the board and the move count into STATE_SIZE bytes.
+
+        :return: The encoded state, see game.Snapshot.
+        """
+        state = bytearray(STATE_SIZE)
+        self.write_state(state)
+        return bytes(state)
+
+    def write_state(self, buffer, offset: int = 0) -> None:
+        """Encode the board and the move count directly into a buffer.
+
+        :param buffer: A writable buffer such as a memoryview of shared
+            memory or of a mmap, with STATE_SIZE bytes from offset on.
+        :param offset: The position of the state in the buffer.
+        """
+        encode_state(self.board.get_position(), self._move_count, buffer, offset)
+
+    def read_state(self, buffer, offset: int = 0) -> None:
+        """Replace the board and the move count with an encoded state.
+
+        The history is cleared, so the moves made before can not be undone.
+
+        :param buffer: A buffer written by write_state or to_bytes.
+        :param offset: The position of the state in the buffer.
+        """
+        position, self._move_count = decode_state(buffer, offset)
+        self.board.set_position(position)
+        self.autoplayed = []
+        self.__autoplay_counts = []
+
+    @classmethod
+    def from_bytes(cls, state, offset: int = 0, **kwargs) -> "FreeCell":
+        """Create a game from a state encoded by to_bytes.
+
+        :param state: The encoded state.
+        :param offset: The position of the state in the buffer.
+        :param kwargs: Arguments of FreeCell, such as compact. The seed only
+            sets deck.seed, as it is not part of the state.
+        :return: The game.
+        """
+        freecell = cls(**kwargs)
+        freecell.read_state(state, offset)
+        return freecell
+
     def get_state(self) -> State:
         """Get the current state of the game.
 
         :return: The current state of the game as State enum.
         """
-        suit_stack = list(self.board.suit_stack.values())
-        for card in suit_stack:
-            if card is None or card.rank != 13:
-                return State.ONGOING if bool(self.get_moves()) else State.LOST
-        return State.WON
+        if self.board.is_solved():
+            return State.WON
+        return State.ONGOING if self.board.has_moves() else State.LOST
+
+    def is_dead_end(self, max_positions: int = 10000) -> bool:
+        """Check whether the game is lost even if moves remain.
+
+        The positions reachable without moving a card to a suit stack are
+        searched for one where a card can be moved to a suit stack. If there
+        is none, the moves left only lead around in circles and the game
+        can never be won.
+
+        :param max_positions: The maximum number of positions to search.
+        :return: True if the game can not be won, False if it is won, a card
+            can still reach a suit stack or the search ran out of positions.
+        """
+        if self.board.is_solved():
+            return False
+
+        board = CompactBoard([], self.supermoves)
+        board.set_position(self.board.get_position())
+        seen = {board.zobrist_hash()}
+        stack = [board.get_position()]
+        while stack:
+            board.set_position(stack.pop())
+            moves = board.get_moves()
+            if any(move[1] == Move.SUIT_STACK.value for move in moves):
+                return False
+
+            for move in moves:
+                board.make_move(move)
+                key = board.zobrist_hash()
+                if key not in seen:
+                    if len(seen) >= max_positions:
+                        return False
+                    seen.add(key)
+                    stack.append(board.get_position())
+                board.undo_move()
+        return True
 
     def get_board(self) -> list:
         """Get the current board state.
@@ -135,5 +309,14 @@ class FreeCell(Game):
             list(self.board.suit_stack.values()),
         )
 
-    def start_game(self) -> None:
-        self.__init__()
+    def start_game(self, seed: int = None) -> None:
+        """Deal a new game with the same options.
+
+        :param seed: The seed of the deal, a random one if not given.
+        """
+        self.__init__(
+            seed,
+            compact=self.compact,
+            supermoves=self.supermoves,
+            autoplay=self.autoplay,
+        )
@@ -0,0 +1,460 @@
+import copy
+import math
+import threading
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+from game.CompactBoard import CompactBoard
+from game.Freecell import FreeCell
+from game.Game import State
+from game.Move import Move
+
+
+def random_rollout(moves: list, random: Random) -> tuple:
+    """
+    A rollout policy choosing a uniformly random move.
+
+    Args:
+        moves (list): The legal moves.
+        random (Random): The generator of the search.
+
+    Returns:
+        tuple: The chosen move.
+    """
+    return random.choice(moves)
+
+
+def suit_stack_rollout(moves: list, random: Random) -> tuple:
+    """
+    A rollout policy moving a card to the suit stacks whenever possible and
+    choosing a random move otherwise.
+    """
+    for move in moves:
+        if move[1] == Move.SUIT_STACK.value:
+            return move
+    return random.choice(moves)
+
+
+class Node:
+    """
+    A position in the search tree.
+
+    With transpositions a node can be reached by several moves, so the
+    statistics used to choose a move are kept per move, on the edge from
+    the node, and only count the iterations which took that move.
+
+    Attributes:
+        moves (list): The legal moves, None until the node is expanded.
+        children (list): The node reached by every move, None if not tried.
+        visits (int): The number of iterations through the node, including
+            the virtual losses of iterations in progress.
+        value (float): The sum of the rewards of the iterations.
+        edge_visits (list): The number of iterations which took every move,
+            including virtual losses.
+        edge_values (list): The sum of the rewards of those iterations.
+    """
+
+    __slots__ = ("moves", "children", "visits", "value", "edge_visits", "edge_values")
+
+    def __init__(self) -> None:
+        self.moves = None
+        self.children = None
+        self.visits = 0
+        self.value = 0.0
+        self.edge_visits = None
+        self.edge_values = None
+
+    def expand(self, moves: list) -> None:
+        self.moves = moves
+        self.children = [None] * len(moves)
+        self.edge_visits = [0] * len(moves)
+        self.edge_values = [0.0] * len(moves)
+
+
+class _GameSearch:
+    """
+    Plays the iterations of a search on a copy of any Game. The copy is
+    replaced with a new one for every iteration, and positions are only
+    recognized if a key function is given.
+    """
+
+    def __init__(self, game, key) -> None:
+        self.root = game
+        self.key_function = key
+        self.game = None
+
+    def restore(self) -> None:
+        self.game = copy.deepcopy(self.root)
+
+    def moves(self) -> list:
+        if self.game.get_state() != State.ONGOING:
+            return []
+        return self.game.get_moves()
+
+    def play(self, move: tuple) -> None:
+        self.game.make_move(move)
+
+    def won(self) -> bool:
+        return self.game.get_state() == State.WON
+
+    def key(self):
+        return None if self.key_function is None else self.key_function(self.game)
+
+    def evaluate(self) -> float:
+        return 0.0
+
+
+class _FreeCellSearch:
+    """
+    Plays the iterations of a search of a FreeCell game on a CompactBoard,
+    restoring the root position with set_position, generating pruned moves
+    and recognizing positions by their Zobrist hash.
+    """
+
+    def __init__(self, freecell: FreeCell) -> None:
+        self.board = self.game = CompactBoard([], freecell.supermoves)
+        self.position = freecell.board.get_position()
+        self.autoplay = freecell.autoplay
+
+    def restore(self) -> None:
+        self.board.set_position(self.position)
+
+    def moves(self) -> list:
+        if self.board.is_solved():
+            return []
+        return self.board.get_pruned_moves()
+
+    def play(self, move: tuple) -> None:
+        self.board.make_move(move)
+        if self.autoplay:
+            self.board.autoplay()
+
+    def won(self) -> bool:
+        return self.board.is_solved()
+
+    def key(self):
+        return self.board.zobrist_hash()
+
+    def evaluate(self) -> float:
+        return sum(self.board.foundations) / 52
+
+
+class MCTS:
+    """
+    Chooses moves of a single player game with Monte Carlo Tree Search.
+
+    Every iteration descends the tree from the current position choosing
+    moves by UCT, adds the first position not in the tree and plays a
+    rollout from it. A rollout winning the game is rewarded with 1, and any
+    other rollout, lost or stopped after rollout_depth moves, with evaluate.
+    It is 0 by default, and the share of the cards on the suit stacks for
+    FreeCell, so rollouts of FreeCell games still tell good moves from bad.
+
+    Any game.Game.Game can be searched, by playing every iteration on a deep
+    copy of the game. FreeCell games take a fast path on a CompactBoard,
+    with the pruned moves of get_pruned_moves and Zobrist hash keys.
+
+    With transpositions, positions reached by different move orders share
+    one node, so the tree is a graph. An iteration never enters a node that
+    is already on its path, so cycles of moves are not followed.
+
+    With several threads, iterations run concurrently on one tree and add a
+    virtual loss to the nodes on their path until they finish, so other
+    threads explore different paths. With several processes, every process
+    searches its own tree (root parallelism) and the visits of the moves at
+    the root are added up.
+
+    Args:
+        iterations (int): The number of iterations of a search, None for no
+            limit if max_time is given.
+        max_time (float): The maximum search time in seconds, None for no
+            limit.
+        exploration (float): The exploration constant of UCT.
+        rollout_policy (callable): Called with the legal moves and a Random
+            to choose the moves of the rollouts, random_rollout if not given.
+        rollout_depth (int): The maximum number of moves of a rollout.
+        evaluate (callable): Called with the game, or the CompactBoard of a
+            FreeCell search, at the end of a rollout which did not win and
+            returns a reward between 0 and 1.
+        key (callable): Called with the game, returns a hashable key of its
+            position to recognize transpositions of games other than
+            FreeCell.
+        transpositions (bool): Share nodes between identical positions.
+        threads (int): The number of threads running iterations.
+        processes (int): The number of processes searching separate trees.
+        virtual_loss (int): The visits added to nodes in use by a thread.
+        seed (int): The seed of the random choices.
+
+    Attributes:
+        root (Node): The root of the last search, in the calling process.
+        completed (int): The number of iterations of the last search.
+
+    Methods:
+        search(game) -> tuple: Chooses a move.
+        statistics() -> dict: Returns the visits and mean rewards of the
+            moves at the root.
+    """
+
+    def __init__(
+        self,
+        iterations: int = 1000,
+        max_time: float = None,
+        exploration: float = 1.4,
+        rollout_policy=random_rollout,
+        rollout_depth: int = 100,
+        evaluate=None,
+        key=None,
+        transpositions: bool = True,
+        threads: int = 1,
+        processes: int = 1,
+        virtual_loss: int = 1,
+        seed: int = None,
+    ) -> None:
+        self.iterations = iterations
+        self.max_time = max_time
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy
+        self.rollout_depth = rollout_depth
+        self.evaluate = evaluate
+        self.key = key
+        self.transpositions = transpositions
+        self.threads = threads
+        self.processes = processes
+        self.virtual_loss = virtual_loss
+        self.seed = seed
+        self.root = None
+        self.completed = 0
+        self.__statistics = dict()
+        if iterations is None and max_time is None:
+            raise ValueError("A search needs a number of iterations or a time limit")
+
+    def search(self, game) -> tuple:
+        """
+        Chooses a move, the one visited most often by the search.
+
+        Args:
+            game (Game): The game, it is not modified.
+
+        Returns:
+            tuple: One of game.get_moves().
+
+        Raises:
+            ValueError: If the game has no moves.
+        """
+        if self.processes > 1:
+            return self.__search_processes(game)
+
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+        self.root = Node()
+        self.completed = 0
+        self.__started = 0
+        self.__nodes = dict()
+        self.__lock = threading.Lock()
+        random = Random(self.seed)
+        seeds = [random.getrandbits(64) for _ in range(self.threads)]
+
+        if self.threads == 1:
+            self.__run(game, deadline, seeds[0])
+        else:
+            workers = [
+                threading.Thread(target=self.__run, args=(game, deadline, seed))
+                for seed in seeds
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        root = self.root
+        self.__statistics = {
+            move: (visits, value / visits)
+            for move, visits, value in zip(
+                root.moves, root.edge_visits, root.edge_values
+            )
+            if visits
+        }
+        return self.__best_move()
+
+    def __best_move(self) -> tuple:
+        if not self.__statistics:
+            raise ValueError("No moves to search")
+        return max(self.__statistics.items(), key=lambda item: item[1][0])[0]
+
+    def statistics(self) -> dict:
+        """
+        Returns the statistics of the moves at the root of the last search.
+
+        Returns:
+            dict: The number of visits and the mean reward of every move tried
+                by the search, summed over the trees of all processes.
+        """
+        return self.__statistics
+
+    def __getstate__(self) -> dict:
+        # The tree and the lock of a search stay in its process
+        return {
+            name: value
+            for name, value in vars(self).items()
+            if name == "_MCTS__statistics" or not name.startswith("_MCTS__")
+        } | {"root": None}
+
+    def __run(self, game, deadline: float, seed: int) -> None:
+        """
+        Runs iterations until the budget of the search is used up.
+        """
+        if isinstance(game, FreeCell):
+            position = _FreeCellSearch(game)
+        else:
+            position = _GameSearch(game, self.key)
+        random = Random(seed)
+        lock = self.__lock
+
+        while True:
+            with lock:
+                if self.iterations is not None and self.__started >= self.iterations:
+                    return
+                if deadline is not None and perf_counter() > deadline:
+                    return
+                self.__started += 1
+                position.restore()
+                path, moves = self.__select(position)
+
+            reward = self.__rollout(position, moves, random)
+
+            with lock:
+                for node, index in path:
+                    node.visits += 1 - self.virtual_loss
+                    node.value += reward
+                    if index is not None:
+                        node.edge_visits[index] += 1 - self.virtual_loss
+                        node.edge_values[index] += reward
+                self.completed += 1
+
+    def __select(self, position) -> tuple:
+        """
+        Descends from the root to a new node or a node ending the game,
+        adding a virtual loss to every node and edge on the path.
+
+        Returns:
+            tuple: The path as (node, index of the move taken) pairs, the
+                index being None for the last node, and the legal moves of
+                the last node.
+        """
+        node = self.root
+        path = [(node, None)]
+        on_path = {id(node)}
+        node.visits += self.virtual_loss
+
+        while True:
+            if node.moves is None:
+                node.expand(position.moves())
+                return path, node.moves
+            if not node.moves:
+                return path, node.moves
+
+            index = self.__choose(node, on_path)
+            if index is None:
+                return path, position.moves()
+
+            path[-1] = (node, index)
+            node.edge_visits[index] += self.virtual_loss
+            position.play(node.moves[index])
+            child = node.children[index]
+            if child is None:
+                key = position.key() if self.transpositions else None
+                child = None if key is None else self.__nodes.get(key)
+                if child is None:
+                    child = Node()
+                    if key is not None:
+                        self.__nodes[key] = child
+                node.children[index] = child
+
+            node = child
+            path.append((node, None))
+            on_path.add(id(node))
+            node.visits += self.virtual_loss
+
+    def __choose(self, node: Node, on_path: set) -> int:
+        """
+        Chooses the child to descend to, an untried move first and the move
+        with the highest UCT score of its edge otherwise.
+
+        Returns:
+            int: The index of the move, None if every child is on the path.
+        """
+        best, best_score = None, -math.inf
+        log_visits = math.log(max(node.visits, 1))
+        for index, child in enumerate(node.children):
+            if child is None:
+                return index
+            if id(child) in on_path:
+                continue
+            visits = node.edge_visits[index]
+            if not visits:
+                return index
+            score = node.edge_values[index] / visits + self.exploration * math.sqrt(
+                log_visits / visits
+            )
+            if score > best_score:
+                best, best_score = index, score
+        return best
+
+    def __rollout(self, position, moves: list, random: Random) -> float:
+        """
+        Plays moves of the rollout policy from the last position of a path.
+
+        Returns:
+            float: The reward of the rollout.
+        """
+        for _ in range(self.rollout_depth):
+            if not moves:
+                break
+            position.play(self.rollout_policy(moves, random))
+            moves = position.moves()
+
+        if not moves and position.won():
+            return 1.0
+        if self.evaluate is not None:
+            return self.evaluate(position.game)
+        return position.evaluate()
+
+    def __search_processes(self, game) -> tuple:
+        """
+        Searches a separate tree in every process and chooses the move with
+        the most visits in total.
+        """
+        searches = []
+        random = Random(self.seed)
+        for _ in range(self.processes):
+            search = copy.copy(self)
+            search.processes = 1
+            if self.iterations is not None:
+                search.iterations = -(-self.iterations // self.processes)
+            search.seed = random.getrandbits(64)
+            searches.append((search, game))
+
+        self.root = None
+        self.completed = 0
+        totals = dict()
+        with Pool(self.processes) as pool:
+            for completed, statistics in pool.imap_unordered(
+                _search_statistics, searches
+            ):
+                self.completed += completed
+                for move, (visits, mean) in statistics.items():
+                    total_visits, total_value = totals.get(move, (0, 0.0))
+                    totals[move] = (total_visits + visits, total_value + visits * mean)
+        self.__statistics = {
+            move: (visits, value / visits) for move, (visits, value) in totals.items()
+        }
+        return self.__best_move()
+
+
+def _search_statistics(arguments: tuple) -> dict:
+    search, game = arguments
+    try:
+        search.search(game)
+    except ValueError:
+        pass
+    return search.completed, search.statistics()
@@ -0,0 +1,187 @@
+import numpy as np
+
+from game.Action import NUM_COLUMNS, NUM_FREE_CELLS
+from game.FreeCellBatch import MAX_HEIGHT, NO_CARD
+from game.Snapshot import (
+    CELLS_OFFSET,
+    EMPTY,
+    LENGTHS_OFFSET,
+    MOVE_COUNT_OFFSET,
+    STATE_SIZE,
+)
+
+# An observation has one row per card, in the order of Card.index, and one
+# feature per plane:
+#
+#   planes  0..7   the card is in this column
+#   planes  8..11  the card is in this free cell
+#   plane  12      the card is on its suit stack
+#   plane  13      the card can be moved, it is on top of a column or in a cell
+#   plane  14      the number of cards on top of it, divided by MAX_HEIGHT
+COLUMN_PLANE = 0
+FREE_CELL_PLANE = COLUMN_PLANE + NUM_COLUMNS
+SUIT_STACK_PLANE = FREE_CELL_PLANE + NUM_FREE_CELLS
+TOP_PLANE = SUIT_STACK_PLANE + 1
+DEPTH_PLANE = TOP_PLANE + 1
+NUM_PLANES = DEPTH_PLANE + 1
+OBSERVATION_SHAPE = (52, NUM_PLANES)
+
+POSITIONS = np.arange(CELLS_OFFSET)
+LENGTH_SHIFTS = np.arange(NUM_COLUMNS, dtype=np.uint64) * 5
+BYTE_SHIFTS = np.arange(MOVE_COUNT_OFFSET - LENGTHS_OFFSET, dtype=np.uint64) * 8
+
+
+def _output(out, games: int, dtype) -> np.ndarray:
+    if out is None:
+        return np.zeros((games,) + OBSERVATION_SHAPE, dtype=dtype)
+    if out.shape != (games,) + OBSERVATION_SHAPE:
+        raise ValueError(f"Output of shape {out.shape} does not fit {games} games")
+    out.fill(0)
+    return out
+
+
+def encode_states(states, out: np.ndarray = None, dtype=np.float32) -> np.ndarray:
+    """
+    Encodes states written by FreeCell.write_state into observations.
+
+    Args:
+        states (array_like): uint8 array of shape (games, STATE_SIZE), or any
+            buffer holding the states one after the other.
+        out (np.ndarray): The array of shape (games,) + OBSERVATION_SHAPE to
+            write the observations to, a new one if not given.
+        dtype: The type of a new output array.
+
+    Returns:
+        np.ndarray: The observations, out if given.
+
+    Raises:
+        ValueError: If out does not have the shape of the observations.
+    """
+    states = np.frombuffer(states, dtype=np.uint8).reshape(-1, STATE_SIZE)
+    games = len(states)
+    out = _output(out, games, dtype)
+
+    # Lengths of the columns and the column of every position in the state
+    packed = (
+        states[:, LENGTHS_OFFSET:MOVE_COUNT_OFFSET].astype(np.uint64) << BYTE_SHIFTS
+    ).sum(axis=1, dtype=np.uint64)
+    lengths = (packed[:, None] >> LENGTH_SHIFTS & 0x1F).astype(np.intp)
+    ends = np.cumsum(lengths, axis=1)
+    columns = (POSITIONS[None, :, None] >= ends[:, None, :]).sum(axis=2)
+
+    cards = states[:, :CELLS_OFFSET]
+    games_, positions = np.nonzero(cards != EMPTY)
+    cards_, columns = cards[games_, positions], columns[games_, positions]
+    depths = ends[games_, columns] - 1 - positions
+    out[games_, cards_, COLUMN_PLANE + columns] = 1
+    out[games_, cards_, TOP_PLANE] = depths == 0
+    out[games_, cards_, DEPTH_PLANE] = depths / MAX_HEIGHT
+
+    cells = states[:, CELLS_OFFSET:LENGTHS_OFFSET]
+    games_, slots = np.nonzero(cells != EMPTY)
+    cards_ = cells[games_, slots]
+    out[games_, cards_, FREE_CELL_PLANE + slots] = 1
+    out[games_, cards_, TOP_PLANE] = 1
+
+    # Every card missing from the columns and free cells is on its suit stack
+    out[:, :, SUIT_STACK_PLANE] = 1 - out[:, :, COLUMN_PLANE:SUIT_STACK_PLANE].sum(
+        axis=2
+    )
+    return out
+
+
+def encode(freecell, out: np.ndarray = None, dtype=np.float32) -> np.ndarray:
+    """
+    Encodes the board of a game into an observation.
+
+    Args:
+        freecell (FreeCell): The game.
+        out (np.ndarray): The array of shape OBSERVATION_SHAPE to write the
+            observation to, a new one if not given.
+        dtype: The type of a new output array.
+
+    Returns:
+        np.ndarray: The observation, out if given.
+    """
+    if out is None:
+        out = np.zeros(OBSERVATION_SHAPE, dtype=dtype)
+    elif out.shape != OBSERVATION_SHAPE:
+        raise ValueError(f"Output of shape {out.shape} does not fit a game")
+    else:
+        out.fill(0)
+
+    # A single board is faster to encode with a loop than with the array
+    # operations of encode_states, which only pay off for many boards
+    columns, cells, _ = freecell.board.get_position()
+    ones, depth_cards, depths = [], [], []
+    for column, cards in enumerate(columns):
+        depth = len(cards)
+        for card in cards:
+            depth -= 1
+            ones.append(card * NUM_PLANES + COLUMN_PLANE + column)
+            if depth:
+                depth_cards.append(card)
+                depths.append(depth)
+            else:
+                ones.append(card * NUM_PLANES + TOP_PLANE)
+    for slot, card in enumerate(cells):
+        if card != EMPTY:
+            ones.append(card * NUM_PLANES + FREE_CELL_PLANE + slot)
+            ones.append(card * NUM_PLANES + TOP_PLANE)
+
+    out.put(ones, 1)
+    out[depth_cards, DEPTH_PLANE] = np.divide(depths, MAX_HEIGHT)
+    out[:, SUIT_STACK_PLANE] = 1 - out[:, COLUMN_PLANE:SUIT_STACK_PLANE].sum(axis=1)
+    return out
+
+
+def encode_games(games, out: np.ndarray = None, dtype=np.float32) -> np.ndarray:
+    """
+    Encodes the boards of many games into observations at once.
+
+    Args:
+        games (sequence of FreeCell): The games.
+        out (np.ndarray): The array of shape (len(games),) + OBSERVATION_SHAPE
+            to write the observations to, a new one if not given.
+        dtype: The type of a new output array.
+
+    Returns:
+        np.ndarray: The observations, out if given.
+    """
+    states = bytearray(STATE_SIZE * len(games))
+    for i, freecell in enumerate(games):
+        freecell.write_state(states, i * STATE_SIZE)
+    return encode_states(states, out, dtype)
+
+
+def encode_batch(batch, out: np.ndarray = None, dtype=np.float32) -> np.ndarray:
+    """
+    Encodes the boards of a FreeCellBatch into observations.
+
+    Args:
+        batch (FreeCellBatch): The games.
+        out (np.ndarray): The array of shape (len(batch),) + OBSERVATION_SHAPE
+            to write the observations to, a new one if not given.
+        dtype: The type of a new output array.
+
+    Returns:
+        np.ndarray: The observations, out if given, the same as those of
+            encode_games for FreeCell games with the same boards.
+    """
+    out = _output(out, len(batch), dtype)
+    games_, columns, heights = np.nonzero(batch.columns != NO_CARD)
+    cards = batch.columns[games_, columns, heights]
+    depths = batch.heights[games_, columns] - 1 - heights
+    out[games_, cards, COLUMN_PLANE + columns] = 1
+    out[games_, cards, TOP_PLANE] = depths == 0
+    out[games_, cards, DEPTH_PLANE] = depths / MAX_HEIGHT
+
+    games_, slots = np.nonzero(batch.cells != NO_CARD)
+    cards = batch.cells[games_, slots]
+    out[games_, cards, FREE_CELL_PLANE + slots] = 1
+    out[games_, cards, TOP_PLANE] = 1
+
+    out[:, :, SUIT_STACK_PLANE] = 1 - out[:, :, COLUMN_PLANE:SUIT_STACK_PLANE].sum(
+        axis=2
+    )
+    return out
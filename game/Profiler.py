@@ -0,0 +1,215 @@
+import json
+import os
+from functools import wraps
+from time import perf_counter, time
+
+from game.Board import Board
+from game.CompactBoard import CompactBoard
+from game.Freecell import FreeCell
+
+# The methods timed by default, by class. is_valid_move is the validation
+# done by FreeCell.make_move before the board makes the move, and make_move
+# of Board dispatches to find_card_from_string and the move_to_* methods.
+OPERATIONS = {
+    FreeCell: ("get_moves", "make_move", "step", "get_state"),
+    Board: (
+        "get_moves",
+        "has_moves",
+        "is_valid_move",
+        "make_move",
+        "find_card_from_string",
+        "move_to_stack",
+        "move_to_free_cell",
+        "move_to_free_column",
+        "move_to_card",
+        "move_sequence_to_card",
+        "move_sequence_to_free_column",
+    ),
+    CompactBoard: ("get_moves", "has_moves", "is_valid_move", "make_move"),
+}
+
+# The enabled profiler, there can only be one as it replaces class methods.
+_enabled = None
+
+
+class Profiler:
+    """
+    Counts the calls of the methods of FreeCell and its boards and the time
+    spent in them.
+
+    While enabled, the methods are replaced on their classes with wrappers
+    which time every call, in all games of the process. Disabling restores
+    the original methods, so a disabled profiler costs nothing. Times are
+    inclusive: the time of FreeCell.make_move includes that of the board
+    methods it calls.
+
+    For long running processes, such as self-play workers, the counters can
+    be written to a JSON file every export_interval seconds. The check is
+    made when a timed call returns, so nothing is written while the methods
+    are not used.
+
+    Args:
+        operations (dict): The names of the methods to time by class,
+            OPERATIONS if not given.
+        export_path (str): The JSON file written by export, may contain
+            {pid} to write one file per process.
+        export_interval (float): The seconds between the exports, None to
+            only export on export and disable.
+
+    Methods:
+        enable(): Starts timing the methods.
+        disable(): Restores the methods, and exports if export_path is set.
+        stats() -> dict: Returns the calls and seconds of every method.
+        report() -> str: Returns the stats as a table.
+        reset(): Sets the counters to zero.
+        export(path=None): Writes the stats to a JSON file.
+    """
+
+    def __init__(
+        self,
+        operations: dict = None,
+        export_path: str = None,
+        export_interval: float = 60.0,
+    ) -> None:
+        self.operations = OPERATIONS if operations is None else operations
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.__counters = {
+            f"{cls.__name__}.{name}": [0, 0.0]
+            for cls, names in self.operations.items()
+            for name in names
+        }
+        self.__originals = []
+        self.__next_export = float("inf")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.__originals)
+
+    def enable(self) -> None:
+        """
+        Replaces the methods with timed wrappers.
+
+        Raises:
+            ValueError: If another profiler is enabled.
+        """
+        global _enabled
+        if _enabled is self:
+            return
+        if _enabled is not None:
+            raise ValueError("Another profiler is enabled")
+        for cls, names in self.operations.items():
+            for name in names:
+                original = cls.__dict__[name]
+                counter = self.__counters[f"{cls.__name__}.{name}"]
+                setattr(cls, name, self.__wrap(original, counter))
+                self.__originals.append((cls, name, original))
+        _enabled = self
+        self.__schedule_export()
+
+    def disable(self) -> None:
+        """
+        Restores the original methods. The counters are kept.
+        """
+        global _enabled
+        if _enabled is not self:
+            return
+        for cls, name, original in self.__originals:
+            setattr(cls, name, original)
+        self.__originals = []
+        self.__next_export = float("inf")
+        _enabled = None
+        if self.export_path is not None:
+            self.export()
+
+    def __wrap(self, function, counter: list):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = perf_counter()
+                counter[0] += 1
+                counter[1] += end - start
+                if end >= self.__next_export:
+                    self.export()
+
+        return timed
+
+    def __schedule_export(self) -> None:
+        if self.export_path is None or self.export_interval is None:
+            self.__next_export = float("inf")
+        else:
+            self.__next_export = perf_counter() + self.export_interval
+
+    def stats(self) -> dict:
+        """
+        Returns the counters.
+
+        Returns:
+            dict: For every method named as Class.method, a dict with the
+                number of calls and the seconds spent in them.
+        """
+        return {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in self.__counters.items()
+        }
+
+    def report(self) -> str:
+        """
+        Returns the counters as a table, the slowest methods first. Methods
+        which were not called are left out.
+
+        Returns:
+            str: The table, one line per method.
+        """
+        lines = [f"{'method':<36}{'calls':>12}{'total ms':>12}{'us/call':>10}"]
+        counters = sorted(
+            self.__counters.items(), key=lambda item: item[1][1], reverse=True
+        )
+        for name, (calls, seconds) in counters:
+            if calls:
+                lines.append(
+                    f"{name:<36}{calls:>12,}{seconds * 1e3:>12.1f}"
+                    f"{seconds / calls * 1e6:>10.2f}"
+                )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Sets the counters to zero.
+        """
+        for counter in self.__counters.values():
+            counter[:] = [0, 0.0]
+
+    def export(self, path: str = None) -> None:
+        """
+        Writes the counters to a JSON file, replacing it at once so readers
+        never see a partial file.
+
+        Args:
+            path (str): The file, export_path if not given. {pid} is replaced
+                with the id of the process.
+
+        Raises:
+            ValueError: If no path is given and export_path is not set.
+        """
+        if path is None:
+            path = self.export_path
+        if path is None:
+            raise ValueError("No export path")
+        path = path.format(pid=os.getpid())
+        stats = {"time": time(), "pid": os.getpid(), "operations": self.stats()}
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(stats, file, indent=2)
+        os.replace(f"{path}.tmp", path)
+        if self.enabled:
+            self.__schedule_export()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
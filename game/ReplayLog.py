@@ -0,0 +1,335 @@
+import struct
+import zlib
+from collections import namedtuple
+from multiprocessing import Pool
+
+from game.CompactBoard import CARD_ID, CARD_NAME, CompactBoard
+from game.DealCache import DEALS
+from game.Move import Move
+
+# A replay log starts with a header holding the options of the games, then
+# holds chunks of games, each a chunk header followed by the games, which
+# are optionally compressed with zlib. A game is its seed and number of moves
+# followed by the moves, two bytes each: the card in the low 6 bits and the
+# destination in the high bits, a card or one of DESTINATIONS.
+LOG_MAGIC = b"FCREPLAY"
+LOG_HEADER = struct.Struct("<8sB")
+CHUNK_HEADER = struct.Struct("<BII")
+GAME_HEADER = struct.Struct("<qH")
+SUPERMOVES = 1
+AUTOPLAY = 2
+COMPRESSED = 1
+MAX_MOVES = (1 << 16) - 1
+
+DESTINATIONS = (Move.SUIT_STACK.value, Move.FREECELL.value, Move.EMPTY_COLUMN.value)
+DESTINATION_ID = dict(CARD_ID)
+DESTINATION_ID.update({name: 52 + i for i, name in enumerate(DESTINATIONS)})
+DESTINATION_NAME = CARD_NAME + DESTINATIONS
+
+# A game read from a log, moves in the notation of FreeCell.get_moves.
+Replay = namedtuple("Replay", ["seed", "moves"])
+
+# A game of a log with an illegal move: its position in the log, its seed,
+# and the position and notation of the first illegal move.
+InvalidReplay = namedtuple("InvalidReplay", ["game", "seed", "index", "move"])
+
+
+def encode_move(move: tuple) -> int:
+    """
+    Encodes a move as a 16 bit integer.
+
+    Args:
+        move (tuple): A (card, destination) move of FreeCell.get_moves.
+
+    Returns:
+        int: The code of the move.
+
+    Raises:
+        ValueError: If the move does not name a card and a destination.
+    """
+    try:
+        return CARD_ID[move[0]] | DESTINATION_ID[move[1]] << 6
+    except KeyError:
+        raise ValueError(f"Invalid move {move}") from None
+
+
+def decode_move(code: int) -> tuple:
+    """
+    Decodes a move encoded by encode_move.
+
+    Args:
+        code (int): The code of the move.
+
+    Returns:
+        tuple: The move.
+    """
+    return (CARD_NAME[code & 0x3F], DESTINATION_NAME[code >> 6])
+
+
+class ReplayWriter:
+    """
+    Writes games to a replay log as they are played.
+
+    Games are collected into chunks of about chunk_size bytes, and every
+    chunk is written, compressed, in one piece. A game never spans chunks.
+
+    Args:
+        file: A path or a binary file opened for writing.
+        supermoves (bool): The games are played with supermoves.
+        autoplay (bool): The games are played in autoplay mode, the logged
+            moves are those made with make_move.
+        compress (bool): Compress the chunks with zlib.
+        chunk_size (int): The size in bytes after which a chunk is written.
+
+    Methods:
+        write(seed, moves): Adds a game.
+        flush(): Writes the collected games as a chunk.
+        close(): Writes the last chunk and closes the file.
+    """
+
+    def __init__(
+        self,
+        file,
+        supermoves: bool = False,
+        autoplay: bool = False,
+        compress: bool = True,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        self.__owned = not hasattr(file, "write")
+        self.__file = open(file, "wb") if self.__owned else file
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.__chunk = bytearray()
+        flags = (SUPERMOVES if supermoves else 0) | (AUTOPLAY if autoplay else 0)
+        self.__file.write(LOG_HEADER.pack(LOG_MAGIC, flags))
+
+    def write(self, seed: int, moves: list) -> None:
+        """
+        Adds a game.
+
+        Args:
+            seed (int): The seed of the deal.
+            moves (list): The moves in the notation of FreeCell.get_moves.
+
+        Raises:
+            ValueError: If a move is not a card and a destination, or the game
+                has more than MAX_MOVES moves.
+        """
+        if len(moves) > MAX_MOVES:
+            raise ValueError(f"Games are limited to {MAX_MOVES} moves")
+        codes = [encode_move(move) for move in moves]
+        self.__chunk += GAME_HEADER.pack(seed, len(codes))
+        self.__chunk += struct.pack(f"<{len(codes)}H", *codes)
+        if len(self.__chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the collected games as a chunk.
+        """
+        if not self.__chunk:
+            return
+        data = bytes(self.__chunk)
+        flags = 0
+        if self.compress:
+            data, flags = zlib.compress(data), COMPRESSED
+        self.__file.write(CHUNK_HEADER.pack(flags, len(self.__chunk), len(data)))
+        self.__file.write(data)
+        self.__chunk.clear()
+
+    def close(self) -> None:
+        """
+        Writes the last chunk, and closes the file if it was opened from a
+        path.
+        """
+        self.flush()
+        if self.__owned:
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ReplayReader:
+    """
+    Reads the games of a replay log one chunk at a time.
+
+    Args:
+        file: A path or a binary file opened for reading.
+
+    Attributes:
+        supermoves (bool): The games were played with supermoves.
+        autoplay (bool): The games were played in autoplay mode.
+
+    Methods:
+        chunks() -> Iterator[bytes]: Yields the chunks as stored.
+        close(): Closes the file.
+
+    Raises:
+        ValueError: If the file is not a replay log.
+    """
+
+    def __init__(self, file) -> None:
+        self.__owned = not hasattr(file, "read")
+        self.__file = open(file, "rb") if self.__owned else file
+        header = self.__file.read(LOG_HEADER.size)
+        if len(header) < LOG_HEADER.size or header[:8] != LOG_MAGIC:
+            self.close()
+            raise ValueError("Not a replay log")
+        _, flags = LOG_HEADER.unpack(header)
+        self.supermoves = bool(flags & SUPERMOVES)
+        self.autoplay = bool(flags & AUTOPLAY)
+
+    def __iter__(self):
+        """
+        Yields the games of the log.
+
+        Yields:
+            Replay: The seed and moves of every game, in the order written.
+        """
+        for chunk in self.chunks():
+            yield from parse_chunk(chunk)
+
+    def chunks(self):
+        """
+        Yields the chunks of the log as stored, to be parsed with parse_chunk,
+        e.g. in other processes.
+
+        Raises:
+            ValueError: If the log is truncated.
+        """
+        while True:
+            header = self.__file.read(CHUNK_HEADER.size)
+            if not header:
+                return
+            if len(header) < CHUNK_HEADER.size:
+                raise ValueError("Truncated replay log")
+            _, _, size = CHUNK_HEADER.unpack(header)
+            data = self.__file.read(size)
+            if len(data) < size:
+                raise ValueError("Truncated replay log")
+            yield header + data
+
+    def close(self) -> None:
+        """
+        Closes the file if it was opened from a path.
+        """
+        if self.__owned:
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def parse_chunk(chunk: bytes):
+    """
+    Yields the games of a chunk returned by ReplayReader.chunks.
+
+    Yields:
+        Replay: The seed and moves of every game of the chunk.
+    """
+    flags, raw_size, _ = CHUNK_HEADER.unpack_from(chunk)
+    data = memoryview(chunk)[CHUNK_HEADER.size :]
+    if flags & COMPRESSED:
+        data = memoryview(zlib.decompress(data))
+    if len(data) != raw_size:
+        raise ValueError("Corrupted replay log chunk")
+
+    offset = 0
+    while offset < len(data):
+        seed, count = GAME_HEADER.unpack_from(data, offset)
+        offset += GAME_HEADER.size
+        moves = struct.unpack_from(f"<{count}H", data, offset)
+        offset += 2 * count
+        yield Replay(seed, [decode_move(code) for code in moves])
+
+
+def validate(
+    seed: int, moves: list, supermoves: bool = False, autoplay: bool = False
+) -> int:
+    """
+    Replays a game and finds its first illegal move.
+
+    Args:
+        seed (int): The seed of the deal.
+        moves (list): The moves in the notation of FreeCell.get_moves.
+        supermoves (bool): Play with supermoves.
+        autoplay (bool): Play in autoplay mode.
+
+    Returns:
+        int: The position of the first illegal move, None if all are legal.
+    """
+    # make_move of CompactBoard accepts exactly the moves of get_moves, so
+    # checking a move does not need all the moves to be listed
+    board = CompactBoard(DEALS.get(seed), supermoves)
+    if autoplay:
+        board.autoplay()
+    for index, move in enumerate(moves):
+        try:
+            if not board.make_move(move):
+                return index
+        except KeyError:
+            return index
+        if autoplay:
+            board.autoplay()
+    return None
+
+
+def validate_log(file, processes: int = None) -> list:
+    """
+    Replays the games of a log and finds those with illegal moves. The chunks
+    are validated in a pool of processes while the log is read.
+
+    Args:
+        file: A path or a binary file of the log.
+        processes (int): The number of worker processes, the number of CPUs
+            if not given. With 1 the games are validated in the calling
+            process.
+
+    Returns:
+        list: An InvalidReplay for every game with an illegal move.
+    """
+    with ReplayReader(file) as reader:
+        tasks = (
+            (chunk, reader.supermoves, reader.autoplay) for chunk in reader.chunks()
+        )
+        if processes == 1:
+            return _collect(map(_validate_chunk, tasks))
+        with Pool(processes) as pool:
+            return _collect(pool.imap(_validate_chunk, tasks))
+
+
+def _collect(results) -> list:
+    """
+    Numbers the invalid games of the chunks in the order of the log.
+    """
+    invalid = []
+    games = 0
+    for count, errors in results:
+        invalid += [error._replace(game=games + error.game) for error in errors]
+        games += count
+    return invalid
+
+
+def _validate_chunk(task: tuple) -> tuple:
+    """
+    Validates the games of a chunk.
+
+    Returns:
+        tuple: The number of games and the InvalidReplay of the invalid
+            games, numbered within the chunk.
+    """
+    chunk, supermoves, autoplay = task
+    invalid = []
+    count = 0
+    for count, (seed, moves) in enumerate(parse_chunk(chunk), 1):
+        index = validate(seed, moves, supermoves, autoplay)
+        if index is not None:
+            invalid.append(InvalidReplay(count - 1, seed, index, moves[index]))
+    return count, invalid
@@ -0,0 +1,115 @@
+from collections import namedtuple
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+from game.Freecell import FreeCell
+from game.Game import State
+
+# The outcome of one game played by a Runner. state is ONGOING if the game was
+# stopped after max_moves, time is the wall time of the game in seconds.
+GameResult = namedtuple("GameResult", ["seed", "state", "move_count", "time"])
+
+# The runner used by the worker processes of a pool, set by __init_worker.
+_worker = None
+
+
+class RandomPolicy:
+    """
+    A policy choosing a uniformly random move.
+
+    Args:
+        seed (int): The seed of the random choices. If given, the generator is
+            reseeded at the start of every game from this seed and the seed of
+            the deal, so a game is played the same way in any process and in
+            any order. Otherwise the choices are not reproducible.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        self.seed = seed
+        self.__random = Random(seed)
+
+    def __call__(self, freecell: FreeCell) -> tuple:
+        if self.seed is not None and freecell._move_count == 0:
+            self.__random.seed(self.seed << 32 | freecell.deck.seed)
+        return self.__random.choice(freecell.get_moves())
+
+
+class Runner:
+    """
+    Plays FreeCell games for many seeds with a policy, distributing the seeds
+    across a pool of processes.
+
+    Seeds are handed out one at a time to whichever worker is idle, so a few
+    long games do not leave the other processes waiting, and the results are
+    returned as soon as each game ends.
+
+    Args:
+        policy (callable): Called with the FreeCell game and returns one of its
+            get_moves. It has to be picklable, e.g. a module level function or
+            an instance of a module level class.
+        processes (int): The number of worker processes, the number of CPUs if
+            not given. With 1 the games are played in the calling process.
+        max_moves (int): The number of moves after which a game is stopped.
+        compact (bool): Play on the CompactBoard backend.
+
+    Methods:
+        play(seed) -> GameResult: Plays one game in the calling process.
+        run(seeds) -> Iterator[GameResult]: Plays a game for every seed.
+    """
+
+    def __init__(
+        self,
+        policy,
+        processes: int = None,
+        max_moves: int = 1000,
+        compact: bool = False,
+    ) -> None:
+        self.policy = policy
+        self.processes = processes
+        self.max_moves = max_moves
+        self.compact = compact
+
+    def play(self, seed: int) -> GameResult:
+        """
+        Plays one game in the calling process.
+
+        Args:
+            seed (int): The seed of the deal.
+
+        Returns:
+            GameResult: The outcome of the game.
+        """
+        start = perf_counter()
+        freecell = FreeCell(seed, compact=self.compact)
+        state = freecell.get_state()
+        while state == State.ONGOING and freecell._move_count < self.max_moves:
+            freecell.make_move(self.policy(freecell))
+            state = freecell.get_state()
+        return GameResult(seed, state, freecell._move_count, perf_counter() - start)
+
+    def run(self, seeds):
+        """
+        Plays a game for every seed.
+
+        Args:
+            seeds (iterable of int): The seeds of the deals.
+
+        Yields:
+            GameResult: The outcome of every game, in the order the games end.
+        """
+        if self.processes == 1:
+            yield from map(self.play, seeds)
+            return
+
+        with Pool(self.processes, initializer=_init_worker, initargs=(self,)) as pool:
+            yield from pool.imap_unordered(_play, seeds, chunksize=1)
+
+
+def _init_worker(runner: Runner) -> None:
+    global _worker
+    _worker = runner
+
+
+def _play(seed: int) -> GameResult:
+    return _worker.play(seed)
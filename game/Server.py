@@ -0,0 +1,372 @@
+import argparse
+import asyncio
+import json
+import secrets
+import sys
+from collections import OrderedDict
+
+from game.CompactBoard import CARD_NAME, EMPTY
+from game.Card import SUITS
+from game.Freecell import FreeCell
+
+# The estimated memory of a session in bytes: a game with its cached moves,
+# and every move of its history, for the Board and the CompactBoard backend.
+SESSION_BYTES = {False: 5000, True: 2600}
+MOVE_BYTES = {False: 100, True: 8}
+
+
+class Session:
+    """
+    A game hosted by the server.
+
+    Attributes:
+        freecell (FreeCell): The game.
+        size (int): The estimated memory of the session in bytes.
+        last_used (float): The event loop time of the last request.
+    """
+
+    __slots__ = ("freecell", "size", "last_used")
+
+    def __init__(self, freecell: FreeCell, last_used: float) -> None:
+        self.freecell = freecell
+        self.size = 0
+        self.last_used = last_used
+
+
+class GameServer:
+    """
+    Hosts FreeCell games for many clients in one asyncio event loop.
+
+    Clients connect over TCP and send requests as JSON objects, one per
+    line, and receive one JSON line per request, in order. A request names
+    an operation in "op" and may carry a "request" value which is copied to
+    its response. The operations are:
+
+        new       Deals a game, from "seed" if given, with the "supermoves"
+                  and "autoplay" options, and returns its "session" id and
+                  its snapshot.
+        moves     Returns the "moves" of a "session".
+        move      Makes the "move" [card, destination] in a "session" and
+                  returns its "state", "move_count" and "autoplayed" moves.
+        snapshot  Returns the board of a "session", see snapshot.
+        close     Ends a "session".
+
+    Responses hold "ok": true, or "ok": false and an "error" message.
+
+    The requests read from all connections in one iteration of the event
+    loop are executed together in a single callback, and the responses to
+    a connection are sent in a single write.
+
+    Sessions are kept in the order they were last used. When the estimated
+    memory of all sessions exceeds memory_budget, the least recently used
+    ones are evicted, and sessions idle for longer than idle_timeout are
+    evicted regularly. Requests to an evicted session fail like those to
+    an unknown one.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on, 0 for any free port.
+        memory_budget (int): The estimated memory of all sessions in bytes.
+        idle_timeout (float): The seconds after which an unused session is
+            evicted, None to keep sessions until the budget is exceeded.
+        compact (bool): Play the games on the CompactBoard backend.
+
+    Attributes:
+        sessions (OrderedDict): The sessions by id, least recently used first.
+        memory (int): The estimated memory of the sessions in bytes.
+        port (int): The port listened on, once started.
+
+    Methods:
+        start(): Starts listening.
+        serve_forever(): Starts listening and serves until cancelled.
+        close(): Stops listening and closes the connections.
+        stats() -> dict: Returns counters of the server.
+        snapshot(freecell) -> dict: Returns the board of a game as JSON.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        memory_budget: int = 256 << 20,
+        idle_timeout: float = 600.0,
+        compact: bool = True,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.compact = compact
+        self.sessions = OrderedDict()
+        self.memory = 0
+        self.__server = None
+        self.__sweeper = None
+        self.__writers = set()
+        self.__pending = []
+        self.__counters = {"requests": 0, "batches": 0, "evicted": 0}
+        self.__operations = {
+            "new": self.__new,
+            "moves": self.__moves,
+            "move": self.__move,
+            "snapshot": self.__snapshot,
+            "close": self.__close,
+        }
+
+    async def start(self) -> None:
+        """
+        Starts listening for connections.
+        """
+        self.__server = await asyncio.start_server(self.__serve, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        if self.idle_timeout is not None:
+            self.__sweeper = asyncio.create_task(self.__sweep())
+
+    async def serve_forever(self) -> None:
+        """
+        Starts listening and serves until the task is cancelled.
+        """
+        await self.start()
+        try:
+            await self.__server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Stops listening and closes the connections. The sessions are kept.
+        """
+        if self.__sweeper is not None:
+            self.__sweeper.cancel()
+            self.__sweeper = None
+        if self.__server is not None:
+            self.__server.close()
+            for writer in list(self.__writers):
+                writer.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the server.
+
+        Returns:
+            dict: The number of sessions, their estimated memory, and the
+                numbers of requests, of batches they were executed in and of
+                evicted sessions.
+        """
+        return {
+            "sessions": len(self.sessions),
+            "memory": self.memory,
+            **self.__counters,
+        }
+
+    async def __serve(self, reader, writer) -> None:
+        """
+        Reads the requests of a connection into the pending batch.
+        """
+        self.__writers.add(writer)
+        try:
+            while line := await reader.readline():
+                if not self.__pending:
+                    asyncio.get_running_loop().call_soon(self.__execute_pending)
+                self.__pending.append((writer, line))
+                # Stop reading from a client which does not read its responses
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError if a line is longer than the limit of the reader
+            pass
+        finally:
+            self.__writers.discard(writer)
+            writer.close()
+
+    def __execute_pending(self) -> None:
+        """
+        Executes the requests read since the last call, and sends the
+        responses to every connection at once.
+        """
+        batch, self.__pending = self.__pending, []
+        self.__counters["batches"] += 1
+        self.__counters["requests"] += len(batch)
+        responses = dict()
+        for writer, line in batch:
+            response = json.dumps(self.__execute(line)).encode() + b"\n"
+            responses.setdefault(writer, []).append(response)
+        for writer, lines in responses.items():
+            if not writer.is_closing():
+                writer.write(b"".join(lines))
+
+    def __execute(self, line: bytes) -> dict:
+        """
+        Executes a request.
+
+        Returns:
+            dict: The response.
+        """
+        # Any error is answered, an exception escaping would drop the
+        # responses of the whole batch
+        try:
+            request = json.loads(line)
+        except Exception:
+            return {"ok": False, "error": "Invalid JSON"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "A request must be an object"}
+
+        try:
+            operation = self.__operations.get(request.get("op"))
+            if operation is None:
+                raise ValueError(f"Unknown operation {request.get('op')}")
+            response = {"ok": True, **operation(request)}
+        except (ValueError, TypeError) as error:
+            response = {"ok": False, "error": str(error)}
+        except Exception as error:
+            response = {"ok": False, "error": f"Internal error: {error!r}"}
+        if "request" in request:
+            response["request"] = request["request"]
+        return response
+
+    def __session(self, request: dict) -> Session:
+        """
+        Returns the session of a request and marks it as used.
+
+        Raises:
+            ValueError: If there is no such session.
+        """
+        session_id = request.get("session")
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"Unknown session {session_id}")
+        self.sessions.move_to_end(session_id)
+        session.last_used = asyncio.get_running_loop().time()
+        return session
+
+    def __resize(self, session: Session) -> None:
+        """
+        Updates the estimated memory of a session after a request.
+        """
+        freecell = session.freecell
+        size = SESSION_BYTES[freecell.compact] + MOVE_BYTES[freecell.compact] * len(
+            freecell.board.history
+        )
+        self.memory += size - session.size
+        session.size = size
+
+    def __evict(self, session_id: str) -> None:
+        self.memory -= self.sessions.pop(session_id).size
+        self.__counters["evicted"] += 1
+
+    def __enforce_budget(self) -> None:
+        """
+        Evicts the least recently used sessions until the memory budget is
+        met, sparing the most recently used one, which is being served.
+        """
+        while self.memory > self.memory_budget and len(self.sessions) > 1:
+            self.__evict(next(iter(self.sessions)))
+
+    def __new(self, request: dict) -> dict:
+        seed = request.get("seed")
+        if seed is not None and not isinstance(seed, int):
+            raise ValueError("The seed must be an integer")
+        freecell = FreeCell(
+            seed,
+            compact=self.compact,
+            supermoves=bool(request.get("supermoves", False)),
+            autoplay=bool(request.get("autoplay", False)),
+        )
+        session_id = secrets.token_hex(8)
+        session = Session(freecell, asyncio.get_running_loop().time())
+        self.sessions[session_id] = session
+        self.__resize(session)
+        self.__enforce_budget()
+        return {"session": session_id, **self.snapshot(freecell)}
+
+    def __moves(self, request: dict) -> dict:
+        return {"moves": self.__session(request).freecell.get_moves()}
+
+    def __move(self, request: dict) -> dict:
+        session = self.__session(request)
+        move = request.get("move")
+        if not isinstance(move, list) or len(move) != 2:
+            raise ValueError("A move must be a [card, destination] list")
+        freecell = session.freecell
+        freecell.make_move(tuple(move))
+        self.__resize(session)
+        self.__enforce_budget()
+        return {
+            "state": freecell.get_state().name,
+            "move_count": freecell._move_count,
+            "autoplayed": freecell.autoplayed,
+        }
+
+    def __snapshot(self, request: dict) -> dict:
+        return self.snapshot(self.__session(request).freecell)
+
+    def __close(self, request: dict) -> dict:
+        self.__session(request)
+        self.memory -= self.sessions.pop(request["session"]).size
+        return {}
+
+    async def __sweep(self) -> None:
+        """
+        Evicts the sessions idle for longer than idle_timeout.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            expired = loop.time() - self.idle_timeout
+            while self.sessions:
+                session_id, session = next(iter(self.sessions.items()))
+                if session.last_used > expired:
+                    break
+                self.__evict(session_id)
+
+    @staticmethod
+    def snapshot(freecell: FreeCell) -> dict:
+        """
+        Returns the board of a game in a form that can be encoded as JSON.
+
+        Args:
+            freecell (FreeCell): The game.
+
+        Returns:
+            dict: The "columns" as lists of card names from the bottom, the
+                "free_cells" as card names or None, the rank on top of the
+                "suit_stacks" by suit, the "state" of the game, its
+                "move_count" and the "seed" of the deal.
+        """
+        columns, cells, foundations = freecell.board.get_position()
+        return {
+            "columns": [[CARD_NAME[card] for card in column] for column in columns],
+            "free_cells": [
+                None if card == EMPTY else CARD_NAME[card] for card in cells
+            ],
+            "suit_stacks": dict(zip(SUITS, foundations)),
+            "state": freecell.get_state().name,
+            "move_count": freecell._move_count,
+            "seed": freecell.deck.seed,
+        }
+
+
+def main(argv=None) -> int:
+    """
+    Runs a server from the command line until interrupted, see --help.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(description="Serve FreeCell games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--memory-budget", type=int, default=256 << 20)
+    parser.add_argument("--idle-timeout", type=float, default=600.0)
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.host, args.port, args.memory_budget, args.idle_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# Fixed size binary encoding of a FreeCell position and move count:
+#
+#   bytes  0..51  the cards in the columns as Card.index values, column after
+#                 column from the bottom, padded with EMPTY
+#   bytes 52..55  the free cells, EMPTY for an empty cell
+#   bytes 56..60  the lengths of the 8 columns, 5 bits each, little endian
+#   bytes 61..63  the move count, little endian
+#
+# The suit stacks are not stored: every card missing from the columns and
+# free cells is on its suit stack, so the rank on top of a stack is the
+# number of missing cards of its suit.
+
+STATE_SIZE = 64
+EMPTY = 0xFF
+NUM_COLUMNS = 8
+CELLS_OFFSET = 52
+LENGTHS_OFFSET = 56
+MOVE_COUNT_OFFSET = 61
+MAX_MOVE_COUNT = (1 << 24) - 1
+
+
+def encode_state(position: tuple, move_count: int, buffer, offset: int = 0) -> None:
+    """
+    Writes a position into a buffer.
+
+    Args:
+        position (tuple): The columns, free cells and suit stacks as returned
+            by Board.get_position.
+        move_count (int): The number of moves made, at most MAX_MOVE_COUNT.
+        buffer: A writable buffer, e.g. a bytearray, memoryview, mmap or
+            shared memory, with STATE_SIZE bytes from offset on.
+        offset (int): The position of the state in the buffer.
+
+    Raises:
+        ValueError: If the move count does not fit.
+    """
+    if not 0 <= move_count <= MAX_MOVE_COUNT:
+        raise ValueError("Move count does not fit into a state")
+
+    columns, cells, _ = position
+    view = memoryview(buffer)[offset : offset + STATE_SIZE]
+    start = 0
+    lengths = 0
+    for i, col in enumerate(columns):
+        view[start : start + len(col)] = col
+        start += len(col)
+        lengths |= len(col) << 5 * i
+    view[start:CELLS_OFFSET] = bytes([EMPTY]) * (CELLS_OFFSET - start)
+    view[CELLS_OFFSET:LENGTHS_OFFSET] = cells
+    view[LENGTHS_OFFSET:MOVE_COUNT_OFFSET] = lengths.to_bytes(5, "little")
+    view[MOVE_COUNT_OFFSET:STATE_SIZE] = move_count.to_bytes(3, "little")
+
+
+def decode_state(buffer, offset: int = 0) -> tuple:
+    """
+    Reads a position from a buffer written by encode_state.
+
+    Args:
+        buffer: A buffer with STATE_SIZE bytes from offset on.
+        offset (int): The position of the state in the buffer.
+
+    Returns:
+        tuple: The position in the format of Board.get_position, and the
+            move count.
+    """
+    view = memoryview(buffer)[offset : offset + STATE_SIZE]
+    lengths = int.from_bytes(view[LENGTHS_OFFSET:MOVE_COUNT_OFFSET], "little")
+    columns = []
+    start = 0
+    for i in range(NUM_COLUMNS):
+        length = lengths >> 5 * i & 0x1F
+        columns.append(bytes(view[start : start + length]))
+        start += length
+    cells = bytes(view[CELLS_OFFSET:LENGTHS_OFFSET])
+
+    foundations = bytearray([13] * 4)
+    for card in bytes(view[:start]) + cells:
+        if card != EMPTY:
+            foundations[card // 13] -= 1
+    move_count = int.from_bytes(view[MOVE_COUNT_OFFSET:STATE_SIZE], "little")
+    return (tuple(columns), cells, bytes(foundations)), move_count
@@ -0,0 +1,232 @@
+import heapq
+from time import perf_counter
+
+from game.CompactBoard import (
+    CARD_RANK,
+    CARD_SUIT,
+    EMPTY,
+    CompactBoard,
+)
+from game.Deck import Deck
+from game.Move import Move
+from game.TranspositionTable import TranspositionTable
+
+
+class Solver:
+    """
+    Solves FreeCell deals with a weighted best-first (A*-like) search.
+
+    Positions are searched on a CompactBoard. Every position is scored with a
+    heuristic estimating the remaining work, and the position with the lowest
+    score plus a fraction of its depth is expanded first. Safe moves to the
+    suit stacks are played automatically after every move, and positions that
+    only differ by the order of columns or free cells are recognized by their
+    Zobrist hash and expanded only once.
+
+    Args:
+        max_nodes (int): The maximum number of positions to expand.
+        max_time (float): The maximum search time in seconds, None for no limit.
+        table_size (int): The capacity of the transposition table.
+        supermoves (bool): Search with moves of sequences of cards, the
+            solutions have to be played on a FreeCell with supermoves.
+
+    Attributes:
+        table (TranspositionTable): The depths at which the positions of the
+            last search were reached.
+        expanded (int): The number of positions expanded by the last search.
+        exhausted (bool): True if the last search failed because every
+            reachable position was expanded, meaning the deal is unsolvable.
+
+    Methods:
+        solve(seed) -> list: Solves the deal with the given seed.
+        solve_board(board) -> list: Solves the position on a board.
+    """
+
+    # Weights of the heuristic terms and of the search depth
+    CARD_WEIGHT = 3
+    FREE_CELL_WEIGHT = 0.5
+    BURIED_WEIGHT = 1
+    EMPTY_COLUMN_WEIGHT = 3
+    BLOCKING_WEIGHT = 1.5
+    CAPACITY_WEIGHT = 1
+    DEPTH_WEIGHT = 0.5
+
+    def __init__(
+        self,
+        max_nodes: int = 200000,
+        max_time: float = None,
+        table_size=2000000,
+        supermoves: bool = False,
+    ) -> None:
+        self.max_nodes = max_nodes
+        self.supermoves = supermoves
+        self.max_time = max_time
+        self.table = TranspositionTable(table_size)
+        self.expanded = 0
+        self.exhausted = False
+
+    def solve(self, seed: int) -> list:
+        """
+        Solves the deal with the given seed.
+
+        Args:
+            seed (int): The seed of the deal, as used by Deck.
+
+        Returns:
+            list: The moves solving the deal in the (card, destination)
+                notation of FreeCell.get_moves, or None if no solution was
+                found within the budget.
+        """
+        return self.solve_board(CompactBoard(Deck(seed).cards_shuffled()))
+
+    def solve_board(self, board) -> list:
+        """
+        Solves the position on a board.
+
+        Args:
+            board (Board or CompactBoard): The board to solve. It is not
+                modified.
+
+        Returns:
+            list: The moves solving the position, or None if no solution was
+                found within the budget.
+        """
+        board = self.__copy_board(board)
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+        self.expanded = 0
+        self.exhausted = False
+        self.table.clear()
+
+        start_moves = board.autoplay()
+        if board.is_solved():
+            return start_moves
+
+        # parents[node] holds the parent node and the moves leading from it
+        parents = [(None, start_moves)]
+        self.table.put(board.zobrist_hash(), 0)
+        queue = [(0, 0, 0, board.get_position())]
+
+        while queue:
+            if self.expanded >= self.max_nodes:
+                return None
+            if deadline is not None and perf_counter() > deadline:
+                return None
+
+            _, depth, node, state = heapq.heappop(queue)
+            board.set_position(state)
+            self.expanded += 1
+
+            for move in self.__ordered_moves(board):
+                board.make_move(move)
+                moves = [move] + board.autoplay()
+
+                if board.is_solved():
+                    return self.__path(parents, node) + moves
+
+                key = board.zobrist_hash()
+                if key not in self.table:
+                    self.table.put(key, depth + 1)
+                    parents.append((node, moves))
+                    priority = self.__heuristic(board) + self.DEPTH_WEIGHT * (depth + 1)
+                    heapq.heappush(
+                        queue,
+                        (priority, depth + 1, len(parents) - 1, board.get_position()),
+                    )
+
+                for _ in moves:
+                    board.undo_move()
+
+        self.exhausted = True
+        return None
+
+    def __heuristic(self, board: CompactBoard) -> float:
+        """
+        Estimates how far a position is from being solved.
+
+        Args:
+            board (CompactBoard): The position to score.
+
+        Returns:
+            float: The score, lower is better.
+        """
+        foundations = board.foundations
+        free_cells = board.cells.count(EMPTY)
+        empty_columns = 0
+        score = (52 - sum(foundations)) * self.CARD_WEIGHT
+        score += (4 - free_cells) * self.FREE_CELL_WEIGHT
+
+        for col in board.cols:
+            if not col:
+                empty_columns += 1
+                continue
+
+            # Cards lying on top of a lower card have to be moved away
+            lowest = 14
+            for card in col:
+                rank = CARD_RANK[card]
+                if rank > lowest:
+                    score += self.BLOCKING_WEIGHT
+                else:
+                    lowest = rank
+
+            # Cards covering a card which will soon be needed on a suit stack
+            for depth, card in enumerate(col):
+                if CARD_RANK[card] <= foundations[CARD_SUIT[card]] + 2:
+                    score += (len(col) - depth - 1) * self.BURIED_WEIGHT
+                    break
+
+        score -= empty_columns * self.EMPTY_COLUMN_WEIGHT
+        score -= (free_cells + 1) * (1 << empty_columns) * self.CAPACITY_WEIGHT
+        return score
+
+    @staticmethod
+    def __ordered_moves(board: CompactBoard) -> list:
+        """
+        Orders the moves so that the most promising ones are tried first:
+        moves to the suit stacks, then onto other cards, then to empty
+        columns and finally to free cells.
+
+        Args:
+            board (CompactBoard): The position to generate moves for.
+
+        Returns:
+            list: The ordered moves.
+        """
+        order = {
+            Move.SUIT_STACK.value: 0,
+            Move.EMPTY_COLUMN.value: 2,
+            Move.FREECELL.value: 3,
+        }
+        return sorted(board.get_moves(), key=lambda move: order.get(move[1], 1))
+
+    @staticmethod
+    def __path(parents: list, node: int) -> list:
+        """
+        Collects the moves leading from the root of the search to a node.
+
+        Args:
+            parents (list): The parent and moves of every node.
+            node (int): The node to collect the moves for.
+
+        Returns:
+            list: The moves in the order they have to be played.
+        """
+        segments = []
+        while node is not None:
+            node, moves = parents[node]
+            segments.append(moves)
+        return [move for moves in reversed(segments) for move in moves]
+
+    def __copy_board(self, board) -> CompactBoard:
+        """
+        Creates a CompactBoard holding the same position as a board.
+
+        Args:
+            board (Board or CompactBoard): The board to copy.
+
+        Returns:
+            CompactBoard: The copy.
+        """
+        copy = CompactBoard([], self.supermoves)
+        copy.set_position(board.get_position())
+        return copy
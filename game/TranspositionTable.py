@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """
+    A bounded map from position keys to search results with least recently
+    used eviction.
+
+    Keys are usually Board.zobrist_hash() or Board.canonical_key() values, so
+    a single table can be shared by solvers and agents searching the same
+    positions.
+
+    Args:
+        capacity (int): The maximum number of stored positions.
+
+    Attributes:
+        capacity (int): The maximum number of stored positions.
+        hits (int): The number of successful lookups.
+        misses (int): The number of failed lookups.
+        evictions (int): The number of positions dropped to stay within capacity.
+
+    Methods:
+        get(key, default=None): Returns the value stored for a position.
+        put(key, value): Stores a value for a position.
+        clear(): Removes all positions.
+    """
+
+    def __init__(self, capacity: int = 1000000) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity of a transposition table must be positive")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for a position and marks it as recently used.
+
+        Args:
+            key: The key of the position.
+            default: The value to return if the position is not stored.
+
+        Returns:
+            The stored value, or default.
+        """
+        try:
+            value = self.__entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        """
+        Stores a value for a position, evicting the least recently used
+        position if the table is full.
+
+        Args:
+            key: The key of the position.
+            value: The value to store.
+        """
+        entries = self.__entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = value
+
+    def clear(self) -> None:
+        """
+        Removes all positions and resets the statistics.
+        """
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key) -> bool:
+        return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
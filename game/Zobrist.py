@@ -0,0 +1,86 @@
+from random import Random
+
+# Zobrist keys for hashing FreeCell positions regardless of the order of
+# columns and free cells. A column is hashed by XOR-ing a key for every
+# (depth, card) pair in it, and the column hashes are scrambled with mix and
+# added, so swapping two columns does not change the sum. Free cells XOR a
+# key per card, and every suit stack XORs a key for its top rank.
+
+MASK = (1 << 64) - 1
+MAX_DEPTH = 52
+
+_random = Random(52)
+COLUMN_KEYS = tuple(
+    tuple(_random.getrandbits(64) for _ in range(52)) for _ in range(MAX_DEPTH)
+)
+CELL_KEYS = tuple(_random.getrandbits(64) for _ in range(52))
+STACK_KEYS = tuple(
+    tuple(0 if rank == 0 else _random.getrandbits(64) for rank in range(14))
+    for _ in range(4)
+)
+
+
+def mix(value: int) -> int:
+    """
+    Scrambles a 64-bit column hash, the finalizer of the SplitMix64
+    generator. Maps 0, the hash of an empty column, to 0.
+
+    Args:
+        value (int): The column hash.
+
+    Returns:
+        int: The scrambled hash.
+    """
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+def column_hash(cards) -> int:
+    """
+    Hashes a column.
+
+    Args:
+        cards (iterable of int): The card indices in the column, bottom first.
+
+    Returns:
+        int: The hash of the column.
+    """
+    value = 0
+    for depth, card in enumerate(cards):
+        value ^= COLUMN_KEYS[depth][card]
+    return value
+
+
+def cell_hash(cards) -> int:
+    """
+    Hashes the free cells.
+
+    Args:
+        cards (iterable of int): The card indices in the free cells, without
+            the empty ones.
+
+    Returns:
+        int: The hash of the free cells.
+    """
+    value = 0
+    for card in cards:
+        value ^= CELL_KEYS[card]
+    return value
+
+
+def stack_hash(ranks) -> int:
+    """
+    Hashes the suit stacks.
+
+    Args:
+        ranks (iterable of int): The rank on top of each suit stack in the
+            order of Card.SUITS, 0 for an empty stack.
+
+    Returns:
+        int: The hash of the suit stacks.
+    """
+    value = 0
+    for suit, rank in enumerate(ranks):
+        value ^= STACK_KEYS[suit][rank]
+    return value
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class Zone(Enum):
+    COLUMN = "column"
+    FREE_CELL = "free_cell"
+    SUIT_STACK = "suit_stack"
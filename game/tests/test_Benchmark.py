@@ -0,0 +1,55 @@
+import json
+import os
+from contextlib import redirect_stdout
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from game.Benchmark import BENCHMARKS, compare, main, playout, run_benchmarks
+
+
+class TestBenchmark(TestCase):
+    def test_playout(self):
+        self.assertEqual(playout(3, 20), playout(3, 20))
+        self.assertEqual(len(playout(3, 20)), 20)
+        self.assertLess(len(playout(1, 20)), 20)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(seeds=(1,), repeat=1)
+        self.assertEqual(set(results), set(BENCHMARKS))
+        for result in results.values():
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+    def test_compare(self):
+        baseline = {"a": {"ops_per_sec": 100, "peak_bytes": 1000}}
+        results = {
+            "a": {"ops_per_sec": 85, "peak_bytes": 1200},
+            "b": {"ops_per_sec": 1, "peak_bytes": 1},
+        }
+        self.assertEqual(
+            compare(results, baseline),
+            [("a", "ops_per_sec", 100, 85), ("a", "peak_bytes", 1000, 1200)],
+        )
+        self.assertEqual(compare(results, baseline, threshold=0.5), [])
+
+    def test_main(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            args = ["deck_shuffle", "--repeat", "1", "--seeds", "2"]
+            with redirect_stdout(StringIO()) as output:
+                self.assertEqual(main(args + ["--save", path]), 0)
+            self.assertIn("deck_shuffle", output.getvalue())
+
+            with open(path) as file:
+                baseline = json.load(file)
+            baseline["deck_shuffle"]["ops_per_sec"] *= 1000
+            with open(path, "w") as file:
+                json.dump(baseline, file)
+
+            with redirect_stdout(StringIO()) as output:
+                self.assertEqual(main(args + ["--baseline", path]), 1)
+            self.assertIn("Regression in deck_shuffle", output.getvalue())
+
+            with redirect_stdout(StringIO()), self.assertRaises(SystemExit):
+                main(["unknown"])
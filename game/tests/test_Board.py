@@ -1,7 +1,10 @@
+from random import Random
 from unittest import TestCase
 from game.Board import Board
+from game.Freecell import FreeCell
 from unittest.mock import Mock
-from game.Card import Card
+from game.Card import SUITS, Card
+from game.Zone import Zone
 
 
 class TestBoard(TestCase):
@@ -264,3 +267,208 @@ class TestBoard(TestCase):
         self.assertTrue(board.move_to_free_column(card6c))
         self.assertTrue(board.columns[3] == [card6c])
         self.assertTrue(board.free_cells[0] is None)
+
+    def test_undo_move(self):
+        cardAh = Card(1, "h")
+        card2s = Card(2, "s")
+        card3d = Card(3, "d")
+        card4s = Card(4, "s")
+
+        board = Board([])
+        board.columns[0] = [card4s, cardAh]
+        board.columns[1] = [card3d]
+        board.columns[2] = [card2s]
+
+        self.assertTrue(board.move_to_stack(cardAh))
+        self.assertTrue(board.move_to_card(card3d, card4s))
+        self.assertTrue(board.move_to_free_cell(card2s))
+        self.assertTrue(board.move_to_free_column(card2s))
+        self.assertTrue(board.move_to_free_cell(card2s))
+        self.assertTrue(board.move_to_card(card2s, card3d))
+        self.assertEqual(len(board.history), 6)
+
+        for _ in range(6):
+            self.assertTrue(board.undo_move())
+
+        self.assertFalse(board.undo_move())
+        self.assertEqual(board.columns[0], [card4s, cardAh])
+        self.assertEqual(board.columns[1], [card3d])
+        self.assertEqual(board.columns[2], [card2s])
+        self.assertEqual(board.free_cells, [None] * 4)
+        self.assertIsNone(board.suit_stack["h"])
+
+    def test_zobrist_hash_and_canonical_key(self):
+        cardAh = Card(1, "h")
+        card2s = Card(2, "s")
+        card3d = Card(3, "d")
+        card4s = Card(4, "s")
+
+        board = Board([])
+        board.columns = [[card4s, cardAh], [card3d], [card2s], [], [], [], [], []]
+        start_hash = board.zobrist_hash()
+        start_key = board.canonical_key()
+
+        self.assertTrue(board.move_to_stack(cardAh))
+        self.assertTrue(board.move_to_card(card3d, card4s))
+        self.assertTrue(board.move_to_free_cell(card2s))
+        moved_hash = board.zobrist_hash()
+        self.assertNotEqual(moved_hash, start_hash)
+
+        board.reset_cache()
+        self.assertEqual(board.zobrist_hash(), moved_hash)
+
+        permuted = Board([])
+        permuted.columns = board.columns[::-1]
+        permuted.free_cells = board.free_cells[::-1]
+        permuted.suit_stack = board.suit_stack
+        self.assertEqual(permuted.zobrist_hash(), moved_hash)
+        self.assertEqual(permuted.canonical_key(), board.canonical_key())
+
+        for _ in range(3):
+            board.undo_move()
+        self.assertEqual(board.zobrist_hash(), start_hash)
+        self.assertEqual(board.canonical_key(), start_key)
+
+    def test_in_place_changes_need_reset_cache(self):
+        freecell = FreeCell(seed=1)
+        board = freecell.board
+        moves = board.get_moves()
+        board.columns[0].append(board.columns[1].pop())
+        board.free_cells[0] = board.columns[2].pop()
+
+        # The cached moves are those of the cards before the change
+        self.assertEqual(board.get_moves(), moves)
+        board.reset_cache()
+        fresh = Board([])
+        fresh.columns = [list(column) for column in board.columns]
+        fresh.free_cells = list(board.free_cells)
+        self.assertNotEqual(board.get_moves(), moves)
+        self.assertEqual(board.get_moves(), fresh.get_moves())
+
+        board.columns[3] = []
+        board.reset_cache()
+        fresh.columns = [list(column) for column in board.columns]
+        self.assertEqual(board.get_moves(), fresh.get_moves())
+
+    def test_get_moves_incremental_matches_full_scan(self):
+        rnd = Random(11)
+        freecell = FreeCell(seed=11)
+        board = freecell.board
+
+        for _ in range(150):
+            moves = board.get_moves()
+            board.reset_cache()
+            self.assertEqual(board.get_moves(), moves)
+            self.assertTrue(all(board.is_valid_move(move) for move in moves))
+            if not moves:
+                break
+            if board.history and rnd.random() < 0.2:
+                board.undo_move()
+            else:
+                board.make_move(rnd.choice(moves))
+
+        self.assertFalse(board.is_valid_move(("Kh", "Qs")))
+
+    def test_locate(self):
+        cards = [Card(rank, suit) for suit in SUITS for rank in range(1, 14)]
+        freecell = FreeCell(seed=5)
+        board = freecell.board
+        self.assertEqual(board.locate(board.columns[3][2]), (Zone.COLUMN, 3, 2))
+        random = Random(5)
+
+        for _ in range(60):
+            moves = freecell.get_moves()
+            if not moves:
+                break
+            freecell.make_move(random.choice(moves))
+            fresh = Board([])
+            fresh.columns = [list(col) for col in board.columns]
+            fresh.free_cells = list(board.free_cells)
+            fresh.suit_stack = dict(board.suit_stack)
+            for card in cards:
+                self.assertEqual(board.locate(card), fresh.locate(card))
+                on_top = any(col and col[-1] is card for col in board.columns)
+                self.assertEqual(board.is_on_top(card), on_top)
+
+        while board.undo_move():
+            pass
+        self.assertEqual(board.locate(board.columns[3][2]), (Zone.COLUMN, 3, 2))
+
+    def test_locate_after_in_place_change(self):
+        cardAh = Card(1, "h")
+        card2h = Card(2, "h")
+        board = Board([])
+        board.columns[0] = [cardAh]
+        self.assertEqual(board.locate(cardAh), (Zone.COLUMN, 0, 0))
+        self.assertIsNone(board.locate(card2h))
+
+        board.columns[0] = []
+        board.free_cells[2] = cardAh
+        self.assertEqual(board.locate(cardAh), (Zone.FREE_CELL, 2, 0))
+        self.assertEqual(board.find_card_from_string("Ah"), cardAh)
+        self.assertIsNone(board.find_card_from_string("2h"))
+        self.assertIsNone(board.find_card_from_string("1x"))
+
+        self.assertTrue(board.move_to_stack(cardAh))
+        self.assertEqual(board.locate(cardAh), (Zone.SUIT_STACK, 0, 0))
+
+    def test_move_sequences(self):
+        card9h = Card(9, "h")
+        card8s = Card(8, "s")
+        card7d = Card(7, "d")
+        card6c = Card(6, "c")
+        cardTs = Card(10, "s")
+        cardTc = Card(10, "c")
+
+        board = Board([], supermoves=True)
+        board.columns = [
+            [cardTs],
+            [Card(13, "h"), card9h, card8s, card7d, card6c],
+            [cardTc],
+            [Card(2, "d")],
+            [Card(3, "d")],
+            [Card(4, "d")],
+            [Card(5, "d")],
+            [Card(12, "d")],
+        ]
+        board.free_cells = [Card(1, "s"), Card(1, "c"), Card(2, "s"), None]
+        self.assertEqual(board.max_sequence_length(), 2)
+
+        # Two cards fit through the single free cell, four do not
+        self.assertFalse(board.move_sequence_to_card(card9h, cardTs))
+        self.assertFalse(board.move_sequence_to_card(card7d, cardTs))
+        moves = board.get_moves()
+        self.assertNotIn(("9h", "Ts"), moves)
+
+        board.free_cells[0] = None
+        board.reset_cache()
+        self.assertEqual(board.max_sequence_length(), 3)
+        board.free_cells[1] = None
+        board.reset_cache()
+        self.assertIn(("9h", "Ts"), board.get_moves())
+        self.assertTrue(board.make_move(("9h", "Ts")))
+        self.assertEqual(board.columns[0], [cardTs, card9h, card8s, card7d, card6c])
+        self.assertEqual(board.history[-1][-1], 4)
+        self.assertTrue(board.is_on_top(card6c))
+
+        # The sequence is moved back as a whole
+        self.assertTrue(board.undo_move())
+        self.assertEqual(board.columns[0], [cardTs])
+        self.assertEqual(len(board.columns[1]), 5)
+
+        # To an empty column, which does not count for the capacity
+        board.columns[3] = []
+        self.assertEqual(board.max_sequence_length(True), 4)
+        self.assertIn(("9h", "0"), board.get_moves())
+        self.assertTrue(board.move_sequence_to_free_column(card8s))
+        self.assertEqual(board.columns[3], [card8s, card7d, card6c])
+        self.assertFalse(board.move_sequence_to_free_column(card9h))
+        self.assertFalse(board.move_to_card(card7d, card8s))
+
+    def test_sequences_disabled(self):
+        freecell = FreeCell(seed=1)
+        board = freecell.board
+        board.columns[0] = [Card(9, "h"), Card(8, "s")]
+        board.columns[1] = [Card(10, "c")]
+        board.reset_cache()
+        self.assertFalse(board.make_move(("9h", "Tc")))
@@ -1,3 +1,5 @@
+import copy
+import pickle
 from unittest import TestCase
 from game.Card import Card
 
@@ -62,3 +64,20 @@ class TestCard(TestCase):
         card5s = Card(5, "s")
         card = "5s"
         self.assertTrue(card5s == card)
+
+        # Equal objects hash alike, so names find cards in sets and dicts
+        self.assertIn("Ah", {Card(1, "h")})
+        self.assertIn(Card(1, "h"), {"Ah"})
+        self.assertEqual({Card(1, "h"): 1}["Ah"], 1)
+        self.assertNotIn("Ah", {Card(2, "h")})
+
+    def test_interned(self):
+        card = Card(12, "d")
+        self.assertIs(card, Card(12, "d"))
+        self.assertIs(card, pickle.loads(pickle.dumps(card)))
+        self.assertIs(card, copy.deepcopy(card))
+        self.assertNotEqual(card, Card(12, "h"))
+        self.assertEqual(hash(card), hash("Qd"))
+        self.assertEqual(len({Card(1, "s"), Card(1, "s"), Card(2, "s")}), 2)
+        with self.assertRaises(AttributeError):
+            card.value = 1
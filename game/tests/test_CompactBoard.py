@@ -0,0 +1,176 @@
+from random import Random
+from unittest import TestCase
+
+from game.Card import Card
+from game.CompactBoard import CompactBoard, EMPTY, decode_card, encode_card
+from game.Freecell import FreeCell
+from game.Game import State
+
+
+class TestCompactBoard(TestCase):
+    def test_encode_decode(self):
+        for suit in ["h", "d", "c", "s"]:
+            for rank in range(1, 14):
+                card = Card(rank, suit)
+                code = encode_card(card)
+                self.assertTrue(0 <= code < 52)
+                self.assertEqual(decode_card(code), card)
+        self.assertIsNone(decode_card(EMPTY))
+
+    def test_make_deck(self):
+        cards = FreeCell(seed=1).deck.cards_shuffled()
+        board = CompactBoard(cards)
+
+        self.assertEqual([len(col) for col in board.cols], [6] * 4 + [7] * 4)
+        self.assertEqual(board.columns[0], cards[0:6])
+        self.assertEqual(board.columns[7], cards[45:52])
+        self.assertEqual(board.free_cells, [None] * 4)
+        self.assertEqual(board.empty_cells(), 4)
+
+    def test_moves(self):
+        board = CompactBoard([])
+        board.cols[0] = bytearray([encode_card(Card(5, "d"))])
+        board.cols[1] = bytearray([encode_card(Card(4, "s"))])
+        board.cols[2] = bytearray([encode_card(Card(1, "h"))])
+
+        self.assertTrue(board.make_move(("Ah", "S")))
+        self.assertEqual(board.suit_stack["h"], Card(1, "h"))
+        self.assertTrue(board.make_move(("4s", "F")))
+        self.assertTrue(board.make_move(("4s", "5d")))
+        self.assertEqual(board.columns[0], [Card(5, "d"), Card(4, "s")])
+        self.assertTrue(board.make_move(("4s", "0")))
+        self.assertEqual(board.columns[1], [Card(4, "s")])
+
+        self.assertFalse(board.make_move(("2h", "S")))
+        self.assertFalse(board.make_move(("5d", "S")))
+        self.assertFalse(board.make_move(("5d", "4s")))
+        self.assertFalse(board.is_solved())
+
+    def test_same_results_as_board(self):
+        for seed in [1, 2, 617, 11982, 24000]:
+            rnd = Random(seed)
+            freecell = FreeCell(seed=seed)
+            compact = FreeCell(seed=seed, compact=True)
+
+            for _ in range(200):
+                self.assertEqual(freecell.get_moves(), compact.get_moves())
+                self.assertEqual(freecell.get_board(), compact.get_board())
+                self.assertEqual(freecell.get_state(), compact.get_state())
+                if freecell.get_state() != State.ONGOING:
+                    break
+
+                move = rnd.choice(freecell.get_moves())
+                self.assertTrue(freecell.make_move(move))
+                self.assertTrue(compact.make_move(move))
+
+    def test_start_game_keeps_backend(self):
+        freecell = FreeCell(seed=3, compact=True)
+        freecell.start_game()
+        self.assertIsInstance(freecell.board, CompactBoard)
+        self.assertEqual(freecell.get_state(), State.ONGOING)
+
+    def test_undo_restores_deal(self):
+        for compact in [False, True]:
+            rnd = Random(5)
+            freecell = FreeCell(seed=5, compact=compact)
+            start = repr(freecell.get_board())
+            moves = 0
+            while moves < 100 and freecell.get_moves():
+                freecell.make_move(rnd.choice(freecell.get_moves()))
+                moves += 1
+
+            for _ in range(moves):
+                freecell.undo_move()
+            self.assertEqual(repr(freecell.get_board()), start)
+            self.assertFalse(freecell.board.undo_move())
+
+    def test_same_hash_as_board(self):
+        rnd = Random(7)
+        freecell = FreeCell(seed=7)
+        compact = FreeCell(seed=7, compact=True)
+        hashes = []
+
+        for _ in range(100):
+            self.assertEqual(
+                freecell.board.zobrist_hash(), compact.board.zobrist_hash()
+            )
+            self.assertEqual(
+                freecell.board.canonical_key(), compact.board.canonical_key()
+            )
+            hashes.append(compact.board.zobrist_hash())
+            if not freecell.get_moves():
+                break
+            move = rnd.choice(freecell.get_moves())
+            freecell.make_move(move)
+            compact.make_move(move)
+
+        expected = compact.board.zobrist_hash()
+        compact.board.reset_cache()
+        self.assertEqual(compact.board.zobrist_hash(), expected)
+
+        while compact.board.history:
+            compact.undo_move()
+            self.assertEqual(compact.board.zobrist_hash(), hashes.pop())
+
+    def test_supermoves_same_results_as_board(self):
+        for seed in [1, 2, 617]:
+            rnd = Random(seed)
+            games = [
+                FreeCell(seed=seed, supermoves=True),
+                FreeCell(seed=seed, compact=True, supermoves=True),
+            ]
+            boards, hashes, sequences = [], [], 0
+
+            for _ in range(150):
+                moves = games[0].get_moves()
+                actions = games[0].board.get_actions()
+                for freecell in games[1:]:
+                    self.assertEqual(freecell.get_moves(), moves)
+                    self.assertEqual(freecell.board.get_actions(), actions)
+                    self.assertEqual(freecell.get_board(), games[0].get_board())
+                    self.assertEqual(
+                        freecell.board.zobrist_hash(), games[0].board.zobrist_hash()
+                    )
+                if not moves:
+                    break
+
+                boards.append(repr(games[0].get_board()))
+                hashes.append(games[0].board.zobrist_hash())
+                # Prefer moves of sequences, which name a card not on top
+                tops = {card.name for card in games[0].board.get_movable_cards()}
+                tops.update(card.name for card in games[0].board.free_cells if card)
+                sequence = [move for move in moves if move[0] not in tops]
+                sequences += bool(sequence)
+                move = rnd.choice(sequence or moves)
+                if move[1] != "0" and rnd.random() < 0.5:
+                    action = games[0].move_to_action(move)
+                    for freecell in games:
+                        self.assertTrue(freecell.step(action))
+                else:
+                    for freecell in games:
+                        self.assertTrue(freecell.make_move(move))
+
+            self.assertGreater(sequences, 0)
+            for board, value in zip(reversed(boards), reversed(hashes)):
+                for freecell in games:
+                    freecell.undo_move()
+                    self.assertEqual(repr(freecell.get_board()), board)
+                    self.assertEqual(freecell.board.zobrist_hash(), value)
+
+    def test_make_move_accepts_exactly_get_moves(self):
+        names = [card.name for card in FreeCell(seed=1).deck.cards]
+        for seed, supermoves in [(1, False), (7, True)]:
+            rnd = Random(seed)
+            board = CompactBoard(FreeCell(seed=seed).deck.cards_shuffled(), supermoves)
+            for _ in range(60):
+                moves = board.get_moves()
+                for card in names:
+                    for destination in names + ["S", "F", "0"]:
+                        move = (card, destination)
+                        made = board.make_move(move)
+                        self.assertEqual(made, move in moves)
+                        if made:
+                            board.undo_move()
+                if not moves:
+                    break
+                board.make_move(rnd.choice(moves))
@@ -0,0 +1,63 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from game.DealCache import DealCache, shuffle, write_table
+from game.Deck import Deck
+from game.Freecell import FreeCell
+
+
+class TestDealCache(TestCase):
+    def reference_deal(self, seed: int) -> list:
+        # The generator of the Microsoft FreeCell deals, see Rosetta Code
+        cards = list(range(52))
+        state = seed & ((1 << 31) - 1)
+        for i in range(52):
+            state = (state * 214013 + 2531011) & ((1 << 31) - 1)
+            j = 51 - (state >> 16) % (52 - i)
+            cards[i], cards[j] = cards[j], cards[i]
+        return cards
+
+    def test_shuffle(self):
+        for seed in [0, 1, 617, 11982, 1000000, -1]:
+            self.assertEqual(list(shuffle(seed)), self.reference_deal(seed))
+        cards = [card.index for card in Deck(617).cards_shuffled()]
+        self.assertEqual(cards, self.reference_deal(617))
+
+    def test_lru(self):
+        cache = DealCache(capacity=2)
+        self.assertEqual(cache.get(1), shuffle(1))
+        cache.get(2)
+        self.assertIs(cache.get(1), cache.get(1))
+        cache.get(3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(2), shuffle(2))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            DealCache(capacity=0)
+
+    def test_table(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "deals.bin")
+            write_table(path, 10, 100, chunk=32)
+            cache = DealCache(capacity=1, path=path)
+            for seed in range(5, 115):
+                self.assertEqual(cache.get(seed), shuffle(seed))
+            self.assertEqual(len(cache), 1)
+
+            cache.close()
+            self.assertEqual(cache.get(50), shuffle(50))
+
+            with open(path, "r+b") as file:
+                file.write(b"NOTDEALS")
+            with self.assertRaises(ValueError):
+                cache.open(path)
+
+    def test_freecell(self):
+        for compact in [False, True]:
+            board = FreeCell(seed=5, compact=compact).get_board()
+            cards = [card.index for col in board[0] for card in col]
+            deal = shuffle(5)
+            self.assertEqual(sorted(cards), list(range(52)))
+            self.assertEqual(board[0][0][0].index, deal[0])
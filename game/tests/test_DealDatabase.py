@@ -0,0 +1,85 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from game.DealDatabase import DealDatabase, DealRecord, Status, main
+from game.Solver import Solver
+
+
+class TestDealDatabase(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "deals.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_solve(self):
+        with DealDatabase(self.path, 1, 4) as database:
+            self.assertEqual(database.pending().tolist(), [1, 2, 3, 4])
+            self.assertEqual(database.solve(processes=1, max_nodes=2000), 4)
+            self.assertEqual(len(database.pending()), 0)
+
+            solver = Solver(max_nodes=2000)
+            for seed in range(1, 5):
+                moves = solver.solve(seed)
+                record = database.get(seed)
+                if moves is None:
+                    self.assertEqual(record.status, Status.GAVE_UP)
+                else:
+                    self.assertEqual(record.status, Status.SOLVED)
+                    self.assertEqual(record.length, len(moves))
+                self.assertEqual(record.nodes, solver.expanded)
+
+    def test_resume(self):
+        with DealDatabase(self.path, 10, 5) as database:
+            database.put(11, Status.SOLVED, 90, 400)
+            database.put(13, Status.UNSOLVABLE, 0, 70000)
+
+        with DealDatabase(self.path) as database:
+            self.assertEqual((database.first, len(database)), (10, 5))
+            self.assertEqual(database.get(11), DealRecord(11, Status.SOLVED, 90, 400))
+            self.assertEqual(database.pending().tolist(), [10, 12, 14])
+            self.assertEqual(database.solve(processes=2, max_nodes=500), 3)
+            self.assertEqual(database.get(13).nodes, 70000)
+
+            records = database.records(12, 14)
+            self.assertEqual(len(records), 2)
+            self.assertTrue((records["status"] != Status.PENDING).all())
+            self.assertEqual(len(database.records(0, 11)), 1)
+            self.assertEqual(len(database.records(20)), 0)
+            del records
+
+        # Deals given up on are only retried on request, with a larger budget
+        with DealDatabase(self.path) as database:
+            database.put(12, Status.GAVE_UP, 0, 100)
+            database.put(14, Status.GAVE_UP, 0, 500)
+            self.assertEqual(database.solve(processes=1, max_nodes=500), 0)
+            self.assertEqual(database.pending(500).tolist(), [12])
+            self.assertEqual(
+                database.solve(processes=1, max_nodes=500, retry_gave_up=True), 1
+            )
+            self.assertEqual(database.get(12).status, Status.SOLVED)
+            self.assertEqual(database.get(14).nodes, 500)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            DealDatabase(self.path)
+        with DealDatabase(self.path, 1, 2) as database:
+            with self.assertRaises(ValueError):
+                database.get(3)
+            with self.assertRaises(ValueError):
+                database.put(0, Status.SOLVED)
+        with self.assertRaises(ValueError):
+            DealDatabase(self.path, 2, 2)
+
+        with open(self.path, "r+b") as file:
+            file.write(b"NOTDEALS")
+        with self.assertRaises(ValueError):
+            DealDatabase(self.path)
+
+    def test_main(self):
+        args = [self.path, "--first", "1", "--count", "2", "--processes", "1"]
+        self.assertEqual(main(args + ["--max-nodes", "1000"]), 0)
+        with DealDatabase(self.path) as database:
+            self.assertEqual(len(database.pending()), 0)
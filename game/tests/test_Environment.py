@@ -0,0 +1,101 @@
+from unittest import TestCase
+
+import numpy as np
+
+from game.Card import Card
+from game.Environment import FreeCellEnv, SubprocVectorEnv, SyncVectorEnv
+from game.Freecell import FreeCell
+from game.Observation import OBSERVATION_SHAPE, encode
+
+
+def play(env, steps: int, seed: int = 0) -> list:
+    """Plays random legal actions in a vector environment."""
+    rnd = np.random.default_rng(seed)
+    results = [env.reset(seed=[1, 2, 3, 4])]
+    for _ in range(steps):
+        masks = results[-1][-1]["action_mask"]
+        results.append(env.step([rnd.choice(np.flatnonzero(m)) for m in masks]))
+    return results
+
+
+class TestFreeCellEnv(TestCase):
+    def test_episode(self):
+        env = FreeCellEnv(max_steps=3)
+        obs, info = env.reset(seed=7)
+        freecell = FreeCell(7)
+        np.testing.assert_array_equal(obs, encode(freecell))
+        np.testing.assert_array_equal(info["action_mask"], freecell.get_action_mask())
+        self.assertEqual(info["seed"], 7)
+
+        for move_count in range(1, 4):
+            action = np.flatnonzero(info["action_mask"])[0]
+            freecell.step(action)
+            obs, reward, terminated, truncated, info = env.step(action)
+            np.testing.assert_array_equal(obs, encode(freecell))
+            self.assertEqual(reward, 0.0)
+            self.assertFalse(terminated)
+            self.assertEqual(truncated, move_count == 3)
+            self.assertEqual(info["move_count"], move_count)
+
+        with self.assertRaises(ValueError):
+            env.step(np.flatnonzero(~info["action_mask"])[0])
+
+    def test_random_deals(self):
+        seeds = [FreeCellEnv(seed=3).reset()[1]["seed"] for _ in range(2)]
+        self.assertEqual(seeds[0], seeds[1])
+
+    def test_won(self):
+        env = FreeCellEnv(compact=False)
+        env.reset(seed=1)
+        board = env.freecell.board
+        board.columns = [[Card(13, suit)] for suit in "hdcs"] + [[]] * 4
+        board.free_cells = [None] * 4
+        board.suit_stack = {suit: Card(12, suit) for suit in "hdcs"}
+
+        for suit in "hdcs":
+            action = env.freecell.move_to_action((Card(13, suit).name, "S"))
+            _, reward, terminated, truncated, _ = env.step(action)
+        self.assertEqual(reward, 1.0)
+        self.assertTrue(terminated)
+        self.assertFalse(truncated)
+
+
+class TestVectorEnv(TestCase):
+    def test_sync_and_subproc_agree(self):
+        with SyncVectorEnv(4, seed=10, max_steps=15) as sync:
+            expected = play(sync, 40)
+        with SubprocVectorEnv(4, seed=10, max_steps=15, processes=2) as subproc:
+            results = play(subproc, 40)
+
+        self.assertEqual(expected[0][0].shape, (4,) + OBSERVATION_SHAPE)
+        for result, other in zip(expected, results):
+            for value, other_value in zip(result, other):
+                if isinstance(value, dict):
+                    self.assertEqual(value.keys(), other_value.keys())
+                    for key in value:
+                        np.testing.assert_array_equal(value[key], other_value[key])
+                else:
+                    np.testing.assert_array_equal(value, other_value)
+
+    def test_autoreset(self):
+        env = SyncVectorEnv(2, seed=0, max_steps=1, copy=False)
+        obs, infos = env.reset(seed=5)
+        np.testing.assert_array_equal(infos["seed"], [5, 6])
+        actions = [np.flatnonzero(mask)[0] for mask in infos["action_mask"]]
+        games = [FreeCell(5), FreeCell(6)]
+        for game, action in zip(games, actions):
+            game.step(action)
+        obs, rewards, terminated, truncated, infos = env.step(actions)
+        self.assertTrue(truncated.all())
+        self.assertTrue(infos["_final_observation"].all())
+        for game, final in zip(games, infos["final_observation"]):
+            np.testing.assert_array_equal(final, encode(game))
+        self.assertIs(
+            obs, env.step([np.flatnonzero(mask)[0] for mask in infos["action_mask"]])[0]
+        )
+
+    def test_subproc_errors(self):
+        with SubprocVectorEnv(2, processes=2) as env:
+            _, infos = env.reset(seed=1)
+            with self.assertRaises(ValueError):
+                env.step([np.flatnonzero(~mask)[0] for mask in infos["action_mask"]])
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+import numpy as np
+
+from game.Action import NUM_ACTIONS
+from game.Deck import Deck
+from game.Freecell import FreeCell
+from game.FreeCellBatch import FreeCellBatch, deal
+from game.Game import State
+
+
+class TestFreeCellBatch(TestCase):
+    def test_deal(self):
+        seeds = [1, 2, 617, 11982, 1000000]
+        cards = deal(seeds)
+        for seed, row in zip(seeds, cards):
+            expected = [card.index for card in Deck(seed).cards_shuffled()]
+            self.assertEqual(row.tolist(), expected)
+
+    def test_same_results_as_freecell(self):
+        seeds = list(range(1, 9))
+        batch = FreeCellBatch(seeds)
+        games = [FreeCell(seed=seed) for seed in seeds]
+        rnd = np.random.default_rng(0)
+
+        for _ in range(120):
+            masks = batch.action_masks()
+            states = batch.get_states()
+            actions = np.full(len(seeds), -1)
+
+            for i, freecell in enumerate(games):
+                self.assertEqual(batch.get_board(i), freecell.get_board())
+                self.assertEqual(states[i], freecell.get_state().value)
+                self.assertEqual(batch.move_count[i], freecell._move_count)
+
+                legal = np.flatnonzero(masks[i])
+                moves = [batch.action_to_move(i, action) for action in legal]
+                self.assertCountEqual(moves, freecell.get_moves())
+                if len(legal):
+                    actions[i] = rnd.choice(legal)
+                    freecell.make_move(batch.action_to_move(i, actions[i]))
+
+            batch.step(actions)
+
+    def test_invalid_step(self):
+        batch = FreeCellBatch([1, 2])
+        action = np.flatnonzero(~batch.action_masks()[0])[0]
+        with self.assertRaises(ValueError):
+            batch.step([action, -1])
+        for validate in [True, False]:
+            with self.assertRaises(ValueError):
+                batch.step([NUM_ACTIONS, -1], validate)
+        self.assertEqual(batch.move_count.tolist(), [0, 0])
+
+    def test_reset(self):
+        batch = FreeCellBatch([1, 2, 3])
+        batch.step(np.argmax(batch.action_masks(), axis=1))
+        batch.reset([5], index=[1])
+
+        self.assertEqual(batch.seeds.tolist(), [1, 5, 3])
+        self.assertEqual(batch.move_count.tolist(), [1, 0, 1])
+        self.assertEqual(batch.get_board(1), FreeCell(seed=5).get_board())
+
+    def test_states(self):
+        batch = FreeCellBatch([1, 2])
+        batch.columns[:] = -1
+        batch.columns[1, :, 0] = [12, 25, 38, 51, 2, 15, 28, 41]
+        batch.heights[0] = 0
+        batch.heights[1] = 1
+        batch.cells[1] = [9, 22, 35, 48]
+        batch.foundations[0] = 13
+        batch.foundations[1] = 2
+
+        self.assertEqual(
+            batch.get_states().tolist(), [State.WON.value, State.ONGOING.value]
+        )
+        batch.foundations[1] = 1
+        self.assertEqual(batch.get_states()[1], State.LOST.value)
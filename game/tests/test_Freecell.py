@@ -1,4 +1,11 @@
+import copy
+from random import Random
 from unittest import TestCase
+
+import numpy as np
+
+from game.Action import NUM_ACTIONS
+from game.FreeCellBatch import FreeCellBatch
 from game.Freecell import FreeCell
 from game.Game import State
 from game.Card import Card
@@ -184,6 +191,10 @@ class TestFreecell(TestCase):
         freecell.start_game()
         assert freecell.get_state() == State.ONGOING
 
+        freecell.start_game(5)
+        assert freecell.deck.seed == 5
+        assert freecell.get_board() == FreeCell(5).get_board()
+
     def test_scenario_free_column(self):
         freecell = self.setup_scenario_free_column()
         moves = freecell.get_moves()
@@ -215,3 +226,269 @@ class TestFreecell(TestCase):
 
         with self.assertRaises(ValueError):
             freecell.make_move(("Kh", "S"))
+
+    def test_undo_move(self):
+        for compact in [False, True]:
+            freecell = FreeCell(seed=1, compact=compact)
+            boards = []
+            for move in [("Ah", "S"), ("9s", "F"), ("9d", "F"), ("Ad", "S")]:
+                boards.append(repr(freecell.get_board()))
+                assert freecell.make_move(move)
+
+            for board in reversed(boards):
+                assert freecell.undo_move()
+                assert repr(freecell.get_board()) == board
+
+            assert freecell._move_count == 0
+            with self.assertRaises(ValueError):
+                freecell.undo_move()
+
+    def test_actions(self):
+        batch = FreeCellBatch([3])
+        games = [FreeCell(seed=3), FreeCell(seed=3, compact=True), FreeCell(seed=3)]
+        rnd = np.random.default_rng(3)
+
+        for _ in range(80):
+            mask = games[0].get_action_mask()
+            assert mask.shape == (NUM_ACTIONS,)
+            assert (mask == batch.action_masks()[0]).all()
+            assert (mask == games[1].get_action_mask()).all()
+
+            moves = games[0].get_moves()
+            actions = games[0].board.get_actions()
+            assert [games[0].action_to_move(a) for a in actions] == moves
+            assert [games[1].move_to_action(m) for m in moves] == actions
+            if not actions:
+                break
+
+            action = int(rnd.choice(actions))
+            assert games[0].step(action)
+            assert games[1].step(action)
+            games[2].make_move(games[2].action_to_move(action))
+            batch.step([action])
+            board = games[0].get_board()
+            assert games[1].get_board() == board
+            assert games[2].get_board() == board
+            assert batch.get_board(0) == board
+
+        assert games[0].undo_move()
+        assert games[0]._move_count == games[1]._move_count - 1
+
+    def test_invalid_action(self):
+        for compact in [False, True]:
+            freecell = FreeCell(seed=1, compact=compact)
+            action = int(np.flatnonzero(~freecell.get_action_mask())[0])
+            with self.assertRaises(ValueError):
+                freecell.step(action)
+            with self.assertRaises(ValueError):
+                freecell.action_to_move(action)
+            with self.assertRaises(ValueError):
+                freecell.move_to_action(("Kh", "S"))
+
+    def test_autoplay(self):
+        for compact in [False, True]:
+            freecell = FreeCell(seed=1, compact=compact, autoplay=True)
+            manual = FreeCell(seed=1, compact=compact)
+            self.assertEqual(freecell.autoplayed, [("Ah", "S")])
+            manual.make_move(("Ah", "S"))
+
+            boards = []
+            for move in [("9s", "F"), ("9d", "F"), ("6s", "F")]:
+                boards.append(repr(freecell.get_board()))
+                freecell.make_move(move)
+                manual.make_move(move)
+                for autoplayed in freecell.autoplayed:
+                    self.assertEqual(autoplayed[1], "S")
+                    manual.make_move(autoplayed)
+                self.assertEqual(freecell.get_board(), manual.get_board())
+            self.assertEqual(freecell._move_count, 3)
+
+            for board in reversed(boards):
+                freecell.undo_move()
+                self.assertEqual(repr(freecell.get_board()), board)
+            self.assertEqual(freecell._move_count, 0)
+            with self.assertRaises(ValueError):
+                freecell.undo_move()
+
+            freecell.start_game()
+            self.assertTrue(freecell.autoplay)
+
+    def test_autoplay_is_safe(self):
+        freecell = FreeCell(autoplay=True)
+        freecell.board.columns = [
+            [Card(3, "h")],
+            [Card(2, "h")],
+            [Card(13, "s"), Card(1, "h")],
+            [],
+            [],
+            [],
+            [],
+            [],
+        ]
+        freecell.board.free_cells = [None] * 4
+        freecell.board.suit_stack = {"h": None, "d": None, "c": None, "s": None}
+        freecell.make_move(("Ah", "S"))
+        # The 3 of hearts may still be needed for a 2 of clubs or spades
+        self.assertEqual(freecell.autoplayed, [("2h", "S")])
+        self.assertEqual(freecell.board.columns[0], [Card(3, "h")])
+
+    def test_pruned_moves(self):
+        freecell = FreeCell()
+        freecell.board.columns = [
+            [Card(3, "h")],
+            [Card(13, "s"), Card(9, "c")],
+            [Card(10, "d")],
+            [],
+            [Card(12, "h"), Card(2, "h")],
+            [Card(5, "c")],
+            [Card(5, "s")],
+            [Card(7, "d")],
+        ]
+        freecell.board.free_cells = [Card(1, "h"), None, None, None]
+        freecell.board.suit_stack = {"h": None, "d": None, "c": None, "s": None}
+        self.assertEqual(freecell.get_pruned_moves(), [("Ah", "S")])
+
+        freecell.make_move(("Ah", "S"))
+        freecell.make_move(("2h", "S"))
+        moves = freecell.get_moves()
+        pruned = freecell.get_pruned_moves()
+        # The 3 of hearts is not safe, the 2 of clubs and spades may need it
+        self.assertIn(("3h", "S"), pruned)
+        self.assertIn(("3h", "0"), moves)
+        self.assertNotIn(("3h", "0"), pruned)
+        self.assertNotIn(("Qh", "0"), pruned)
+        self.assertIn(("9c", "0"), pruned)
+
+        freecell.make_move(("9c", "Td"))
+        freecell.make_move(("9c", "F"))
+        self.assertIn(("9c", "Td"), freecell.get_moves())
+        self.assertNotIn(("9c", "F"), freecell.get_pruned_moves())
+        self.assertNotIn(("9c", "Td"), freecell.get_pruned_moves())
+
+    def test_pruned_moves_same_on_both_backends(self):
+        for seed in [1, 617]:
+            rnd = Random(seed)
+            games = [FreeCell(seed, supermoves=True), FreeCell(seed, True, True)]
+            for _ in range(150):
+                pruned = games[0].get_pruned_moves()
+                self.assertEqual(games[1].get_pruned_moves(), pruned)
+                self.assertTrue(set(pruned) <= set(games[0].get_moves()))
+                if not pruned:
+                    break
+                move = rnd.choice(pruned)
+                for freecell in games:
+                    freecell.make_move(move)
+
+    def test_has_moves(self):
+        for compact in [False, True]:
+            for seed in range(1, 9):
+                rnd = Random(seed)
+                freecell = FreeCell(seed, compact, supermoves=seed % 2 == 0)
+                for _ in range(300):
+                    has_moves = freecell.board.has_moves()
+                    moves = freecell.get_moves()
+                    self.assertEqual(has_moves, bool(moves))
+                    self.assertEqual(freecell.board.has_moves(), has_moves)
+                    if not moves:
+                        break
+                    freecell.make_move(rnd.choice(moves))
+
+        freecell = self.setup_scenario_no_moves()
+        self.assertFalse(freecell.board.has_moves())
+        self.assertTrue(freecell.is_dead_end())
+
+    def test_is_dead_end(self):
+        freecell = FreeCell(compact=False)
+        # The 9 of hearts can only move between the two black tens
+        freecell.board.columns = [
+            [Card(1, "h"), Card(10, "s")],
+            [Card(1, "d"), Card(10, "c")],
+            [Card(1, "s"), Card(13, "d"), Card(9, "h")],
+            [Card(1, "c"), Card(13, "h")],
+            [Card(2, "h"), Card(12, "d")],
+            [Card(2, "d"), Card(12, "h")],
+            [Card(2, "c"), Card(3, "h")],
+            [Card(2, "s"), Card(3, "d")],
+        ]
+        freecell.board.free_cells = [
+            Card(5, "c"),
+            Card(5, "s"),
+            Card(6, "d"),
+            Card(6, "h"),
+        ]
+        freecell.board.suit_stack = {"h": None, "d": None, "c": None, "s": None}
+        self.assertEqual(freecell.get_state(), State.ONGOING)
+        self.assertTrue(freecell.is_dead_end())
+
+        freecell.board.free_cells = [Card(5, "c"), Card(5, "s"), Card(6, "d"), None]
+        self.assertFalse(freecell.is_dead_end())
+        self.assertFalse(FreeCell(seed=1).is_dead_end())
+        self.assertFalse(FreeCell(seed=2).is_dead_end(max_positions=1))
+
+    def test_copy(self):
+        for compact in [False, True]:
+            for seed in range(1, 5):
+                rnd = Random(seed)
+                freecell = FreeCell(seed, compact, seed % 2 == 0, seed > 2)
+                games = [(freecell, [])]
+                for _ in range(120):
+                    game, played = games[rnd.randrange(len(games))]
+                    if rnd.random() < 0.1:
+                        # Warm the caches so that the copy has to copy them
+                        game.get_moves()
+                        game.board.zobrist_hash()
+                        clone = (
+                            game.copy() if rnd.random() < 0.5 else copy.deepcopy(game)
+                        )
+                        games.append((clone, list(played)))
+                        continue
+                    moves = game.get_moves()
+                    if not moves:
+                        continue
+                    move = rnd.choice(moves)
+                    game.make_move(move)
+                    played.append(move)
+
+                for game, played in games:
+                    replay = FreeCell(seed, compact, seed % 2 == 0, seed > 2)
+                    for move in played:
+                        replay.make_move(move)
+                    self.assertEqual(
+                        game.board.get_position(), replay.board.get_position()
+                    )
+                    self.assertEqual(game.get_moves(), replay.get_moves())
+                    self.assertEqual(
+                        game.board.zobrist_hash(), replay.board.zobrist_hash()
+                    )
+                    self.assertEqual(game._move_count, len(played))
+
+                    # The copies keep the history
+                    if played:
+                        game.undo_move()
+                        replay.undo_move()
+                        self.assertEqual(
+                            game.board.get_position(), replay.board.get_position()
+                        )
+
+        freecell = FreeCell(seed=1)
+        clone = freecell.copy()
+        self.assertIs(clone.deck, freecell.deck)
+        self.assertIs(clone.board.columns[0], freecell.board.columns[0])
+        clone.make_move(("Kd", "F"))
+        self.assertIsNot(clone.board.columns[0], freecell.board.columns[0])
+        self.assertIs(clone.board.columns[1], freecell.board.columns[1])
+
+    def test_deepcopy_owns_its_columns(self):
+        for compact in [False, True]:
+            freecell = FreeCell(1, compact)
+            freecell.get_moves()
+            position = freecell.board.get_position()
+            clone = copy.deepcopy(freecell)
+            if compact:
+                clone.board.cols[0].append(clone.board.cols[1].pop())
+            else:
+                clone.board.columns[0].append(clone.board.columns[1].pop())
+            clone.board.reset_cache()
+            self.assertEqual(freecell.board.get_position(), position)
+            self.assertNotEqual(clone.board.get_position(), position)
+            self.assertEqual(freecell.get_moves(), FreeCell(1, compact).get_moves())
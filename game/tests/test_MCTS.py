@@ -0,0 +1,115 @@
+from unittest import TestCase
+
+from game.Card import Card
+from game.Freecell import FreeCell
+from game.Game import Game, State
+from game.MCTS import MCTS, suit_stack_rollout
+
+
+class Climb(Game):
+    """Climbs to the top by moving up, moving down loses at once."""
+
+    def __init__(self, height: int = 3) -> None:
+        self.height = height
+        self.position = 0
+
+    def get_moves(self) -> list:
+        return [("down", self.position), ("up", self.position)]
+
+    def make_move(self, move: tuple) -> bool:
+        self.position = self.position + 1 if move[0] == "up" else -1
+        return True
+
+    def get_state(self) -> State:
+        if self.position == self.height:
+            return State.WON
+        return State.LOST if self.position < 0 else State.ONGOING
+
+    def get_board(self) -> list:
+        return [self.position]
+
+    def start_game(self) -> None:
+        self.position = 0
+
+
+class TestMCTS(TestCase):
+    def test_any_game(self):
+        mcts = MCTS(iterations=50, seed=0, key=lambda game: game.position)
+        game = Climb()
+        self.assertEqual(mcts.search(game), ("up", 0))
+        self.assertEqual(game.position, 0)
+
+        visits, reward = mcts.statistics()[("up", 0)]
+        self.assertGreater(visits, mcts.statistics()[("down", 0)][0])
+        self.assertGreater(reward, 0.5)
+        self.assertEqual(mcts.completed, 50)
+        self.assertEqual(mcts.root.visits, 50)
+
+    def test_freecell(self):
+        freecell = FreeCell(seed=1)
+        freecell.board.columns = [[Card(13, suit)] for suit in "hdcs"] + [
+            [Card(11, "h"), Card(12, "s")],
+            [],
+            [],
+            [],
+        ]
+        freecell.board.free_cells = [Card(12, "h"), None, None, None]
+        freecell.board.suit_stack = {
+            "h": Card(10, "h"),
+            "d": Card(12, "d"),
+            "c": Card(12, "c"),
+            "s": Card(11, "s"),
+        }
+        mcts = MCTS(iterations=200, seed=0, rollout_depth=3)
+        self.assertIn(mcts.search(freecell), freecell.get_moves())
+        _, reward = mcts.statistics()[mcts.search(freecell)]
+        self.assertGreater(reward, 0.9)
+
+        mcts = MCTS(iterations=100, seed=1, rollout_policy=suit_stack_rollout)
+        self.assertEqual(mcts.search(FreeCell(seed=1)), ("Ah", "S"))
+
+    def test_threads_and_processes(self):
+        freecell = FreeCell(seed=3, autoplay=True)
+        # Every tree expands its root in its first iteration, every other
+        # iteration takes a move at the root, counted on its edge even if
+        # the child is also reached through transpositions
+        for mcts, root_visits in [
+            (MCTS(60, seed=0, threads=3, virtual_loss=2), 59),
+            (MCTS(60, seed=0, processes=2), 58),
+            (MCTS(60, seed=0, transpositions=False, threads=3), 59),
+        ]:
+            self.assertIn(mcts.search(freecell), freecell.get_moves())
+            self.assertEqual(mcts.completed, 60)
+            visits = sum(visits for visits, _ in mcts.statistics().values())
+            self.assertEqual(visits, root_visits)
+
+    def test_transpositions_use_edge_statistics(self):
+        mcts = MCTS(500, seed=0)
+        mcts.search(FreeCell(seed=3))
+        root = mcts.root
+        # Children reached through other paths have more visits than the
+        # moves of the root leading to them
+        self.assertTrue(
+            any(
+                child is not None and child.visits > visits
+                for child, visits in zip(root.children, root.edge_visits)
+            )
+        )
+        statistics = mcts.statistics()
+        self.assertEqual(sum(visits for visits, _ in statistics.values()), 499)
+        for move, visits, value in zip(root.moves, root.edge_visits, root.edge_values):
+            if visits:
+                self.assertEqual(statistics[move], (visits, value / visits))
+
+    def test_budgets(self):
+        mcts = MCTS(iterations=None, max_time=0.05, transpositions=False)
+        mcts.search(FreeCell(seed=2))
+        self.assertGreater(mcts.completed, 0)
+
+        with self.assertRaises(ValueError):
+            MCTS(iterations=None)
+
+        game = Climb()
+        game.position = -1
+        with self.assertRaises(ValueError):
+            MCTS(iterations=10).search(game)
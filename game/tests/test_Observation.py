@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+import numpy as np
+
+from game.Card import Card
+from game.Freecell import FreeCell
+from game.FreeCellBatch import FreeCellBatch
+from game.Observation import (
+    COLUMN_PLANE,
+    DEPTH_PLANE,
+    FREE_CELL_PLANE,
+    OBSERVATION_SHAPE,
+    SUIT_STACK_PLANE,
+    TOP_PLANE,
+    encode,
+    encode_batch,
+    encode_games,
+    encode_states,
+)
+
+
+class TestObservation(TestCase):
+    def test_encoders_agree(self):
+        seeds = list(range(1, 7))
+        batch = FreeCellBatch(seeds)
+        games = [FreeCell(seed=seed, compact=seed % 2 == 0) for seed in seeds]
+        rnd = np.random.default_rng(0)
+        out = np.zeros((len(seeds),) + OBSERVATION_SHAPE, dtype=np.float32)
+
+        for _ in range(60):
+            expected = encode_batch(batch)
+            self.assertIs(encode_games(games, out), out)
+            np.testing.assert_array_equal(out, expected)
+            for i, freecell in enumerate(games):
+                np.testing.assert_array_equal(encode(freecell), expected[i])
+
+            actions = np.full(len(seeds), -1)
+            for i, mask in enumerate(batch.action_masks()):
+                legal = np.flatnonzero(mask)
+                if len(legal):
+                    actions[i] = rnd.choice(legal)
+                    games[i].step(actions[i])
+            batch.step(actions)
+
+    def test_planes(self):
+        freecell = FreeCell(seed=1)
+        freecell.make_move(("Ah", "S"))
+        freecell.make_move(("Kd", "F"))
+        columns, free_cells, _ = freecell.get_board()
+        obs = encode(freecell, dtype=np.uint8)
+
+        self.assertEqual(obs.shape, OBSERVATION_SHAPE)
+        np.testing.assert_array_equal(obs[:, :TOP_PLANE].sum(axis=1), 1)
+        self.assertEqual(obs[Card(1, "h").index, SUIT_STACK_PLANE], 1)
+        self.assertEqual(obs[Card(13, "d").index, FREE_CELL_PLANE], 1)
+        for column, cards in enumerate(columns):
+            self.assertEqual(obs[cards[0].index, COLUMN_PLANE + column], 1)
+            self.assertEqual(obs[cards[-1].index, TOP_PLANE], 1)
+        self.assertEqual(obs[:, TOP_PLANE].sum(), 9)
+
+        obs = encode(freecell)
+        depth = obs[columns[0][0].index, DEPTH_PLANE]
+        self.assertAlmostEqual(depth, (len(columns[0]) - 1) / 19, places=6)
+
+    def test_output_buffer(self):
+        freecell = FreeCell(seed=2)
+        out = np.full(OBSERVATION_SHAPE, 7, dtype=np.float32)
+        self.assertIs(encode(freecell, out), out)
+        np.testing.assert_array_equal(out, encode_states(freecell.to_bytes())[0])
+
+        with self.assertRaises(ValueError):
+            encode(freecell, np.zeros((1,) + OBSERVATION_SHAPE))
+        with self.assertRaises(ValueError):
+            encode_games([freecell], np.zeros(OBSERVATION_SHAPE))
@@ -0,0 +1,82 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from game.Benchmark import playout
+from game.Board import Board
+from game.Freecell import FreeCell
+from game.Profiler import Profiler
+
+
+class TestProfiler(TestCase):
+    def test_counters(self):
+        moves = playout(3, 30)
+        original = Board.get_moves
+        with Profiler() as profiler:
+            self.assertIsNot(Board.get_moves, original)
+            freecell = FreeCell(3)
+            for move in moves:
+                freecell.get_moves()
+                freecell.make_move(move)
+            freecell.get_state()
+        self.assertIs(Board.get_moves, original)
+
+        stats = profiler.stats()
+        self.assertEqual(stats["FreeCell.get_moves"]["calls"], 30)
+        self.assertEqual(stats["FreeCell.make_move"]["calls"], 30)
+        self.assertEqual(stats["Board.is_valid_move"]["calls"], 30)
+        self.assertEqual(stats["Board.make_move"]["calls"], 30)
+        self.assertEqual(stats["FreeCell.get_state"]["calls"], 1)
+        self.assertEqual(stats["CompactBoard.get_moves"]["calls"], 0)
+        self.assertGreater(
+            stats["FreeCell.make_move"]["seconds"], stats["Board.make_move"]["seconds"]
+        )
+        self.assertEqual(
+            sum(
+                stats[f"Board.move_to_{name}"]["calls"]
+                for name in ("stack", "free_cell", "free_column", "card")
+            ),
+            30,
+        )
+
+        # The times are inclusive, so a FreeCell method is the slowest
+        report = profiler.report().splitlines()
+        self.assertTrue(report[1].startswith("FreeCell."))
+        called = [name for name, stat in stats.items() if stat["calls"]]
+        self.assertEqual(len(report), len(called) + 1)
+
+        # Disabled, nothing is counted
+        FreeCell(3).get_moves()
+        self.assertEqual(profiler.stats()["FreeCell.get_moves"]["calls"], 30)
+        profiler.reset()
+        self.assertEqual(profiler.stats()["FreeCell.get_moves"]["calls"], 0)
+
+    def test_one_enabled_profiler(self):
+        with Profiler():
+            with self.assertRaises(ValueError):
+                Profiler().enable()
+
+    def test_export(self):
+        with self.assertRaises(ValueError):
+            Profiler().export()
+
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile-{pid}.json")
+            profiler = Profiler(
+                {FreeCell: ("get_moves",)}, export_path=path, export_interval=0
+            )
+            exported = path.format(pid=os.getpid())
+            with profiler:
+                FreeCell(1).get_moves()
+                with open(exported) as file:
+                    self.assertEqual(
+                        json.load(file)["operations"]["FreeCell.get_moves"]["calls"],
+                        1,
+                    )
+                FreeCell(1).get_moves()
+            with open(exported) as file:
+                stats = json.load(file)
+            self.assertEqual(stats["pid"], os.getpid())
+            self.assertEqual(stats["operations"]["FreeCell.get_moves"]["calls"], 2)
+            self.assertEqual(os.listdir(directory), [os.path.basename(exported)])
@@ -0,0 +1,100 @@
+import io
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from game.Benchmark import playout
+from game.CompactBoard import CARD_NAME
+from game.Freecell import FreeCell
+from game.ReplayLog import (
+    DESTINATIONS,
+    MAX_MOVES,
+    InvalidReplay,
+    Replay,
+    ReplayReader,
+    ReplayWriter,
+    decode_move,
+    encode_move,
+    validate,
+    validate_log,
+)
+
+
+def autoplay_playout(seed: int, moves: int = 100) -> list:
+    freecell = FreeCell(seed, supermoves=True, autoplay=True)
+    random = Random(seed)
+    played = []
+    while len(played) < moves and freecell.get_moves():
+        move = random.choice(freecell.get_moves())
+        freecell.make_move(move)
+        played.append(move)
+    return played
+
+
+class TestReplayLog(TestCase):
+    def test_encode_move(self):
+        for card in CARD_NAME:
+            for destination in CARD_NAME + DESTINATIONS:
+                code = encode_move((card, destination))
+                self.assertLess(code, 1 << 16)
+                self.assertEqual(decode_move(code), (card, destination))
+        with self.assertRaises(ValueError):
+            encode_move(("1x", "S"))
+
+    def test_write_and_read(self):
+        games = [Replay(seed, playout(seed)) for seed in range(1, 21)]
+        games.append(Replay(-5, []))
+        for compress in [False, True]:
+            log = io.BytesIO()
+            with ReplayWriter(log, compress=compress, chunk_size=512) as writer:
+                for seed, moves in games:
+                    writer.write(seed, moves)
+            log.seek(0)
+            with ReplayReader(log) as reader:
+                self.assertFalse(reader.supermoves or reader.autoplay)
+                self.assertEqual(list(reader), games)
+                log.seek(0)
+            self.assertGreater(len(list(ReplayReader(log).chunks())), 2)
+
+        with self.assertRaises(ValueError):
+            ReplayWriter(io.BytesIO()).write(1, [("Ah", "S")] * (MAX_MOVES + 1))
+
+    def test_invalid_files(self):
+        with self.assertRaises(ValueError):
+            ReplayReader(io.BytesIO(b"FCDEALS1"))
+
+        log = io.BytesIO()
+        with ReplayWriter(log) as writer:
+            writer.write(1, playout(1))
+        for size in [len(log.getvalue()) - 1, len(log.getvalue()) - 20]:
+            with self.assertRaises(ValueError):
+                list(ReplayReader(io.BytesIO(log.getvalue()[:size])))
+
+    def test_validate(self):
+        moves = playout(3)
+        self.assertIsNone(validate(3, moves))
+        self.assertIsNotNone(validate(4, moves))
+        self.assertEqual(validate(3, moves[:10] + [moves[8]] + moves[10:]), 10)
+        self.assertEqual(validate(3, moves[:5] + [("Zz", "S")]), 5)
+
+        moves = autoplay_playout(5)
+        self.assertIsNone(validate(5, moves, supermoves=True, autoplay=True))
+        self.assertIsNotNone(validate(5, moves))
+
+    def test_validate_log(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.log")
+            expected = []
+            with ReplayWriter(
+                path, supermoves=True, autoplay=True, chunk_size=256
+            ) as writer:
+                for game, seed in enumerate(range(1, 13)):
+                    moves = autoplay_playout(seed, 40)
+                    if seed % 5 == 0:
+                        moves[7] = ("Kh", "S")
+                        expected.append(InvalidReplay(game, seed, 7, ("Kh", "S")))
+                    writer.write(seed, moves)
+
+            self.assertEqual(validate_log(path, processes=1), expected)
+            self.assertEqual(validate_log(path, processes=2), expected)
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from game.Freecell import FreeCell
+from game.Game import State
+from game.Runner import GameResult, RandomPolicy, Runner
+from game.Solver import Solver
+
+
+def first_move(freecell: FreeCell) -> tuple:
+    return freecell.get_moves()[0]
+
+
+class SolverPolicy:
+    def __call__(self, freecell: FreeCell) -> tuple:
+        if freecell._move_count == 0:
+            self.moves = Solver().solve_board(freecell.board)
+        return self.moves[freecell._move_count]
+
+
+class TestRunner(TestCase):
+    def test_play(self):
+        result = Runner(SolverPolicy()).play(1)
+        self.assertIsInstance(result, GameResult)
+        self.assertEqual(result.seed, 1)
+        self.assertEqual(result.state, State.WON)
+        self.assertGreater(result.move_count, 0)
+        self.assertGreater(result.time, 0)
+
+    def test_max_moves(self):
+        result = Runner(first_move, max_moves=5).play(1)
+        self.assertEqual(result.state, State.ONGOING)
+        self.assertEqual(result.move_count, 5)
+
+    def test_random_policy_is_reproducible(self):
+        runner = Runner(RandomPolicy(7), processes=1, max_moves=300, compact=True)
+        first = [result[:3] for result in runner.run(range(1, 6))]
+        second = [result[:3] for result in runner.run(reversed(range(1, 6)))]
+        self.assertEqual(first, second[::-1])
+
+    def test_run_in_processes(self):
+        seeds = list(range(1, 9))
+        runner = Runner(RandomPolicy(3), processes=2, max_moves=200)
+        results = sorted(runner.run(seeds))
+        self.assertEqual([result.seed for result in results], seeds)
+        expected = [runner.play(seed)[:3] for seed in seeds]
+        self.assertEqual([result[:3] for result in results], expected)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from game.Benchmark import playout
+from game.Freecell import FreeCell
+from game.Server import SESSION_BYTES, GameServer
+
+
+class Client:
+    def __init__(self, reader, writer) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, *requests) -> list:
+        self.writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+        return [json.loads(await self.reader.readline()) for _ in requests]
+
+    async def request(self, **request) -> dict:
+        return (await self.send(request))[0]
+
+
+class TestServer(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        for client in getattr(self, "clients", []):
+            client.writer.close()
+        await self.server.close()
+
+    async def connect(self) -> Client:
+        client = Client(*await asyncio.open_connection("127.0.0.1", self.server.port))
+        self.clients = getattr(self, "clients", []) + [client]
+        return client
+
+    async def test_play(self):
+        client = await self.connect()
+        game = await client.request(op="new", seed=3, request=7)
+        self.assertTrue(game["ok"])
+        self.assertEqual(game["request"], 7)
+        self.assertEqual(game["seed"], 3)
+        self.assertEqual(game["state"], "ONGOING")
+        self.assertEqual(game["suit_stacks"], {"h": 0, "d": 0, "c": 0, "s": 0})
+        session = game["session"]
+
+        freecell = FreeCell(3)
+        for move in playout(3, 20):
+            response = await client.request(op="moves", session=session)
+            self.assertEqual(response["moves"], [list(m) for m in freecell.get_moves()])
+            response = await client.request(op="move", session=session, move=move)
+            freecell.make_move(move)
+            self.assertEqual(response["move_count"], freecell._move_count)
+
+        snapshot = await client.request(op="snapshot", session=session)
+        expected = GameServer.snapshot(freecell)
+        self.assertEqual(
+            {key: snapshot[key] for key in expected}, json.loads(json.dumps(expected))
+        )
+
+        response = await client.request(op="move", session=session, move=["Kh", "Kh"])
+        self.assertFalse(response["ok"])
+        self.assertTrue((await client.request(op="close", session=session))["ok"])
+        response = await client.request(op="snapshot", session=session)
+        self.assertIn("Unknown session", response["error"])
+
+    async def test_invalid_requests(self):
+        client = await self.connect()
+        client.writer.write(b"not json\n[1]\n")
+        for _ in range(2):
+            self.assertFalse(json.loads(await client.reader.readline())["ok"])
+        response = await client.request(op="fly", request="x")
+        self.assertEqual(
+            response, {"ok": False, "error": "Unknown operation fly", "request": "x"}
+        )
+        response = await client.request(op="new", seed="1")
+        self.assertFalse(response["ok"])
+
+    async def test_many_sessions_batched(self):
+        clients = [await self.connect() for _ in range(4)]
+        games = await asyncio.gather(
+            *(
+                client.send(*({"op": "new", "seed": seed} for seed in range(500)))
+                for client in clients
+            )
+        )
+        self.assertEqual(len(self.server.sessions), 2000)
+        self.assertEqual(
+            len({game["session"] for games_ in games for game in games_}), 2000
+        )
+        stats = self.server.stats()
+        self.assertEqual(stats["requests"], 2000)
+        self.assertLess(stats["batches"], 100)
+
+    async def test_eviction(self):
+        self.server.memory_budget = 10 * SESSION_BYTES[True]
+        client = await self.connect()
+        sessions = [
+            game["session"]
+            for game in await client.send(
+                *({"op": "new", "seed": i} for i in range(10))
+            )
+        ]
+        # Using the first session makes the second the least recently used
+        await client.request(op="snapshot", session=sessions[0])
+        await client.request(op="move", session=sessions[0], move=playout(0, 1)[0])
+        await client.request(op="new", seed=11)
+        self.assertIn(sessions[0], self.server.sessions)
+        self.assertNotIn(sessions[1], self.server.sessions)
+        self.assertLessEqual(self.server.memory, self.server.memory_budget)
+        self.assertEqual(self.server.stats()["evicted"], 2)
+
+    async def test_idle_timeout(self):
+        await self.server.close()
+        self.server = GameServer(idle_timeout=0.2)
+        await self.server.start()
+        client = await self.connect()
+        idle = (await client.request(op="new", seed=1))["session"]
+        used = (await client.request(op="new", seed=2))["session"]
+        for _ in range(6):
+            await asyncio.sleep(0.05)
+            await client.request(op="snapshot", session=used)
+        self.assertEqual(list(self.server.sessions), [used])
+        self.assertEqual(self.server.memory, SESSION_BYTES[True])
+        response = await client.request(op="snapshot", session=idle)
+        self.assertFalse(response["ok"])
+
+    async def test_error_keeps_batch(self):
+        first, second = await self.connect(), await self.connect()
+        # Deep nesting makes json.loads raise RecursionError
+        first.writer.write(b"[" * 20000 + b"\n")
+        second.writer.write(b'{"op": "new", "seed": 1}\n')
+        responses = await asyncio.wait_for(
+            asyncio.gather(first.reader.readline(), second.reader.readline()), 5
+        )
+        self.assertFalse(json.loads(responses[0])["ok"])
+        self.assertTrue(json.loads(responses[1])["ok"])
+
+    async def test_eviction_after_moves(self):
+        client = await self.connect()
+        games = await client.send(*({"op": "new", "seed": seed} for seed in (3, 4)))
+        sessions = [game["session"] for game in games]
+        self.server.memory_budget = self.server.memory
+        response = await client.request(
+            op="move", session=sessions[1], move=playout(4, 1)[0]
+        )
+        self.assertTrue(response["ok"])
+        self.assertEqual(list(self.server.sessions), [sessions[1]])
+        self.assertLessEqual(self.server.memory, self.server.memory_budget)
@@ -0,0 +1,52 @@
+from random import Random
+from unittest import TestCase
+
+from game.Freecell import FreeCell
+from game.Snapshot import STATE_SIZE, decode_state, encode_state
+
+
+class TestSnapshot(TestCase):
+    def test_round_trip(self):
+        for compact in [False, True]:
+            rnd = Random(3)
+            freecell = FreeCell(seed=3, compact=compact)
+            for _ in range(120):
+                state = freecell.to_bytes()
+                self.assertEqual(len(state), STATE_SIZE)
+
+                copy = FreeCell.from_bytes(state, compact=not compact)
+                self.assertEqual(copy.get_board(), freecell.get_board())
+                self.assertEqual(copy._move_count, freecell._move_count)
+                self.assertEqual(copy.get_moves(), freecell.get_moves())
+                self.assertEqual(
+                    copy.board.zobrist_hash(), freecell.board.zobrist_hash()
+                )
+                if not freecell.get_moves():
+                    break
+                freecell.make_move(rnd.choice(freecell.get_moves()))
+
+    def test_buffer(self):
+        games = [FreeCell(seed=seed) for seed in range(1, 5)]
+        for freecell in games[1:]:
+            freecell.make_move(freecell.get_moves()[0])
+        buffer = memoryview(bytearray(STATE_SIZE * len(games)))
+        for i, freecell in enumerate(games):
+            freecell.write_state(buffer, i * STATE_SIZE)
+
+        copy = FreeCell(seed=1)
+        for i, freecell in enumerate(games):
+            copy.read_state(buffer, i * STATE_SIZE)
+            self.assertEqual(copy.get_board(), freecell.get_board())
+            self.assertEqual(copy._move_count, freecell._move_count)
+        self.assertFalse(copy.board.undo_move())
+
+    def test_suit_stacks(self):
+        freecell = FreeCell(seed=1)
+        freecell.make_move(("Ah", "S"))
+        position, move_count = decode_state(freecell.to_bytes())
+        self.assertEqual(position, freecell.board.get_position())
+        self.assertEqual(position[2], bytes([1, 0, 0, 0]))
+        self.assertEqual(move_count, 1)
+
+        with self.assertRaises(ValueError):
+            encode_state(position, 1 << 24, bytearray(STATE_SIZE))
@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from game.Board import Board
+from game.Card import Card
+from game.Freecell import FreeCell
+from game.Game import State
+from game.Solver import Solver
+
+
+class TestSolver(TestCase):
+    def assert_solves(self, freecell: FreeCell, moves: list):
+        self.assertIsNotNone(moves)
+        for move in moves:
+            self.assertTrue(freecell.make_move(move))
+        self.assertEqual(freecell.get_state(), State.WON)
+
+    def test_solve_seeds(self):
+        solver = Solver()
+        for seed in [1, 2, 3, 617]:
+            moves = solver.solve(seed)
+            self.assertGreater(solver.expanded, 0)
+            self.assert_solves(FreeCell(seed=seed), moves)
+
+    def test_supermoves(self):
+        solver = Solver(supermoves=True)
+        for seed in [1, 2]:
+            moves = solver.solve(seed)
+            self.assert_solves(FreeCell(seed=seed, supermoves=True), moves)
+
+    def test_solve_board(self):
+        freecell = FreeCell(seed=1)
+        for move in [("Ah", "S"), ("9s", "F"), ("9d", "F")]:
+            freecell.make_move(move)
+        board = repr(freecell.get_board())
+
+        moves = Solver().solve_board(freecell.board)
+
+        self.assertEqual(repr(freecell.get_board()), board)
+        self.assert_solves(freecell, moves)
+
+    def test_solved_by_autoplay(self):
+        board = Board([])
+        board.columns[0] = [Card(2, "h"), Card(1, "h")]
+        board.suit_stack = {
+            "h": None,
+            "d": Card(13, "d"),
+            "c": Card(13, "c"),
+            "s": Card(13, "s"),
+        }
+        board.columns[1] = [Card(rank, "h") for rank in range(13, 2, -1)]
+
+        moves = Solver().solve_board(board)
+        self.assertEqual(len(moves), 13)
+        self.assertTrue(all(move[1] == "S" for move in moves))
+
+    def test_unsolvable(self):
+        freecell = FreeCell()
+        freecell.board.columns = [
+            [Card(13, "h"), Card(2, "h")],
+            [Card(13, "d"), Card(2, "d")],
+            [Card(13, "s"), Card(2, "s")],
+            [Card(13, "c"), Card(2, "c")],
+            [Card(3, "h")],
+            [Card(3, "d")],
+            [Card(3, "s")],
+            [Card(3, "c")],
+        ]
+        freecell.board.free_cells = [
+            Card(10, "h"),
+            Card(10, "d"),
+            Card(10, "s"),
+            Card(10, "c"),
+        ]
+
+        solver = Solver()
+        self.assertIsNone(solver.solve_board(freecell.board))
+        self.assertTrue(solver.exhausted)
+
+    def test_budget(self):
+        solver = Solver(max_nodes=3)
+        self.assertIsNone(solver.solve(1))
+        self.assertFalse(solver.exhausted)
+        self.assertEqual(solver.expanded, 3)
+
+        solver = Solver(max_time=0)
+        self.assertIsNone(solver.solve(1))
+        self.assertFalse(solver.exhausted)
@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from game.TranspositionTable import TranspositionTable
+
+
+class TestTranspositionTable(TestCase):
+    def test_put_get(self):
+        table = TranspositionTable(4)
+        table.put(1, "a")
+        table.put(2, "b")
+
+        self.assertEqual(table.get(1), "a")
+        self.assertIsNone(table.get(3))
+        self.assertEqual(table.get(3, "c"), "c")
+        self.assertIn(2, table)
+        self.assertEqual(len(table), 2)
+        self.assertEqual((table.hits, table.misses), (1, 2))
+
+    def test_eviction(self):
+        table = TranspositionTable(2)
+        table.put(1, "a")
+        table.put(2, "b")
+        table.get(1)
+        table.put(3, "c")
+
+        self.assertIn(1, table)
+        self.assertNotIn(2, table)
+        self.assertIn(3, table)
+        self.assertEqual(table.evictions, 1)
+
+        table.put(1, "d")
+        table.put(4, "e")
+        self.assertEqual(table.get(1), "d")
+        self.assertNotIn(3, table)
+
+    def test_clear(self):
+        table = TranspositionTable(2)
+        table.put(1, "a")
+        table.get(1)
+        table.clear()
+
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.hits, 0)
+
+    def test_capacity(self):
+        with self.assertRaises(ValueError):
+            TranspositionTable(0)